@@ -0,0 +1,487 @@
+"""
+LaTeX Quellen Manager - Benchmark-Suite
+
+Erzeugt synthetische Bibliotheken (Standard: 1k, 10k und 100k .bib-Dateien)
+samt passender LaTeX-Hauptdateien und misst die Hot Paths über den
+Flask-Test-Client bzw. direkt: /api/library, /api/history, parse_bib_entry,
+generate_bibtex, update_latex_main und remove_from_latex_main. Die
+Kommandozeile (lqm_cli.py) wird als eigener Prozess gemessen: cli_startup
+(Befehl gegen eine leere Bibliothek, also Interpreter, Importe und
+Einstellungen) und cli_index (Index-Abgleich der Bibliothek).
+
+Je Messung werden Median, Minimum und der Spitzenwert des Speichers
+(tracemalloc, eigener Durchlauf) ermittelt; für den geladenen Index
+zusätzlich der belegte Speicher je Eintrag (index_load, bytes_per_entry). Das Ergebnis wird als JSON
+geschrieben und gegen feste Grenzwerte (thresholds.json) sowie optional
+gegen ein früheres Ergebnis (--baseline) geprüft. Vorab prüft
+check_latex_model, ob das inkrementell gepflegte Modell der LaTeX-Hauptdatei
+nach zufälligen Einfügungen und Entfernungen einer Neuberechnung entspricht.
+Bei Überschreitungen oder Abweichungen endet das Skript mit Exit-Code 1.
+
+Aufruf:
+    python benchmarks/bench.py --sizes 1000,10000 --out bench.json
+    python benchmarks/bench.py --baseline alt.json --tolerance 0.25
+
+Die synthetischen Daten werden deterministisch (--seed) im Arbeitsverzeichnis
+erzeugt und bei weiteren Läufen wiederverwendet. Einstellungen und
+Index-Cache werden dorthin umgeleitet; die echten Einstellungen bleiben
+unberührt.
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import random
+import pathlib
+import platform
+import argparse
+import datetime
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+
+BENCH_DIR = pathlib.Path(__file__).parent.resolve()
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+import lqm_core  # noqa: E402
+import latex_quellen_manager as lqm  # noqa: E402
+
+# Version der synthetischen Daten (bei Änderungen am Generator erhöhen)
+DATA_VERSION = 1
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_REPEAT = 5
+THRESHOLDS_FILE = BENCH_DIR / "thresholds.json"
+CLI = BENCH_DIR.parent / "lqm_cli.py"
+
+# Anzahl Einträge für die Mikro-Benchmarks (parse_bib_entry, generate_bibtex)
+MICRO_SAMPLE = 1000
+
+# Zufällige Änderungen an der Hauptdatei für check_latex_model
+MODEL_CHECK_STEPS = 400
+
+_WORDS = ("Analyse Daten Modell System Netz Theorie Methode Praxis Studie Verfahren "
+          "Entwicklung Grundlagen Anwendung Forschung Technik Lernen Sprache Struktur "
+          "Prozess Wissen Optimierung Simulation Regelung Messung Bewertung").split()
+_NAMES = ("Müller Schmidt Schneider Fischer Weber Meyer Wagner Becker Schulz Hoffmann "
+          "Koch Richter Klein Wolf Schröder Neumann Schwarz Zimmermann Braun Krüger").split()
+_FIRST = "Anna Ben Clara David Eva Felix Greta Hans Ida Jonas".split()
+
+
+# ---------------------------------------------------------------------------
+# Synthetische Daten
+# ---------------------------------------------------------------------------
+def synthetic_entry(rng: random.Random, n: int) -> tuple:
+    """(entry_type, fields) für den n-ten synthetischen Eintrag."""
+    entry_type = rng.choice(("book", "article", "online", "inbook", "misc"))
+    title = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(3, 8))) + f" {n}"
+    authors = " and ".join(f"{rng.choice(_NAMES)}, {rng.choice(_FIRST)}"
+                           for _ in range(rng.randint(1, 3)))
+    fields = {"author": authors, "title": title, "date": str(rng.randint(1950, 2025))}
+    if entry_type == "book":
+        fields.update(publisher="Springer", location="Berlin",
+                      isbn=f"978-3-{rng.randint(10, 99)}-{rng.randint(100000, 999999)}-{rng.randint(0, 9)}")
+    elif entry_type == "article":
+        fields.update(journal=f"Zeitschrift für {rng.choice(_WORDS)}", volume=str(rng.randint(1, 80)),
+                      pages=f"{rng.randint(1, 300)}--{rng.randint(301, 600)}",
+                      doi=f"10.{rng.randint(1000, 9999)}/x{n}")
+    elif entry_type == "online":
+        fields.update(url=f"https://example.org/{n}", urldate="2024-05-01")
+    elif entry_type == "inbook":
+        fields.update(booktitle=" ".join(rng.choice(_WORDS) for _ in range(4)), publisher="Hanser")
+    return entry_type, fields
+
+
+def build_library(directory: pathlib.Path, size: int, seed: int) -> pathlib.Path:
+    """Legt size .bib-Dateien an (wiederverwendet, wenn bereits vorhanden)."""
+    marker = directory / ".bench.json"
+    stamp = {"size": size, "seed": seed, "version": DATA_VERSION}
+    if marker.exists():
+        try:
+            if json.loads(marker.read_text(encoding="utf-8")) == stamp:
+                return directory
+        except ValueError:
+            pass
+    directory.mkdir(parents=True, exist_ok=True)
+    for old in directory.glob("*.bib"):
+        old.unlink()
+    rng = random.Random(seed)
+    sections = [s["label"] for s in lqm.DEFAULT_SETTINGS["bib_placement_sections"]]
+    for n in range(size):
+        entry_type, fields = synthetic_entry(rng, n)
+        key = f"{lqm.generate_cite_key(fields['title'], fields['author'], fields['date'])}_{n}"
+        comment = f"% Hinzugefügt am: 01.01.2024 12:00\n% Abschnitt: {rng.choice(sections)}\n"
+        with open(directory / lqm.generate_filename(key), "w", encoding="utf-8") as f:
+            f.write(comment + lqm.generate_bibtex(entry_type, fields, key))
+    marker.write_text(json.dumps(stamp), encoding="utf-8")
+    return directory
+
+
+def build_main_tex(path: pathlib.Path, library: pathlib.Path, size: int) -> pathlib.Path:
+    """
+    Hauptdatei, die mit der Bibliothek wächst: Abschnittsmarker, size // 10
+    \\addbibresource-Zeilen und size Zeilen Fließtext.
+    """
+    files = sorted(p.name for p in library.glob("*.bib"))[:size // 10]
+    rel = os.path.relpath(library, path.parent).replace("\\", "/")
+    lines = ["\\documentclass{article}", "\\usepackage[backend=biber]{biblatex}"]
+    per_section = max(1, len(files) // 5)
+    for i, section in enumerate(lqm.DEFAULT_SETTINGS["bib_placement_sections"]):
+        lines.append(section["search_text"])
+        lines.extend(f"\\addbibresource{{{rel}/{name}}}" for name in files[i * per_section:(i + 1) * per_section])
+    lines.append("\\begin{document}")
+    rng = random.Random(size)
+    for n in range(size):
+        lines.append(" ".join(rng.choice(_WORDS) for _ in range(12)) + f" \\cite{{quelle_{n}}}.")
+    lines.append("\\printbibliography")
+    lines.append("\\end{document}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Messen
+# ---------------------------------------------------------------------------
+def measure(func, repeat: int, setup=None) -> dict:
+    """Median/Minimum über repeat Läufe plus Speicher-Spitze (eigener Lauf)."""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+
+    if setup is not None:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "median_ms": round(statistics.median(times), 3),
+        "min_ms": round(min(times), 3),
+        "runs": repeat,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def measure_index_memory(library: pathlib.Path, repeat: int) -> dict:
+    """Laden der Index-Datei: Zeit und danach belegter Speicher je Record."""
+    index_file = lqm.index_file_for(library)
+
+    def load():
+        index = lqm.LibraryIndex(library, index_file, lqm.parse_bib_entry)
+        index.load()
+        return index
+
+    stats = measure(load, repeat)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        index = load()
+        gc.collect()
+        current, _peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    stats["bytes_per_entry"] = round(current / max(len(index), 1))
+    return stats
+
+
+def measure_command(argv: list, repeat: int, env=None) -> dict:
+    """
+    Laufzeit eines eigenen Prozesses (inklusive Interpreterstart) über repeat
+    Läufe nach einem Aufwärmlauf. Kein Speicherwert: ru_maxrss des Kindes
+    enthält unter Linux den Spitzenwert dieses Prozesses.
+    """
+    subprocess.run(argv, env=env, check=True, stdout=subprocess.DEVNULL)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(argv, env=env, check=True, stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": round(statistics.median(times), 3),
+        "min_ms": round(min(times), 3),
+        "runs": repeat,
+        "peak_kib": 0.0,
+    }
+
+
+def cli_command(workdir: pathlib.Path, name: str, library: pathlib.Path, main_tex, *args) -> tuple:
+    """(argv, env) für lqm_cli.py mit eigener Einstellungsdatei im Arbeitsverzeichnis."""
+    settings_file = workdir / f"cli_settings_{name}.json"
+    data = dict(lqm.DEFAULT_SETTINGS, target_directory=str(library),
+                latex_main_path=str(main_tex or ""), add_date_comment=False)
+    with open(settings_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    env = dict(os.environ, LQM_CACHE_DIR=str(lqm_core.CACHE_DIR))
+    return [sys.executable, str(CLI), "--settings", str(settings_file), *args], env
+
+
+def _get(client, url: str):
+    def run():
+        resp = client.get(url)
+        if resp.status_code != 200:
+            raise RuntimeError(f"{url}: HTTP {resp.status_code}")
+        resp.get_data()
+    return run
+
+
+def bench_size(size: int, workdir: pathlib.Path, repeat: int, seed: int) -> list:
+    library = build_library(workdir / f"lib_{size}", size, seed)
+    main_tex = build_main_tex(workdir / f"main_{size}.tex", library, size)
+    lqm.settings._data.update(target_directory=str(library), latex_main_path=str(main_tex))
+    client = lqm.app.test_client()
+    results = []
+
+    def record(name: str, stats: dict):
+        stats.update(name=name, size=size)
+        results.append(stats)
+        extra = f"  {stats['bytes_per_entry']} B/Eintrag" if "bytes_per_entry" in stats else ""
+        print(f"  {name:<24} {size:>7}  median {stats['median_ms']:>10.2f} ms  "
+              f"min {stats['min_ms']:>10.2f} ms  peak {stats['peak_kib']:>10.1f} KiB{extra}", flush=True)
+
+    def drop_index():
+        # Kalter Start: kein geladener Index, keine Cache-Datei
+        lqm._libraries.clear()
+        cache = lqm.index_file_for(library)
+        if cache.exists():
+            cache.unlink()
+
+    record("library_cold", measure(_get(client, "/api/library?limit=50"), 1, setup=drop_index))
+    record("index_load", measure_index_memory(library, repeat))
+    record("library_page", measure(_get(client, "/api/library?limit=50"), repeat))
+    record("library_full", measure(_get(client, "/api/library"), repeat))
+    record("library_search", measure(_get(client, "/api/library?q=daten%20modell&sort=title&limit=50"), repeat))
+    record("history", measure(_get(client, "/api/history"), repeat))
+
+    # Mikro-Benchmarks über eine feste Stichprobe
+    sample = sorted(library.glob("*.bib"))[:MICRO_SAMPLE]
+    contents = [p.read_text(encoding="utf-8") for p in sample]
+    record("parse_bib_entry", measure(lambda: [lqm.parse_bib_entry(c) for c in contents], repeat))
+    rng = random.Random(seed)
+    entries = [synthetic_entry(rng, n) for n in range(MICRO_SAMPLE)]
+    record("generate_bibtex", measure(
+        lambda: [lqm.generate_bibtex(t, f, f"key_{n}") for n, (t, f) in enumerate(entries)], repeat))
+
+    # Einfügen und Entfernen einer \addbibresource-Zeile im Wechsel
+    new_bib = library / "bench_neu.bib"
+    section_id = lqm.DEFAULT_SETTINGS["bib_placement_sections"][2]["id"]
+
+    def add():
+        added, error = lqm.update_latex_main(new_bib, main_tex, section_id)
+        if not added:
+            raise RuntimeError(error)
+
+    def remove():
+        removed, error = lqm.remove_from_latex_main(new_bib.name, main_tex)
+        if not removed:
+            raise RuntimeError(error)
+
+    def ensure_absent():
+        if lqm.latex_main_file(main_tex).has_resource(f"\\addbibresource{{{lqm.bib_rel_path(new_bib, main_tex)}}}"):
+            remove()
+
+    def ensure_present():
+        if not lqm.latex_main_file(main_tex).has_resource(f"\\addbibresource{{{lqm.bib_rel_path(new_bib, main_tex)}}}"):
+            add()
+
+    record("update_latex_main", measure(add, repeat, setup=ensure_absent))
+    record("remove_from_latex_main", measure(remove, repeat, setup=ensure_present))
+
+    # Kommandozeile als eigener Prozess
+    empty = workdir / "lib_leer"
+    empty.mkdir(exist_ok=True)
+    argv, env = cli_command(workdir, "leer", empty, None, "index")
+    record("cli_startup", measure_command(argv, repeat, env))
+    argv, env = cli_command(workdir, str(size), library, main_tex, "index")
+    record("cli_index", measure_command(argv, repeat, env))
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Konsistenz des LaTeX-Modells
+# ---------------------------------------------------------------------------
+def check_latex_model(workdir: pathlib.Path, seed: int, steps: int = MODEL_CHECK_STEPS) -> list:
+    """
+    Zufällige Folge von update_latex_main_groups, remove_from_latex_main und
+    remove_resources (wechselnde Platzierungsoptionen). Nach jedem Schritt
+    müssen die gecachten Werte des Modells einer Neuberechnung entsprechen
+    (stale_cache) und die Datei dem Ergebnis derselben Änderung mit frisch
+    eingelesenem Modell. Gibt die Abweichungen zurück.
+    """
+    from latex_model import latex_main_file
+
+    rng = random.Random(seed)
+    directory = workdir / "modell"
+    directory.mkdir(exist_ok=True)
+    main_tex, ref_tex = directory / "main.tex", directory / "referenz.tex"
+    sections = lqm.DEFAULT_SETTINGS["bib_placement_sections"]
+    lines = ["\\documentclass{article}"]
+    lines += [s["search_text"] for s in sections if rng.random() < 0.7]
+    lines += ["\\begin{document}", "% Bücher", "\\end{document}"]
+    main_tex.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    names = [directory / "lib" / f"q{n}.bib" for n in range(12)]
+    section_ids = [s["id"] for s in sections] + ["", "unbekannt"]
+    placement = dict(lqm.settings.get("addbibresource_placement", {}))
+
+    def step(latex_path, op, args):
+        if op == "add":
+            lqm.update_latex_main_groups(args, latex_path)
+        elif op == "remove":
+            lqm.remove_from_latex_main(args, latex_path)
+        else:
+            lqm.remove_resources(args, latex_path)
+
+    out = []
+    try:
+        for n in range(steps):
+            lqm.settings._data["addbibresource_placement"] = dict(
+                placement, after_last_existing=rng.random() < 0.5)
+            op = rng.choice(("add", "add", "add", "remove", "remove_many"))
+            if op == "add":
+                args = {rng.choice(section_ids): rng.sample(names, rng.randint(1, 3))
+                        for _ in range(rng.randint(1, 3))}
+            elif op == "remove":
+                args = rng.choice(names).name
+            else:
+                args = rng.sample(names, rng.randint(1, 4))
+            # Referenz: gleicher Stand, eindeutige mtime erzwingt frisches Einlesen
+            ref_tex.write_text(main_tex.read_text(encoding="utf-8"), encoding="utf-8")
+            os.utime(ref_tex, ns=(n + 1, n + 1))
+            step(main_tex, op, args)
+            step(ref_tex, op, args)
+            stale = latex_main_file(main_tex).stale_cache()
+            if stale or main_tex.read_bytes() != ref_tex.read_bytes():
+                out.append({"name": "latex_model", "size": 0, "kind": "consistency",
+                            "detail": f"Schritt {n} ({op}): abweichend {stale or 'Dateiinhalt'}"})
+                break
+    finally:
+        lqm.settings._data["addbibresource_placement"] = placement
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Auswertung
+# ---------------------------------------------------------------------------
+def check_thresholds(results: list, thresholds: dict) -> list:
+    """Messungen über dem Grenzwert {name: {größe: max. Median in ms}}."""
+    out = []
+    for r in results:
+        limit = thresholds.get(r["name"], {}).get(str(r["size"]))
+        if limit is not None and r["median_ms"] > limit:
+            out.append({"name": r["name"], "size": r["size"], "median_ms": r["median_ms"],
+                        "limit_ms": limit, "kind": "threshold"})
+    return out
+
+
+def check_baseline(results: list, baseline: dict, tolerance: float) -> list:
+    """Messungen, deren Median das frühere Ergebnis um mehr als tolerance übersteigt."""
+    before = {(r["name"], r["size"]): r for r in baseline.get("results", [])}
+    out = []
+    for r in results:
+        old = before.get((r["name"], r["size"]))
+        if old is None:
+            continue
+        limit = old["median_ms"] * (1 + tolerance)
+        if r["median_ms"] > limit:
+            out.append({"name": r["name"], "size": r["size"], "median_ms": r["median_ms"],
+                        "baseline_ms": old["median_ms"], "limit_ms": round(limit, 3), "kind": "baseline"})
+    return out
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR.parent,
+                              capture_output=True, text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def _peak_rss_kib():
+    """Spitzen-RSS des Prozesses (nicht unter Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks des LaTeX Quellen Managers")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Bibliotheksgrößen, kommagetrennt (Standard: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Läufe je Messung")
+    parser.add_argument("--seed", type=int, default=1, help="Startwert der synthetischen Daten")
+    parser.add_argument("--workdir", help="Arbeitsverzeichnis (Standard: Temp-Verzeichnis, wird wiederverwendet)")
+    parser.add_argument("--out", help="Ergebnis als JSON schreiben")
+    parser.add_argument("--thresholds", default=str(THRESHOLDS_FILE), help="Grenzwerte (JSON)")
+    parser.add_argument("--baseline", help="Früheres Ergebnis zum Vergleich (JSON)")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Erlaubte Verschlechterung gegenüber --baseline (Standard: 0.25 = 25 %%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    workdir = pathlib.Path(args.workdir or os.path.join(tempfile.gettempdir(), "lqm_bench")).resolve()
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    # Einstellungen und Index-Cache ins Arbeitsverzeichnis umleiten
+    lqm_core.SETTINGS_FILE = workdir / "settings.json"
+    lqm_core.CACHE_DIR = workdir / "cache"
+    lqm.settings._data = json.loads(json.dumps(lqm.DEFAULT_SETTINGS))
+    lqm.settings._data["add_date_comment"] = False
+
+    regressions = check_latex_model(workdir, args.seed)
+    results = []
+    for size in sizes:
+        print(f"Bibliothek mit {size} Einträgen …", flush=True)
+        results.extend(bench_size(size, workdir, args.repeat, args.seed))
+
+    if args.thresholds and os.path.exists(args.thresholds):
+        with open(args.thresholds, "r", encoding="utf-8") as f:
+            regressions += check_thresholds(results, json.load(f))
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions += check_baseline(results, json.load(f), args.tolerance)
+
+    report = {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sizes": sizes,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "data_version": DATA_VERSION,
+            "peak_rss_kib": _peak_rss_kib(),
+        },
+        "results": results,
+        "regressions": regressions,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    for r in regressions:
+        if r["kind"] == "consistency":
+            print(f"REGRESSION {r['name']}: {r['detail']} [{r['kind']}]")
+        else:
+            print(f"REGRESSION {r['name']} ({r['size']}): {r['median_ms']} ms > {r['limit_ms']} ms [{r['kind']}]")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+"""
+LaTeX Quellen Manager - Sammeldateien je Abschnitt
+
+Optional hält der Manager pro Abschnitt (Bücher, Online-Quellen, …) eine
+Sammeldatei mit den Einträgen aller zugehörigen .bib-Dateien; die
+LaTeX-Hauptdatei bindet dann nur noch diese wenigen Dateien ein. Jede
+Quelldatei bildet in der Sammeldatei einen Block, der mit einem
+Marker-Kommentar (``%% lqm-quelle: name.bib``) beginnt. Änderungen an
+einzelnen Einträgen werden per Splicing an den bekannten Block-Offsets
+übernommen, neue Einträge ans Ende gestellt; neu erzeugt wird eine
+Sammeldatei nur bei rebuild(). Geschrieben wird immer atomar (temporäre
+Datei + rename), Biber liest also nie eine halbe Sammeldatei.
+"""
+
+import os
+import re
+import threading
+
+# Marker vor jedem Block (Name der Quelldatei)
+MARKER = "%% lqm-quelle: "
+
+# Dateiname der Sammeldatei für Einträge ohne Abschnitt
+GENERAL_FILE = "allgemein.bib"
+
+_MARKER_RE = re.compile(r"^%% lqm-quelle: (.+?)[ \t\r]*$", re.MULTILINE)
+_SECTION_COMMENT = re.compile(r"^% Abschnitt: (.+?)[ \t\r]*$", re.MULTILINE)
+_FILE_RE = re.compile(r"^abschnitt_(.+)\.bib$")
+
+
+def aggregate_filename(section_id: str) -> str:
+    """Dateiname der Sammeldatei eines Abschnitts ("" = ohne Abschnitt)."""
+    if not section_id:
+        return GENERAL_FILE
+    return "abschnitt_" + re.sub(r"[^A-Za-z0-9_\-]", "", section_id) + ".bib"
+
+
+def format_block(name: str, text: str) -> str:
+    return f"{MARKER}{name}\n{text.strip()}\n\n"
+
+
+class AggregateFile:
+    """Per mtime validiertes Modell einer Sammeldatei (Blöcke je Quelldatei)."""
+
+    def __init__(self, path, label: str = ""):
+        self.path = str(path)
+        self.label = label
+        self._stat = None
+        self._content = ""
+        self._spans = {}              # Quelldatei -> (Start, Ende) des Blocks
+
+    def _ensure(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._stat, self._content, self._spans = None, "", {}
+            return
+        key = (st.st_mtime_ns, st.st_size)
+        if key != self._stat:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._set_content(f.read())
+            self._stat = key
+
+    def _set_content(self, content: str):
+        self._content = content
+        self._spans = {}
+        matches = list(_MARKER_RE.finditer(content))
+        for i, m in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+            self._spans[m.group(1)] = (m.start(), end)
+
+    def _header(self) -> str:
+        label = f" für Abschnitt: {self.label}" if self.label else " (ohne Abschnitt)"
+        return (f"% Sammeldatei{label}\n"
+                f"% Wird vom LaTeX Quellen Manager gepflegt – bitte nicht von Hand bearbeiten.\n\n")
+
+    def _write(self, content: str):
+        """Schreibt atomar (Biber soll nie eine halbe Datei lesen)."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp, self.path)
+        self._set_content(content)
+        st = os.stat(self.path)
+        self._stat = (st.st_mtime_ns, st.st_size)
+
+    # ------------------------------------------------------------------
+    # Abfragen
+    # ------------------------------------------------------------------
+    def names(self) -> list:
+        self._ensure()
+        return list(self._spans)
+
+    def __contains__(self, name) -> bool:
+        self._ensure()
+        return name in self._spans
+
+    # ------------------------------------------------------------------
+    # Ändern
+    # ------------------------------------------------------------------
+    def patch(self, upserts=None, removals=()) -> bool:
+        """
+        Ersetzt oder ergänzt Blöcke ({Quelldatei: Eintragstext}) und entfernt
+        Blöcke. Unveränderte Blöcke werden nicht angefasst, neue Blöcke ans
+        Ende gestellt; geschrieben wird atomar. Gibt zurück, ob die Datei
+        geändert wurde.
+        """
+        self._ensure()
+        c = self._content
+        edits, appended = [], []
+        for name in removals:
+            span = self._spans.get(name)
+            if span is not None:
+                edits.append((span[0], span[1], ""))
+        for name, text in (upserts or {}).items():
+            block = format_block(name, text)
+            span = self._spans.get(name)
+            if span is None:
+                appended.append(block)
+            elif c[span[0]:span[1]] != block:
+                edits.append((span[0], span[1], block))
+        if not edits and not appended:
+            return False
+
+        tail = "".join(appended)
+        if c and not c.endswith("\n"):
+            tail = "\n" + tail
+        # Auch reine Anhänge über _write(): ein Anhängen an Ort und Stelle
+        # könnte Biber mitten im Schreiben sehen
+        parts, last = [], len(c)
+        for start, end, text in sorted(edits, reverse=True):
+            parts.append(c[end:last])
+            parts.append(text)
+            last = start
+        parts.append(c[:last] or self._header())
+        self._write("".join(reversed(parts)) + tail)
+        return True
+
+    def rename(self, old: str, new: str) -> bool:
+        """Benennt den Block um (nur die Marker-Zeile wird ersetzt)."""
+        self._ensure()
+        span = self._spans.get(old)
+        if span is None:
+            return False
+        c = self._content
+        line_end = c.find("\n", span[0])
+        line_end = len(c) if line_end == -1 else line_end
+        self._write(c[:span[0]] + MARKER + new + c[line_end:])
+        return True
+
+    def replace_all(self, blocks: dict):
+        """Schreibt die Datei komplett neu ({Quelldatei: Eintragstext})."""
+        self._write(self._header() + "".join(format_block(n, t) for n, t in blocks.items()))
+
+
+class AggregateStore:
+    """
+    Alle Sammeldateien eines Zielverzeichnisses. sections() liefert die
+    aktuellen Abschnitte ({id: label}), enabled() ob der Modus aktiv ist.
+    Jede Quelldatei gehört zu genau einer Sammeldatei.
+    """
+
+    def __init__(self, directory, sections, enabled=lambda: True):
+        self.directory = str(directory)
+        self._sections = sections
+        self._enabled = enabled
+        self._lock = threading.RLock()
+        self._files = {}              # section_id -> AggregateFile
+        self._owner = None            # Quelldatei -> section_id (lazy)
+
+    def path_for(self, section_id: str) -> str:
+        return os.path.join(self.directory, aggregate_filename(section_id))
+
+    def _file(self, section_id: str) -> AggregateFile:
+        agg = self._files.get(section_id)
+        if agg is None:
+            agg = self._files[section_id] = AggregateFile(self.path_for(section_id))
+        agg.label = self._sections().get(section_id, "")
+        return agg
+
+    def _owners(self) -> dict:
+        if self._owner is None:
+            self._owner = {}
+            try:
+                names = sorted(os.listdir(self.directory))
+            except OSError:
+                names = []
+            for fname in names:
+                m = _FILE_RE.match(fname)
+                if m is None and fname != GENERAL_FILE:
+                    continue
+                section_id = m.group(1) if m else ""
+                for name in self._file(section_id).names():
+                    self._owner.setdefault(name, section_id)
+        return self._owner
+
+    def section_of(self, name: str):
+        """Abschnitt der Sammeldatei, die name enthält (None = keine)."""
+        with self._lock:
+            return self._owners().get(name)
+
+    def section_from_text(self, text: str) -> str:
+        """Abschnitt aus dem Kommentar "% Abschnitt: …" einer .bib-Datei ("" = keiner)."""
+        m = _SECTION_COMMENT.search(text)
+        if m is None:
+            return ""
+        by_label = {label: sid for sid, label in self._sections().items()}
+        return by_label.get(m.group(1), "")
+
+    def section_ids(self) -> list:
+        """Abschnitte, deren Sammeldatei Einträge enthält."""
+        with self._lock:
+            return sorted(set(self._owners().values()))
+
+    # ------------------------------------------------------------------
+    # Ändern
+    # ------------------------------------------------------------------
+    def put_many(self, items, section_id=None) -> set:
+        """
+        Übernimmt [(Quelldatei, Text)] in die Sammeldateien, je Datei mit einem
+        Schreibzugriff. Ohne section_id bleibt ein Eintrag in seiner bisherigen
+        Sammeldatei (neue: Abschnitt aus dem Kommentar). Gibt die betroffenen
+        Abschnitte zurück.
+        """
+        with self._lock:
+            owners = self._owners()
+            upserts, removals = {}, {}
+            for name, text in items:
+                old = owners.get(name)
+                new = section_id if section_id is not None else old
+                if new is None:
+                    new = self.section_from_text(text)
+                if old is not None and old != new:
+                    removals.setdefault(old, []).append(name)
+                upserts.setdefault(new, {})[name] = text
+                owners[name] = new
+            for sid in set(upserts) | set(removals):
+                self._file(sid).patch(upserts.get(sid), removals.get(sid, ()))
+            return set(upserts)
+
+    def put(self, name: str, text: str, section_id=None) -> str:
+        """Übernimmt eine Quelldatei; gibt ihren Abschnitt zurück."""
+        return self.put_many([(name, text)], section_id).pop()
+
+    def remove(self, name: str) -> bool:
+        with self._lock:
+            section_id = self._owners().pop(name, None)
+            if section_id is None:
+                return False
+            return self._file(section_id).patch(removals=[name])
+
+    def rename(self, old: str, new: str) -> bool:
+        with self._lock:
+            owners = self._owners()
+            section_id = owners.pop(old, None)
+            if section_id is None:
+                return False
+            owners[new] = section_id
+            return self._file(section_id).rename(old, new)
+
+    def rebuild(self, items, sections=None) -> dict:
+        """
+        Schreibt alle Sammeldateien aus [(Quelldatei, Text)] neu. Zuordnung:
+        sections[name], sonst bisherige Sammeldatei, sonst der Kommentar.
+        Gibt {section_id: Anzahl Einträge} zurück.
+        """
+        with self._lock:
+            owners = self._owners()
+            groups = {sid: {} for sid in set(owners.values())}
+            new_owner = {}
+            for name, text in items:
+                sid = (sections or {}).get(name)
+                if sid is None:
+                    sid = owners.get(name)
+                if sid is None:
+                    sid = self.section_from_text(text)
+                groups.setdefault(sid, {})[name] = text
+                new_owner[name] = sid
+            for sid, blocks in groups.items():
+                if blocks:
+                    self._file(sid).replace_all(blocks)
+                else:
+                    # Leere Sammeldateien entfernen
+                    try:
+                        os.remove(self.path_for(sid))
+                    except FileNotFoundError:
+                        pass
+                    self._files.pop(sid, None)
+            self._owner = new_owner
+            return {sid: len(blocks) for sid, blocks in groups.items() if blocks}
+
+    def on_change(self, path: str, rec):
+        """
+        Listener des Bibliotheks-Index: geänderte Dateien in ihrer Sammeldatei
+        nachführen, gelöschte entfernen, neue per Abschnittskommentar zuordnen.
+        """
+        if not self._enabled():
+            return
+        name = os.path.basename(path)
+        if rec is None:
+            self.remove(name)
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except OSError:
+            return
+        self.put(name, text)
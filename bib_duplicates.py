@@ -0,0 +1,290 @@
+"""
+LaTeX Quellen Manager - Dublettenerkennung
+
+Findet mehrfach erfasste Quellen mit unterschiedlichen Zitierschlüsseln.
+Exakte Treffer über normalisierte DOI (auch aus ``url``) und ISBN (ISBN-10
+wird nach ISBN-13 umgerechnet). Ähnliche Titel werden per MinHash mit
+Banding (LSH) zu Kandidaten gebündelt, sodass nicht jedes Paar verglichen
+werden muss; Kandidaten werden anschließend über die Jaccard-Ähnlichkeit
+der Titel, den Nachnamen des ersten Autors und das Jahr bestätigt.
+"""
+
+import re
+import urllib.parse
+
+# MinHash: Anzahl Bins (One-Permutation-Hashing) und Aufteilung in Bänder
+MINHASH_BINS = 32
+BAND_ROWS = 4
+
+# Mindest-Ähnlichkeit (Jaccard der Titel-3-Gramme) für eine Dublette
+TITLE_SIMILARITY = 0.75
+
+# Größere LSH-Buckets sind zu unspezifisch und werden übersprungen
+MAX_BUCKET_SIZE = 200
+
+# Teile eines Sammelwerks teilen sich dessen ISBN
+PART_TYPES = {"incollection", "inbook", "inproceedings"}
+
+# Haupttitel vor dem Untertitel (nur wenn lang genug)
+MIN_MAIN_TITLE = 10
+
+_DOI_RE = re.compile(r"10\.\d{4,9}/[^\s\"<>{}]+", re.IGNORECASE)
+_ISBN_RE = re.compile(r"(?:97[89][- ]?)?(?:[0-9][- ]?){9}[0-9Xx]")
+_LATEX_ACCENT = re.compile(r"\\[\"'`^~=.]\s*")
+_LATEX_COMMAND = re.compile(r"\\[A-Za-z]+\s*")
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+_UMLAUT_E = re.compile(r"([aou])e")
+_SUBTITLE = re.compile(r"\s*(?::| [-–—] |\. )")
+
+_EMPTY_BIN = -1
+# Multiplikatives Hashing (Fibonacci) der 3-Gramme auf 32 Bit
+_HASH_MULT = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+_BIN_SHIFT = 32 - (MINHASH_BINS.bit_length() - 1)
+
+
+# ---------------------------------------------------------------------------
+# Normalisierung
+# ---------------------------------------------------------------------------
+def normalize_doi(text: str) -> str:
+    """DOI aus einem Feldwert (auch https://doi.org/… oder URL-kodiert), klein geschrieben."""
+    if not text or "10." not in text:
+        return ""
+    m = _DOI_RE.search(urllib.parse.unquote(text))
+    return m.group(0).rstrip(".,;)").lower() if m else ""
+
+
+def isbn10_to_13(isbn10: str) -> str:
+    core = "978" + isbn10[:9]
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(core))
+    return core + str((10 - total % 10) % 10)
+
+
+def normalize_isbns(text: str) -> set:
+    """Alle ISBNs eines Feldwerts als ISBN-13 (Bindestriche und Leerzeichen entfernt)."""
+    out = set()
+    for m in _ISBN_RE.finditer(text or ""):
+        digits = re.sub(r"[- ]", "", m.group(0)).upper()
+        if len(digits) == 10:
+            out.add(isbn10_to_13(digits))
+        elif len(digits) == 13 and "X" not in digits:
+            out.add(digits)
+    return out
+
+
+class DuplicateDetector:
+    """Dublettensuche über Index-Records (EntryRecord aus bib_index)."""
+
+    def __init__(self, normalizer):
+        self._normalize = normalizer
+        self._features = {}           # Pfad -> (Inhalts-Hash, Merkmale), siehe features()
+
+    def fold(self, text: str) -> str:
+        """Kleinschreibung ohne LaTeX, Akzente und Umlaut-Varianten (ü, ue, u)."""
+        if not text:
+            return ""
+        if "\\" in text or "{" in text:
+            text = _LATEX_ACCENT.sub("", text)
+            text = _LATEX_COMMAND.sub(" ", text).replace("{", "").replace("}", "")
+        if not text.isascii():
+            text = self._normalize(text)
+        text = _UMLAUT_E.sub(r"\1", text.lower())
+        return _NON_ALNUM.sub(" ", text).strip()
+
+    def main_title(self, title: str) -> str:
+        """Titel ohne Untertitel (nach ':' oder ' - '), gefaltet."""
+        parts = _SUBTITLE.split(title or "", maxsplit=1)
+        main = self.fold(parts[0])
+        if len(main) >= MIN_MAIN_TITLE:
+            return main
+        return self.fold(title)
+
+    def first_author(self, author: str) -> str:
+        """Nachname des ersten Autors, gefaltet."""
+        first = re.split(r"\s+and\s+", (author or "").strip(), maxsplit=1)[0]
+        if "," in first:
+            name = first.split(",", 1)[0]
+        else:
+            words = first.split()
+            name = words[-1] if words else ""
+        return self.fold(name).replace(" ", "")
+
+    def features(self, rec) -> tuple:
+        """
+        (DOI, ISBNs, Haupttitel, Autor, Jahr, LSH-Bänder) eines Records.
+        Gecacht über den Inhalts-Hash, damit erneute Suchen nur geänderte
+        Dateien neu auswerten.
+        """
+        digest = rec.hash
+        cached = self._features.get(rec.path)
+        if cached is not None and digest is not None and cached[0] == digest:
+            return cached[1]
+
+        doi = normalize_doi(rec.doi) or normalize_doi(rec.url)
+        isbns = ()
+        if rec.type not in PART_TYPES:
+            isbns = tuple(normalize_isbns(rec.isbn))
+        title = self.main_title(rec.title)
+        author = self.first_author(rec.author or rec.fields.get("editor", ""))
+        bands = ()
+        signature = _minhash(_shingles(title)) if title else None
+        if signature is not None:
+            # Bänder als Hash des Tupels (Hash von int-Tupeln ist deterministisch)
+            bands = tuple(hash(signature[b:b + BAND_ROWS]) for b in range(0, MINHASH_BINS, BAND_ROWS))
+        features = (doi, isbns, title, author, rec.year, bands)
+        if digest is not None:
+            self._features[rec.path] = (digest, features)
+        return features
+
+    # ------------------------------------------------------------------
+    # Suche
+    # ------------------------------------------------------------------
+    def find(self, records) -> list:
+        """
+        Gruppiert Dubletten. Gibt [{"paths": [...], "reasons": [...]}] zurück,
+        größte Gruppen zuerst; reasons aus "doi", "isbn", "title".
+        """
+        records = list(records)
+        n = len(records)
+        parent = list(range(n))
+        reasons = {}
+
+        def find_root(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(i, j, reason):
+            a, b = find_root(i), find_root(j)
+            if a != b:
+                if a > b:
+                    a, b = b, a
+                parent[b] = a
+                reasons.setdefault(a, set()).update(reasons.pop(b, ()))
+            reasons.setdefault(a, set()).add(reason)
+
+        by_doi, by_isbn, by_title = {}, {}, {}
+        titles, authors, years = [], [], []
+        buckets = {}
+        for i, rec in enumerate(records):
+            doi, isbns, title, author, year, bands = self.features(rec)
+            if doi:
+                _join(by_doi, doi, i, union, "doi")
+            for isbn in isbns:
+                _join(by_isbn, isbn, i, union, "isbn")
+            titles.append(title)
+            authors.append(author)
+            years.append(year)
+            if title:
+                _join(by_title, (title, author, year), i, union, "title")
+            for b, band in enumerate(bands):
+                buckets.setdefault((b, band), []).append(i)
+
+        # Merkmale gelöschter Dateien verwerfen
+        if len(self._features) > n:
+            current = {rec.path for rec in records}
+            for path in [p for p in self._features if p not in current]:
+                del self._features[path]
+
+        # Kandidaten aus den LSH-Buckets bestätigen
+        shingles = {}
+        checked = set()
+        for members in buckets.values():
+            if len(members) < 2 or len(members) > MAX_BUCKET_SIZE:
+                continue
+            for i, j in _candidate_pairs(members, authors, years):
+                if find_root(i) == find_root(j) or (i, j) in checked:
+                    continue
+                checked.add((i, j))
+                si = shingles.get(i) or shingles.setdefault(i, _shingles(titles[i]))
+                sj = shingles.get(j) or shingles.setdefault(j, _shingles(titles[j]))
+                if len(si & sj) >= TITLE_SIMILARITY * len(si | sj):
+                    union(i, j, "title")
+
+        groups = {}
+        for i in range(n):
+            root = find_root(i)
+            if root in reasons:
+                groups.setdefault(root, []).append(records[i].path)
+        clusters = [{"paths": paths, "reasons": sorted(reasons[root])}
+                    for root, paths in groups.items() if len(paths) > 1]
+        clusters.sort(key=lambda c: (-len(c["paths"]), c["paths"][0]))
+        return clusters
+
+
+def _join(table: dict, key, i: int, union, reason: str):
+    first = table.setdefault(key, i)
+    if first != i:
+        union(first, i, reason)
+
+
+def _candidate_pairs(members: list, authors: list, years: list):
+    """
+    Paare (i, j) eines Buckets mit verträglichem Autor und Jahr (gleich oder
+    unbekannt). Vorsortiert nach (Autor, Jahr), statt alle Paare zu prüfen.
+    """
+    groups, partial = {}, []
+    for i in members:
+        if authors[i] and years[i]:
+            groups.setdefault((authors[i], years[i]), []).append(i)
+        else:
+            partial.append(i)
+    for group in groups.values():
+        for x, i in enumerate(group):
+            for j in group[x + 1:]:
+                yield (i, j) if i < j else (j, i)
+    # Einträge ohne Autor oder Jahr passen zu mehreren Gruppen
+    for x, i in enumerate(partial):
+        for j in partial[x + 1:] + [m for m in members if authors[m] and years[m]]:
+            if _compatible(authors[i], authors[j]) and _compatible(years[i], years[j]):
+                yield (i, j) if i < j else (j, i)
+
+
+def _compatible(a: str, b: str) -> bool:
+    """Gleich oder mindestens eine Seite unbekannt."""
+    return not a or not b or a == b
+
+
+class _TrigramHashes(dict):
+    """Cache: 3-Gramm -> 32-Bit-Hash (gefaltete Titel kennen nur [0-9a-z ])."""
+
+    def __missing__(self, trigram):
+        v = int.from_bytes(trigram.encode("utf-8"), "big")
+        h = self[trigram] = ((v * _HASH_MULT) & _MASK64) >> 32
+        return h
+
+
+_TRIGRAMS = _TrigramHashes()
+
+
+def _shingles(text: str) -> set:
+    """Gehashte Zeichen-3-Gramme (mit Wortgrenzen) eines gefalteten Titels."""
+    text = f" {text} "
+    return {_TRIGRAMS[text[k:k + 3]] for k in range(len(text) - 2)}
+
+
+def _minhash(shingles: set):
+    """
+    MinHash-Signatur per One-Permutation-Hashing über die gehashten 3-Gramme:
+    die oberen Bits wählen den Bin, gespeichert wird das Minimum je Bin. Leere
+    Bins übernehmen den nächsten belegten Bin (Rotation), damit kurze Titel
+    nicht über leere Bins kollidieren.
+    """
+    if not shingles:
+        return None
+    mins = [_EMPTY_BIN] * MINHASH_BINS
+    # Absteigend sortiert: die letzte Zuweisung je Bin ist dessen Minimum
+    for h in sorted(shingles, reverse=True):
+        mins[h >> _BIN_SHIFT] = h
+    if _EMPTY_BIN not in mins:
+        return tuple(mins)
+    filled = list(mins)
+    for b in range(MINHASH_BINS):
+        if mins[b] != _EMPTY_BIN:
+            continue
+        step = 1
+        while mins[(b + step) % MINHASH_BINS] == _EMPTY_BIN:
+            step += 1
+        filled[b] = mins[(b + step) % MINHASH_BINS] + (step << 32)
+    return tuple(filled)
@@ -0,0 +1,259 @@
+"""
+LaTeX Quellen Manager - Versionsspeicher der .bib-Dateien
+
+Jede Änderung an einer .bib-Datei (Speichern, Bearbeiten, Umbenennen,
+Löschen, Import, Ergänzen, Wiederherstellen) wird im Verzeichnis
+``.lqm_historie`` des Zielverzeichnisses festgehalten:
+
+- ``objekte/ab/cdef…``: Inhalte, zlib-komprimiert und nach ihrem
+  SHA-256 benannt. Gleiche Inhalte werden nur einmal gespeichert.
+- ``protokoll.jsonl``: Operationsprotokoll. Es wird nur angehängt, eine
+  Zeile je Operation: ts, op, name, blob (None = gelöscht), from (alter
+  Name bei Umbenennung); seq ist die laufende Nummer der Zeile. Zeilen,
+  die ein anderer Prozess (z.B. die Kommandozeile) anhängt, werden beim
+  nächsten Zugriff nachgelesen.
+
+Der Speicherbedarf wächst also mit dem einmaligen Inhalt, nicht mit der
+Anzahl der Operationen. Wurde eine Datei außerhalb des Managers geändert,
+wird vor der nächsten Operation ihr bisheriger Stand als "baseline"
+nachgetragen, damit er wiederherstellbar bleibt.
+"""
+
+import os
+import json
+import zlib
+import time
+import hashlib
+import threading
+
+# Verzeichnis im Zielverzeichnis
+HISTORY_DIR = ".lqm_historie"
+
+# Kompressionsstufe der Objekte
+COMPRESS_LEVEL = 6
+
+LOG_FILE = "protokoll.jsonl"
+OBJECT_DIR = "objekte"
+
+SAVE = "save"
+EDIT = "edit"
+RENAME = "rename"
+DELETE = "delete"
+IMPORT = "import"
+ENRICH = "enrich"
+RESTORE = "restore"
+BASELINE = "baseline"
+
+
+def blob_id(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class HistoryStore:
+    """Inhaltsadressierter Versionsspeicher eines Zielverzeichnisses (thread-sicher)."""
+
+    def __init__(self, root):
+        self.root = str(root)
+        self._lock = threading.Lock()
+        self._log = None              # [Operation], Index = seq - 1
+        self._by_name = {}            # Dateiname -> [seq]
+        self._blobs = set()           # bekannte Objekte
+        self._offset = 0              # gelesene Bytes des Protokolls
+
+    # -- Laden ---------------------------------------------------------------
+    def _ensure(self):
+        if self._log is None:
+            self._log, self._by_name, self._offset = [], {}, 0
+            objects = os.path.join(self.root, OBJECT_DIR)
+            self._blobs = set()
+            if os.path.isdir(objects):
+                for sub in os.scandir(objects):
+                    if sub.is_dir():
+                        self._blobs.update(sub.name + e.name for e in os.scandir(sub.path)
+                                           if not e.name.endswith(".tmp"))
+        self._sync()
+
+    def _sync(self):
+        """
+        Liest neu angehängte Zeilen des Protokolls, auch die anderer Prozesse
+        (z.B. der Kommandozeile); so bleiben die Nummern (seq) gleich denen,
+        die ein Neustart ergäbe.
+        """
+        path = os.path.join(self.root, LOG_FILE)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        if size == self._offset:
+            return
+        if size < self._offset:
+            # Protokoll ersetzt oder gekürzt: komplett neu laden
+            self._log = None
+            self._ensure()
+            return
+        with open(path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read(size - self._offset)
+        # Nur vollständige Zeilen; eine noch nicht fertig geschriebene bleibt liegen
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            try:
+                op = json.loads(line)
+            except ValueError:
+                # Abgebrochene Zeile (Absturz beim Anhängen)
+                continue
+            self._index(op)
+            if op.get("blob"):
+                self._blobs.add(op["blob"])
+        self._offset += end
+
+    def _index(self, op: dict):
+        op["seq"] = len(self._log) + 1
+        self._log.append(op)
+        self._by_name.setdefault(op["name"], []).append(op["seq"])
+
+    # -- Objekte -------------------------------------------------------------
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, OBJECT_DIR, digest[:2], digest[2:])
+
+    def _put_blob(self, data: bytes) -> str:
+        digest = blob_id(data)
+        if digest not in self._blobs:
+            path = self._object_path(digest)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(zlib.compress(data, COMPRESS_LEVEL))
+            os.replace(tmp, path)
+            self._blobs.add(digest)
+        return digest
+
+    def blob(self, digest: str) -> bytes:
+        """Inhalt eines Objekts (KeyError, wenn unbekannt)."""
+        try:
+            with open(self._object_path(digest), "rb") as f:
+                return zlib.decompress(f.read())
+        except (OSError, zlib.error, ValueError):
+            raise KeyError(digest) from None
+
+    # -- Protokoll -----------------------------------------------------------
+    def _head(self, name: str):
+        """Letzter bekannter Stand (Objekt oder None) einer Datei."""
+        seqs = self._by_name.get(name)
+        return self._log[seqs[-1] - 1]["blob"] if seqs else None
+
+    def _append(self, ops: list):
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, LOG_FILE), "a", encoding="utf-8") as f:
+            for op in ops:
+                f.write(json.dumps(op, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        # Über das Protokoll einlesen: dazwischen angehängte Zeilen anderer
+        # Prozesse bekommen so dieselben Nummern wie nach einem Neustart
+        self._sync()
+
+    def record(self, op: str, changes, previous=None) -> int:
+        """
+        Hält eine Operation für [(Name, Inhalt | None)] fest (None = gelöscht).
+        previous: {Name: bisheriger Inhalt} aus der Sicht des Aufrufers; weicht
+        er vom letzten bekannten Stand ab, wird er vorher als "baseline"
+        gespeichert. Unveränderte Inhalte werden übersprungen. Bei RENAME
+        ist changes [(neuer Name, Inhalt, alter Name)]. Gibt die Anzahl der
+        festgehaltenen Operationen zurück.
+        """
+        previous = previous or {}
+        ts = time.time()
+        with self._lock:
+            self._ensure()
+            ops = []
+            for change in changes:
+                name, data = change[0], change[1]
+                old_name = change[2] if len(change) > 2 else None
+                source = old_name or name
+                before = previous.get(source)
+                if before is not None:
+                    digest = self._put_blob(before)
+                    if self._head(source) != digest:
+                        ops.append({"ts": ts, "op": BASELINE, "name": source, "blob": digest})
+                digest = self._put_blob(data) if data is not None else None
+                if old_name is None and before is not None and blob_id(before) == digest:
+                    continue
+                entry = {"ts": ts, "op": op, "name": name, "blob": digest}
+                if old_name is not None:
+                    entry["from"] = old_name
+                    # Der alte Name gilt danach als entfernt
+                    ops.append({"ts": ts, "op": op, "name": old_name, "blob": None, "to": name})
+                ops.append(entry)
+            if ops:
+                self._append(ops)
+            return len(ops)
+
+    # -- Abfragen ------------------------------------------------------------
+    def get(self, seq: int):
+        """Operation mit Nummer seq (oder None)."""
+        with self._lock:
+            self._ensure()
+            if 1 <= seq <= len(self._log):
+                return dict(self._log[seq - 1])
+            return None
+
+    def versions(self, name: str) -> list:
+        """
+        Alle Stände einer Datei, neueste zuerst; über Umbenennungen hinweg
+        werden auch die Stände unter früheren Namen geliefert.
+        """
+        with self._lock:
+            self._ensure()
+            result, seen = [], set()
+            pending = [(name, None)]
+            while pending:
+                current, before = pending.pop()
+                if current in seen:
+                    continue
+                seen.add(current)
+                for seq in self._by_name.get(current, ()):
+                    if before is not None and seq >= before:
+                        break
+                    op = self._log[seq - 1]
+                    if op.get("to"):
+                        continue
+                    result.append(dict(op))
+                    if op.get("from"):
+                        pending.append((op["from"], seq))
+            result.sort(key=lambda op: op["seq"], reverse=True)
+            return result
+
+    def files(self) -> list:
+        """Alle Dateien mit Historie: name, deleted, versions, seq und ts des letzten Stands."""
+        with self._lock:
+            self._ensure()
+            result = []
+            for name, seqs in self._by_name.items():
+                last = self._log[seqs[-1] - 1]
+                result.append({
+                    "name": name,
+                    "deleted": last["blob"] is None,
+                    "renamed_to": last.get("to"),
+                    "versions": sum(1 for s in seqs if self._log[s - 1]["blob"] is not None),
+                    "seq": last["seq"],
+                    "ts": last["ts"],
+                })
+            result.sort(key=lambda f: f["seq"], reverse=True)
+            return result
+
+    def stats(self) -> dict:
+        """Operationen, Objekte und belegter Speicher (komprimiert) in Bytes."""
+        with self._lock:
+            self._ensure()
+            size = 0
+            for digest in self._blobs:
+                try:
+                    size += os.path.getsize(self._object_path(digest))
+                except OSError:
+                    pass
+            try:
+                size += os.path.getsize(os.path.join(self.root, LOG_FILE))
+            except OSError:
+                pass
+            return {"operations": len(self._log), "objects": len(self._blobs), "bytes": size}
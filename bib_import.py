@@ -0,0 +1,224 @@
+"""
+LaTeX Quellen Manager - Massenimport
+
+Importiert große .bib-Dateien (z.B. ein ``references.bib`` mit zehntausenden
+Einträgen) Eintrag für Eintrag über den Streaming-Tokenizer, ohne die Datei
+komplett in den Speicher zu laden. Die Einträge werden entweder in einzelne
+Dateien aufgeteilt oder gesammelt in eine Datei geschrieben; doppelte
+Zitierschlüssel werden mit ``_a``, ``_b``, … eindeutig gemacht.
+"""
+
+import os
+import re
+import pathlib
+
+from bib_parser import iter_entries, DEFAULT_MACROS
+from bib_keys import unique_key, key_suffix
+
+MODES = ("split", "grouped")
+
+# Anzahl Einträge, die gesammelt geschrieben werden
+BATCH_SIZE = 500
+
+# Maximale Anzahl umbenannter Schlüssel im Ergebnis (der Rest wird nur gezählt)
+MAX_REPORTED_RENAMES = 200
+
+_KEY_POS = re.compile(rb"@[ \t\r\n]*[A-Za-z]+[ \t\r\n]*[{(][ \t\r\n]*")
+# Unverklammerter Wert (Makro) oder #-Verkettung im Quelltext
+_USES_MACRO = re.compile(rb"=[ \t\r\n]*[A-Za-z_]|#")
+
+
+class BulkImporter:
+    """
+    Schreibt die Einträge einer BibTeX-Quelle nach ``target_dir``.
+    mode="split": eine Datei pro Eintrag (Name über filename_factory),
+    mode="grouped": alle Einträge in eine Datei ``group_name``.
+    on_written: wird nach jedem geschriebenen Paket mit [(Pfad, Inhalt als
+    bytes)] aufgerufen (z.B. für den Versionsspeicher), damit nicht der
+    ganze Import auf einmal im Speicher liegen muss.
+    """
+
+    def __init__(self, target_dir: pathlib.Path, key_factory, filename_factory,
+                 mode: str = "split", taken_keys=(), header: str = "",
+                 group_name: str = "import.bib", batch_size: int = BATCH_SIZE,
+                 on_written=None):
+        if mode not in MODES:
+            raise ValueError(f"Unbekannter Importmodus: {mode}")
+        self.target_dir = pathlib.Path(target_dir)
+        self.mode = mode
+        self.header = header
+        self.batch_size = max(int(batch_size), 1)
+        self._key_factory = key_factory
+        self._filename_factory = filename_factory
+        self._on_written = on_written
+        self._keys = {k.casefold() for k in taken_keys if k}
+        self._filenames = set()
+        self._pending = []            # [(Dateiname, Text)] bzw. [Text] im grouped-Modus
+        self._group_file = None
+        self.group_name = group_name
+        self.written = []             # Pfade aller neu geschriebenen Dateien
+        self.stats = {"imported": 0, "renamed": 0, "generated_keys": 0}
+        self.renames = []             # [{"old": ..., "new": ...}], gekürzt
+
+    # ------------------------------------------------------------------
+    # Ablauf
+    # ------------------------------------------------------------------
+    def run(self, source) -> dict:
+        """Importiert alle Einträge aus source (Pfad, Dateiobjekt oder bytes)."""
+        self.target_dir.mkdir(parents=True, exist_ok=True)
+        self._filenames = {n.casefold() for n in os.listdir(self.target_dir)}
+        if self.mode == "grouped":
+            self._open_group()
+        macros = dict(DEFAULT_MACROS)
+        try:
+            for entry in iter_entries(source, macros, keep_raw=True):
+                self._add(entry)
+                if len(self._pending) >= self.batch_size:
+                    self._flush()
+            self._flush()
+        except BaseException:
+            self._abort()
+            raise
+        self._close_group()
+        return self.result()
+
+    def result(self) -> dict:
+        out = dict(self.stats)
+        out["files"] = len(self.written)
+        out["renames"] = self.renames
+        return out
+
+    # ------------------------------------------------------------------
+    # Einträge
+    # ------------------------------------------------------------------
+    def _add(self, entry):
+        key = entry.key
+        if not key:
+            fields = entry.fields
+            key = self._key_factory(fields.get("title", ""), fields.get("author", ""),
+                                    fields.get("date", "") or fields.get("year", ""))
+            self.stats["generated_keys"] += 1
+        new_key = self._unique_key(key)
+        if new_key != key and entry.key:
+            self.stats["renamed"] += 1
+            if len(self.renames) < MAX_REPORTED_RENAMES:
+                self.renames.append({"old": entry.key, "new": new_key})
+
+        text = self._entry_text(entry, new_key)
+        if self.mode == "split":
+            filename = self._filename_factory(new_key)
+            self._filenames.add(filename.casefold())
+            self._pending.append((filename, self.header + text + "\n"))
+        else:
+            self._pending.append(text + "\n\n")
+        self._keys.add(new_key.casefold())
+        self.stats["imported"] += 1
+
+    def _unique_key(self, key: str) -> str:
+        """Hängt _a, _b, … an, bis Schlüssel (und im split-Modus der Dateiname) frei sind."""
+        return unique_key(key, self._taken)
+
+    def _taken(self, key: str) -> bool:
+        if key.casefold() in self._keys:
+            return True
+        return self.mode == "split" and self._filename_factory(key).casefold() in self._filenames
+
+    def _entry_text(self, entry, key: str) -> str:
+        return entry_source(entry, key)
+
+    # ------------------------------------------------------------------
+    # Schreiben
+    # ------------------------------------------------------------------
+    def _flush(self):
+        if not self._pending:
+            return
+        if self.mode == "split":
+            batch = []
+            for filename, text in self._pending:
+                path = self.target_dir / filename
+                # "x": niemals eine vorhandene Datei überschreiben
+                with open(path, "x", encoding="utf-8") as f:
+                    f.write(text)
+                self.written.append(path)
+                batch.append((path, text.encode("utf-8")))
+            if self._on_written is not None:
+                self._on_written(batch)
+        else:
+            self._group_file.write("".join(self._pending))
+        self._pending = []
+
+    def _group_path(self) -> pathlib.Path:
+        stem = self.group_name[:-4] if self.group_name.endswith(".bib") else self.group_name
+        stem = self._filename_factory(stem)[:-4] or "import"
+        name, n = stem + ".bib", 0
+        while name.casefold() in self._filenames:
+            name = f"{stem}_{key_suffix(n)}.bib"
+            n += 1
+        return self.target_dir / name
+
+    def _open_group(self):
+        self.group_path = self._group_path()
+        self._group_tmp = self.group_path.with_suffix(".bib.tmp")
+        self._group_file = open(self._group_tmp, "w", encoding="utf-8")
+        if self.header:
+            self._group_file.write(self.header + "\n")
+
+    def _close_group(self):
+        if self._group_file is None:
+            return
+        self._group_file.close()
+        self._group_file = None
+        os.replace(self._group_tmp, self.group_path)
+        self.written.append(self.group_path)
+        if self._on_written is not None:
+            self._on_written([(self.group_path, self.group_path.read_bytes())])
+
+    def _abort(self):
+        if self._group_file is not None:
+            self._group_file.close()
+            self._group_file = None
+            try:
+                os.remove(self._group_tmp)
+            except OSError:
+                pass
+
+
+def entry_source(entry, key: str = None) -> str:
+    """
+    Quelltext eines mit keep_raw=True gelesenen Eintrags, optional mit neuem
+    Schlüssel. Einträge mit @string-Makros werden aufgelöst neu geschrieben,
+    da die Makro-Definitionen nicht mitkopiert werden.
+    """
+    key = key or entry.key
+    raw = entry.raw
+    if not entry.simple and _USES_MACRO.search(raw):
+        return format_entry(entry.entry_type, key, entry.fields)
+    if key != entry.key:
+        m = _KEY_POS.match(raw)
+        old = entry.key.encode("utf-8")
+        raw = raw[:m.end()] + key.encode("utf-8") + raw[m.end() + len(old):]
+    return raw.decode("utf-8", errors="replace")
+
+
+def format_entry(entry_type: str, key: str, fields: dict) -> str:
+    """Schreibt einen Eintrag mit bereits aufgelösten Feldwerten."""
+    lines = [f"@{entry_type}{{{key},"]
+    for k, v in fields.items():
+        if not _balanced(v):
+            v = v.replace("{", "\\{").replace("}", "\\}")
+        lines.append(f"  {k:<14} = {{{v}}},")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def _balanced(text: str) -> bool:
+    depth = 0
+    for c in text:
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth < 0:
+                return False
+    return depth == 0
+
@@ -0,0 +1,436 @@
+"""
+LaTeX Quellen Manager - Bibliotheks-Index
+
+Persistenter Index über alle .bib-Dateien eines Zielverzeichnisses.
+Jede Datei wird über Pfad, mtime, Größe und Inhalts-Hash erfasst; beim
+Aktualisieren genügt ein einziger stat-Durchlauf, nur geänderte Dateien
+werden neu gelesen und geparst.
+
+Die Records sind kompakte Objekte mit __slots__: Feldwerte liegen in einem
+Tupel, die Feldnamen in einem Tupel, das sich alle Einträge mit derselben
+Feldfolge teilen; Typ und Jahr sind internierte Strings. In das JSON-Format
+der API werden sie erst mit record_to_json() umgewandelt.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import datetime
+import pathlib
+import threading
+from collections import OrderedDict
+
+INDEX_VERSION = 4
+
+# Felder aus parse_bib_entry(), die pro Datei im Index landen
+ENTRY_FIELDS = ("type", "key", "title", "author", "year", "publisher",
+                "isbn", "url", "doi", "journal")
+
+# Anzahl der Dateiinhalte, die im Speicher gehalten werden
+CONTENT_CACHE_SIZE = 512
+
+# Felder, die bei der Textsuche der Bibliothek durchsucht werden
+QUERY_FIELDS = ("title", "author", "key", "publisher", "name")
+
+# Sortierungen der Bibliotheks-Ansicht: Schlüsselfunktion und Richtung
+SORT_KEYS = {
+    "modified":  (lambda r: r.mtime, True),
+    "key":       (lambda r: r.key.casefold(), False),
+    "title":     (lambda r: r.title.casefold(), False),
+    "author":    (lambda r: r.author.casefold(), False),
+    "year-desc": (lambda r: r.year or "0", True),
+    "year-asc":  (lambda r: r.year or "0", False),
+}
+
+# Geteilte Feldnamen-Tupel (die meisten Einträge haben dieselbe Feldfolge)
+_LAYOUTS = {}
+
+
+def content_hash(data: bytes) -> str:
+    """SHA-1 über den Rohinhalt einer Datei."""
+    return hashlib.sha1(data).hexdigest()
+
+
+def format_mtime(mtime_ns: int) -> str:
+    return datetime.datetime.fromtimestamp(mtime_ns / 1e9).strftime("%d.%m.%Y %H:%M")
+
+
+def _layout(names: tuple) -> tuple:
+    layout = _LAYOUTS.get(names)
+    if layout is None:
+        layout = _LAYOUTS.setdefault(names, tuple(sys.intern(n) for n in names))
+    return layout
+
+
+class EntryRecord:
+    """
+    Index-Record einer .bib-Datei: stat-Daten, Inhalts-Hash, Typ, Schlüssel
+    und Felder des ersten Eintrags sowie die Schlüssel aller Einträge.
+    title, author, … (ENTRY_FIELDS) verweisen auf dieselben Strings wie die
+    Feldwerte und kosten nur je einen Zeiger.
+    """
+
+    __slots__ = ("path", "mtime", "size", "hash", "type", "key", "year", "_keys",
+                 "_names", "_values", "title", "author", "publisher", "isbn", "url", "doi", "journal")
+
+    def __init__(self, path: str, mtime: int, size: int, digest: str, entry_type: str,
+                 key: str, year: str, keys, fields: dict):
+        self.path = path
+        self.mtime = mtime
+        self.size = size
+        self.hash = digest
+        self.type = sys.intern(entry_type)
+        self.key = key
+        self.year = sys.intern(year)
+        keys = tuple(keys)
+        # Häufigster Fall: nur ein Eintrag in der Datei
+        self._keys = None if keys == ((key,) if key else ()) else keys
+        self._names = _layout(tuple(fields))
+        self._values = tuple(fields.values())
+        get = fields.get
+        self.title = get("title", "")
+        self.author = get("author", "")
+        self.publisher = get("publisher", "")
+        self.isbn = get("isbn", "")
+        self.url = get("url", "")
+        self.doi = get("doi", "")
+        self.journal = get("journal", "")
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+    @property
+    def keys(self) -> tuple:
+        if self._keys is not None:
+            return self._keys
+        return (self.key,) if self.key else ()
+
+    @property
+    def fields(self) -> dict:
+        """Felder des ersten Eintrags (neues dict bei jedem Zugriff)."""
+        return dict(zip(self._names, self._values))
+
+    def to_state(self) -> list:
+        """Kompakte Form für die Index-Datei."""
+        return [self.mtime, self.size, self.hash, self.type, self.key, self.year,
+                self._keys, self.fields]
+
+    @classmethod
+    def from_state(cls, path: str, state: list) -> "EntryRecord":
+        mtime, size, digest, entry_type, key, year, keys, fields = state
+        return cls(path, mtime, size, digest, entry_type, key, year,
+                   keys if keys is not None else ((key,) if key else ()), fields)
+
+
+class LibraryIndex:
+    """Index aller .bib-Dateien in ``target_dir``, gespeichert in ``index_file``."""
+
+    def __init__(self, target_dir: pathlib.Path, index_file: pathlib.Path, parser):
+        self.target_dir = pathlib.Path(target_dir)
+        self.index_file = pathlib.Path(index_file)
+        self._parse = parser
+        self._lock = threading.RLock()
+        self._records = {}            # path -> EntryRecord
+        self._sorted = {}             # Cache: sortierte Records je Sortierung
+        self._facets = None           # Cache: Anzahl je Typ / Jahr
+        self._content = OrderedDict() # path -> (hash, text), LRU
+        self._dirty = False
+        self._listeners = []          # fn(path, record|None) bei jeder Änderung
+        self.generation = 0           # wird bei jeder Änderung erhöht
+
+    def add_listener(self, fn):
+        """Registriert fn(path, record), aufgerufen bei neu geparsten (record) oder entfernten (None) Dateien."""
+        self._listeners.append(fn)
+
+    def _notify(self, path: str, rec):
+        for fn in self._listeners:
+            fn(path, rec)
+
+    # ------------------------------------------------------------------
+    # Persistenz
+    # ------------------------------------------------------------------
+    def load(self):
+        """Lädt den gespeicherten Index (falls vorhanden und passend)."""
+        with self._lock:
+            try:
+                with open(self.index_file, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+            except (OSError, ValueError):
+                return
+            if stored.get("version") != INDEX_VERSION:
+                return
+            if stored.get("target_directory") != str(self.target_dir):
+                return
+            self._records = {path: EntryRecord.from_state(path, state)
+                             for path, state in stored.get("files", {}).items()}
+            self._changed()
+            self._dirty = False
+
+    def save(self):
+        """Schreibt den Index atomar (temp-Datei + rename), wenn er sich geändert hat."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "version": INDEX_VERSION,
+                "target_directory": str(self.target_dir),
+                "files": {path: rec.to_state() for path, rec in self._records.items()},
+            }
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_file.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, self.index_file)
+            self._dirty = False
+
+    # ------------------------------------------------------------------
+    # Aktualisierung
+    # ------------------------------------------------------------------
+    def refresh(self) -> bool:
+        """
+        Gleicht den Index mit dem Dateisystem ab (ein stat pro Datei).
+        Gibt True zurück, wenn sich etwas geändert hat.
+        """
+        with self._lock:
+            changed = False
+            seen = set()
+            try:
+                entries = list(os.scandir(self.target_dir))
+            except OSError:
+                entries = []
+            for de in entries:
+                if not de.name.endswith(".bib"):
+                    continue
+                try:
+                    if not de.is_file():
+                        continue
+                    st = de.stat()
+                except OSError:
+                    continue
+                path = str(self.target_dir / de.name)
+                seen.add(path)
+                rec = self._records.get(path)
+                if rec and rec.mtime == st.st_mtime_ns and rec.size == st.st_size:
+                    continue
+                if self._index_file(path, st, rec):
+                    changed = True
+
+            for path in [p for p in self._records if p not in seen]:
+                self._drop(path)
+                changed = True
+
+            if changed:
+                self._changed()
+            self.save()
+            return changed
+
+    def update_path(self, path) -> bool:
+        """Indiziert eine einzelne Datei neu (nach Speichern/Umbenennen)."""
+        path = str(path)
+        if not self._belongs(path):
+            return False
+        with self._lock:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return self.remove_path(path)
+            changed = self._index_file(path, st, self._records.get(path))
+            if changed:
+                self._changed()
+            return changed
+
+    def sync_path(self, path) -> bool:
+        """Wie update_path, liest die Datei aber nur bei geändertem stat neu (für den Watcher)."""
+        path = str(path)
+        if not self._belongs(path):
+            return False
+        with self._lock:
+            rec = self._records.get(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                return self.remove_path(path)
+            if rec and rec.mtime == st.st_mtime_ns and rec.size == st.st_size:
+                return False
+            changed = self._index_file(path, st, rec)
+            if changed:
+                self._changed()
+            return changed
+
+    def remove_path(self, path) -> bool:
+        """Entfernt eine Datei aus dem Index (nach Löschen/Umbenennen)."""
+        path = str(path)
+        with self._lock:
+            if path not in self._records:
+                return False
+            self._drop(path)
+            self._changed()
+            return True
+
+    def _index_file(self, path: str, st, rec) -> bool:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            if rec:
+                self._drop(path)
+                return True
+            return False
+        digest = content_hash(data)
+        text = data.decode("utf-8", errors="replace")
+        self._remember_content(path, digest, text)
+
+        if rec and rec.hash == digest:
+            # Nur Zeitstempel geändert – kein erneutes Parsen nötig
+            rec.mtime = st.st_mtime_ns
+            rec.size = st.st_size
+            self._dirty = True
+            return True
+
+        entry = self._parse(text)
+        new_rec = EntryRecord(path, st.st_mtime_ns, st.st_size, digest, entry.get("type", ""),
+                              entry.get("key", ""), entry.get("year", ""), entry.get("keys", []),
+                              entry.get("fields", {}))
+        self._records[path] = new_rec
+        self._dirty = True
+        self._notify(path, new_rec)
+        return True
+
+    def _drop(self, path: str):
+        if self._records.pop(path, None) is not None:
+            self._notify(path, None)
+        self._content.pop(path, None)
+        self._dirty = True
+
+    def _changed(self):
+        self._sorted = {}
+        self._facets = None
+        self.generation += 1
+
+    # ------------------------------------------------------------------
+    # Abfragen
+    # ------------------------------------------------------------------
+    def records(self, sort: str = "modified") -> list:
+        """Alle Records in der gewünschten Sortierung (Standard: zuletzt geänderte zuerst)."""
+        keyfunc, reverse = SORT_KEYS.get(sort, SORT_KEYS["modified"])
+        with self._lock:
+            result = self._sorted.get(sort)
+            if result is None:
+                result = sorted(self._records.values(), key=keyfunc, reverse=reverse)
+                self._sorted[sort] = result
+            return result
+
+    def facets(self) -> dict:
+        """Anzahl der Einträge je Typ und je Jahr über die gesamte Bibliothek."""
+        with self._lock:
+            if self._facets is None:
+                types, years = {}, {}
+                for r in self._records.values():
+                    if r.type:
+                        types[r.type] = types.get(r.type, 0) + 1
+                    if r.year:
+                        years[r.year] = years.get(r.year, 0) + 1
+                self._facets = {"types": types, "years": years}
+            return self._facets
+
+    def query(self, entry_type: str = "", year: str = "", text: str = "",
+              sort: str = "modified", offset: int = 0, limit: int = 0,
+              paths=None) -> tuple:
+        """
+        Filtert und sortiert die Bibliothek.
+        paths: optionale Trefferliste der Volltextsuche (nach Relevanz sortiert);
+        ersetzt dann die einfache Textsuche und erlaubt sort="relevance".
+        Gibt (Seite, Gesamtzahl der Treffer) zurück; limit=0 liefert alle Treffer.
+        """
+        text = text.casefold().strip()
+        if paths is not None:
+            text = ""
+            if sort == "relevance":
+                with self._lock:
+                    matches = [self._records[p] for p in paths if p in self._records]
+            else:
+                wanted = set(paths)
+                matches = [r for r in self.records(sort) if r.path in wanted]
+        else:
+            matches = self.records(sort)
+        if entry_type or year or text:
+            matches = [r for r in matches if _matches(r, entry_type, year, text)]
+        total = len(matches)
+        end = offset + limit if limit > 0 else total
+        return matches[offset:end], total
+
+    def get(self, path) -> EntryRecord:
+        with self._lock:
+            return self._records.get(str(path))
+
+    def __len__(self):
+        return len(self._records)
+
+    def read_content(self, path) -> str:
+        """
+        Gibt den Inhalt einer indizierten Datei zurück. Bei unverändertem
+        stat kommt der Text aus dem Speicher bzw. wird nur gelesen; neu
+        indiziert wird erst, wenn sich der Inhalts-Hash geändert hat.
+        """
+        path = str(path)
+        with self._lock:
+            st = os.stat(path)
+            rec = self._records.get(path)
+            cached = self._content.get(path)
+            if (rec and cached and rec.mtime == st.st_mtime_ns
+                    and rec.size == st.st_size and cached[0] == rec.hash):
+                self._content.move_to_end(path)
+                return cached[1]
+            if not rec and not self._belongs(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    return f.read()
+            if rec and rec.mtime == st.st_mtime_ns and rec.size == st.st_size:
+                # Nur nicht im Speicher (z. B. nach Neustart): Index bleibt unberührt
+                with open(path, "rb") as f:
+                    data = f.read()
+                digest = content_hash(data)
+                if digest == rec.hash:
+                    text = data.decode("utf-8", errors="replace")
+                    self._remember_content(path, digest, text)
+                    return text
+            if self._index_file(path, st, rec):
+                self._changed()
+            cached = self._content.get(path)
+            if cached is None:
+                raise FileNotFoundError(f"Datei nicht lesbar: {path}")
+            return cached[1]
+
+    def _belongs(self, path: str) -> bool:
+        p = pathlib.Path(path)
+        return p.suffix == ".bib" and p.parent == self.target_dir
+
+    def _remember_content(self, path: str, digest: str, text: str):
+        self._content[path] = (digest, text)
+        self._content.move_to_end(path)
+        while len(self._content) > CONTENT_CACHE_SIZE:
+            self._content.popitem(last=False)
+
+
+def _matches(rec: EntryRecord, entry_type: str, year: str, text: str) -> bool:
+    if entry_type and rec.type != entry_type:
+        return False
+    if year and rec.year != year:
+        return False
+    if text:
+        return any(text in getattr(rec, k).casefold() for k in QUERY_FIELDS)
+    return True
+
+
+def record_to_json(rec: EntryRecord) -> dict:
+    """Wandelt einen Index-Record in das JSON-Format der Bibliotheks-API um."""
+    out = {
+        "name":     rec.name,
+        "path":     rec.path,
+        "modified": format_mtime(rec.mtime),
+        "size":     rec.size,
+    }
+    for k in ENTRY_FIELDS:
+        out[k] = getattr(rec, k)
+    return out
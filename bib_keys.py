@@ -0,0 +1,133 @@
+"""
+LaTeX Quellen Manager - Zitierschlüssel-Verzeichnis
+
+Hält alle Zitierschlüssel der Bibliothek im Speicher (auch mehrere pro
+Datei). Kollisionsprüfungen sind ein einzelner dict-Zugriff; eine sortierte
+Liste dient der Präfixsuche für die Vorschläge im Formular. Schlüssel werden
+ohne Beachtung der Groß-/Kleinschreibung verglichen.
+"""
+
+import bisect
+import string
+import threading
+
+# Standardanzahl der Treffer bei der Präfixsuche
+COMPLETE_LIMIT = 20
+
+
+class KeyRegistry:
+    """Verzeichnis aller Zitierschlüssel; wird über Index-Listener aktuell gehalten."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._count = {}              # casefold-Schlüssel -> Anzahl Vorkommen
+        self._spelling = {}           # casefold-Schlüssel -> Schreibweise
+        self._by_path = {}            # Pfad -> Tupel der Schlüssel in der Datei
+        self._sorted = []             # sortierte casefold-Schlüssel (Präfixsuche)
+
+    def rebuild(self, records):
+        """Baut das Verzeichnis aus Index-Records neu auf."""
+        with self._lock:
+            self._count, self._spelling, self._by_path = {}, {}, {}
+            for rec in records:
+                keys = record_keys(rec)
+                self._by_path[rec.path] = keys
+                for key in keys:
+                    cf = key.casefold()
+                    self._count[cf] = self._count.get(cf, 0) + 1
+                    self._spelling.setdefault(cf, key)
+            self._sorted = sorted(self._count)
+
+    def on_change(self, path: str, rec):
+        """Listener des Bibliotheks-Index (rec=None: Datei entfernt)."""
+        self.set_keys(path, record_keys(rec) if rec is not None else ())
+
+    def set_keys(self, path: str, keys):
+        with self._lock:
+            for key in self._by_path.pop(path, ()):
+                self._remove(key)
+            keys = tuple(keys)
+            if keys:
+                self._by_path[path] = keys
+                for key in keys:
+                    self._add(key)
+
+    def _add(self, key: str):
+        cf = key.casefold()
+        n = self._count.get(cf, 0)
+        self._count[cf] = n + 1
+        if n == 0:
+            self._spelling[cf] = key
+            bisect.insort(self._sorted, cf)
+
+    def _remove(self, key: str):
+        cf = key.casefold()
+        n = self._count.get(cf, 0) - 1
+        if n > 0:
+            self._count[cf] = n
+            return
+        self._count.pop(cf, None)
+        self._spelling.pop(cf, None)
+        i = bisect.bisect_left(self._sorted, cf)
+        if i < len(self._sorted) and self._sorted[i] == cf:
+            del self._sorted[i]
+
+    def _taken(self, key: str) -> bool:
+        return key.casefold() in self._count
+
+    # ------------------------------------------------------------------
+    # Abfragen
+    # ------------------------------------------------------------------
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and self._taken(key)
+
+    def __len__(self):
+        return len(self._count)
+
+    def keys(self) -> list:
+        with self._lock:
+            return list(self._spelling.values())
+
+    def unique(self, key: str, taken=None) -> str:
+        """Erster freier Schlüssel aus key, key_a, key_b, … (ohne zu reservieren)."""
+        with self._lock:
+            return unique_key(key, lambda k: self._taken(k) or bool(taken and taken(k)))
+
+    def complete(self, prefix: str, limit: int = COMPLETE_LIMIT) -> list:
+        """Vorhandene Schlüssel, die mit prefix beginnen (alphabetisch)."""
+        cf = prefix.casefold()
+        out = []
+        with self._lock:
+            i = bisect.bisect_left(self._sorted, cf)
+            while i < len(self._sorted) and self._sorted[i].startswith(cf):
+                out.append(self._spelling[self._sorted[i]])
+                if limit and len(out) >= limit:
+                    break
+                i += 1
+        return out
+
+
+def record_keys(rec) -> tuple:
+    """Alle Schlüssel eines Index-Records."""
+    return tuple(k for k in rec.keys if k)
+
+
+def unique_key(key: str, taken) -> str:
+    """Hängt _a, _b, … an, bis taken(kandidat) False liefert."""
+    candidate = key
+    n = 0
+    while taken(candidate):
+        candidate = f"{key}_{key_suffix(n)}"
+        n += 1
+    return candidate
+
+
+def key_suffix(n: int) -> str:
+    """0 -> a, 25 -> z, 26 -> aa, …"""
+    letters = string.ascii_lowercase
+    out = ""
+    n += 1
+    while n:
+        n, r = divmod(n - 1, 26)
+        out = letters[r] + out
+    return out
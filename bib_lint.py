@@ -0,0 +1,265 @@
+"""
+LaTeX Quellen Manager - Prüfung der Bibliothek
+
+Prüft alle .bib-Dateien gegen das Schema der Eintragstypen (Pflichtfelder)
+sowie ISBN-Prüfziffern, DOI-Syntax, Datumsformate und unmaskierte
+Sonderzeichen. Die Dateien werden in Paketen in einem Prozess-Pool geprüft;
+Ergebnisse werden je Inhalts-Hash gecacht (auch auf der Platte), sodass nach
+einer Änderung nur die geänderten Dateien erneut geprüft werden.
+"""
+
+import os
+import re
+import json
+import hashlib
+import datetime
+import threading
+
+from bib_index import content_hash
+from bib_parser import iter_entries
+
+# Prozesse im Pool
+LINT_WORKERS = min(8, os.cpu_count() or 2)
+
+# Dateien je Pool-Auftrag
+LINT_CHUNK = 64
+
+# Unterhalb dieser Anzahl ungeprüfter Dateien wird ohne Pool geprüft (Startkosten)
+POOL_MIN_FILES = 2 * LINT_CHUNK
+
+# Version der Prüfregeln (Teil des Cache-Schlüssels)
+RULES_VERSION = 1
+
+ERROR = "error"
+WARNING = "warning"
+
+# Ersatzfelder, die ein Pflichtfeld erfüllen (biblatex/BibTeX-Varianten)
+FIELD_ALIASES = {
+    "date": ("year",),
+    "journal": ("journaltitle",),
+    "location": ("address",),
+    "institution": ("school",),
+    "author": ("editor",),
+}
+
+# Felder mit Datumsangaben (biblatex: JJJJ, JJJJ-MM, JJJJ-MM-TT, Bereiche mit "/")
+DATE_FIELDS = ("date", "urldate", "origdate", "eventdate")
+
+# Felder, deren Inhalt wörtlich übernommen wird (keine Maskierung nötig)
+VERBATIM_FIELDS = {"url", "doi", "file", "eprint", "urlraw", "pdf", "howpublished_url"}
+
+_DATE_PART = r"\d{4}(?:-\d{2}(?:-\d{2})?)?"
+_DATE_RE = re.compile(rf"^({_DATE_PART})?(?:/({_DATE_PART})?)?$")
+_YEAR_RE = re.compile(r"^\d{4}$")
+_DOI_RE = re.compile(r"^10\.\d{4,9}/\S+$")
+_DOI_PREFIX = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+_MATH = re.compile(r"(?<!\\)\$.*?(?<!\\)\$")
+_UNESCAPED = re.compile(r"(?<!\\)[&%#_]")
+
+
+def build_schema(entry_types: dict) -> dict:
+    """{Typ: [Pflichtfelder]} aus ENTRY_TYPES."""
+    return {t: [f["key"] for f in info["fields"] if f.get("required")]
+            for t, info in entry_types.items()}
+
+
+def schema_signature(schema: dict) -> str:
+    raw = json.dumps([RULES_VERSION, schema], sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+# ---------------------------------------------------------------------------
+# Einzelprüfungen
+# ---------------------------------------------------------------------------
+def isbn_valid(isbn: str) -> bool:
+    """Prüfziffer einer ISBN-10 oder ISBN-13 (Bindestriche/Leerzeichen erlaubt)."""
+    digits = re.sub(r"[\s-]", "", isbn).upper()
+    if re.fullmatch(r"\d{9}[\dX]", digits):
+        total = sum((10 - i) * (10 if c == "X" else int(c)) for i, c in enumerate(digits))
+        return total % 11 == 0
+    if re.fullmatch(r"97[89]\d{10}", digits):
+        total = sum((3 if i % 2 else 1) * int(c) for i, c in enumerate(digits))
+        return total % 10 == 0
+    return False
+
+
+def _date_valid(value: str) -> bool:
+    m = _DATE_RE.match(value)
+    if m is None or not (m.group(1) or m.group(2)):
+        return False
+    for part in m.groups():
+        if part and len(part) > 4:
+            fmt = "%Y-%m-%d" if len(part) == 10 else "%Y-%m"
+            try:
+                datetime.datetime.strptime(part, fmt)
+            except ValueError:
+                return False
+    return True
+
+
+def lint_entry(entry, schema: dict) -> list:
+    """Befunde eines Eintrags: [(Feld, Schwere, Code, Meldung)]."""
+    found = []
+    fields = {k: v.strip() for k, v in entry.fields.items()}
+    required = schema.get(entry.entry_type)
+    if required is None:
+        found.append(("", WARNING, "unknown-type", f"Unbekannter Eintragstyp @{entry.entry_type}."))
+    else:
+        for name in required:
+            if not fields.get(name) and not any(fields.get(a) for a in FIELD_ALIASES.get(name, ())):
+                found.append((name, ERROR, "missing-field", f"Pflichtfeld {name} fehlt."))
+
+    isbn = fields.get("isbn")
+    if isbn:
+        for part in re.split(r"\s*(?:,|;|\band\b)\s*", isbn):
+            if part and not isbn_valid(part):
+                found.append(("isbn", ERROR, "isbn-checksum", f"Ungültige ISBN {part} (Prüfziffer oder Länge)."))
+
+    doi = fields.get("doi")
+    if doi:
+        if _DOI_PREFIX.match(doi):
+            found.append(("doi", WARNING, "doi-prefix", "DOI ohne Präfix (https://doi.org/, doi:) angeben."))
+            doi = _DOI_PREFIX.sub("", doi)
+        if not _DOI_RE.match(doi):
+            found.append(("doi", ERROR, "doi-syntax", f"Ungültige DOI {doi}."))
+
+    for name in DATE_FIELDS:
+        value = fields.get(name)
+        if value and not _date_valid(value):
+            found.append((name, ERROR, "date-format", f"Ungültiges Datum {value} (erwartet JJJJ, JJJJ-MM oder JJJJ-MM-TT)."))
+    year = fields.get("year")
+    if year and not _YEAR_RE.match(year):
+        found.append(("year", ERROR, "date-format", f"Ungültiges Jahr {year} (erwartet JJJJ)."))
+
+    for name, value in fields.items():
+        if name in VERBATIM_FIELDS:
+            continue
+        m = _UNESCAPED.search(_MATH.sub("", value))
+        if m is not None:
+            found.append((name, WARNING, "unescaped-char", f"Unmaskiertes Zeichen {m.group(0)} (\\{m.group(0)} verwenden)."))
+    return found
+
+
+def lint_bytes(data: bytes, schema: dict) -> list:
+    """Befunde einer Datei als Liste von Dicts (key, line, field, severity, code, message)."""
+    findings = []
+    entries = 0
+    for entry in iter_entries(data):
+        entries += 1
+        line = data.count(b"\n", 0, entry.start) + 1
+        for field, severity, code, message in lint_entry(entry, schema):
+            findings.append({"key": entry.key, "line": line, "field": field,
+                             "severity": severity, "code": code, "message": message})
+    if not entries:
+        findings.append({"key": "", "line": 1, "field": "", "severity": WARNING,
+                         "code": "no-entry", "message": "Kein BibTeX-Eintrag gefunden."})
+    return findings
+
+
+def lint_files(paths: list, schema: dict) -> list:
+    """[(Pfad, Inhalts-Hash, Befunde)]; läuft auch in den Pool-Prozessen."""
+    results = []
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            continue
+        results.append((path, content_hash(data), lint_bytes(data, schema)))
+    return results
+
+
+def format_lint_report(files: list) -> str:
+    """Textbericht: eine Zeile je Befund (Datei:Zeile: Schwere [Code] Meldung)."""
+    lines = []
+    for item in files:
+        for f in item["findings"]:
+            key = f" {f['key']}:" if f["key"] else ""
+            lines.append(f"{item['name']}:{f['line']}:{key} {f['severity']} [{f['code']}] {f['message']}")
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+class LintEngine:
+    """Prüft Dateien parallel; Ergebnisse je Inhalts-Hash gecacht (optional in cache_path)."""
+
+    def __init__(self, schema: dict, cache_path=None, workers: int = LINT_WORKERS):
+        self.schema = schema
+        self.signature = schema_signature(schema)
+        self.cache_path = str(cache_path) if cache_path else None
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._cache = None            # Inhalts-Hash -> Befunde
+        self._dirty = False
+
+    def _load(self):
+        if self._cache is not None:
+            return
+        self._cache = {}
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("signature") == self.signature:
+            self._cache = data.get("results", {})
+
+    def save(self):
+        """Schreibt den Cache (nur nach Änderungen)."""
+        with self._lock:
+            if not self._dirty or not self.cache_path:
+                return
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp = self.cache_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"signature": self.signature, "results": self._cache}, f, ensure_ascii=False)
+            os.replace(tmp, self.cache_path)
+            self._dirty = False
+
+    def run(self, files):
+        """
+        Prüft [(Pfad, bekannter Inhalts-Hash)] und liefert (Pfad, Befunde, aus
+        dem Cache?) in Abschlussreihenfolge: zuerst die gecachten, dann die
+        Ergebnisse des Pools, sobald ein Paket fertig ist. Cache-Einträge
+        nicht mehr vorhandener Inhalte werden anschließend verworfen.
+        """
+        with self._lock:
+            self._load()
+            cached = [(p, self._cache[d]) for p, d in files if d in self._cache]
+            todo = [p for p, d in files if d not in self._cache]
+            wanted = {d for _p, d in files}
+
+        for path, findings in cached:
+            yield path, findings, True
+
+        chunks = [todo[i:i + LINT_CHUNK] for i in range(0, len(todo), LINT_CHUNK)]
+        if len(todo) < POOL_MIN_FILES or self.workers <= 1:
+            batches = (lint_files(chunk, self.schema) for chunk in chunks)
+        else:
+            batches = self._pool_batches(chunks)
+        for batch in batches:
+            with self._lock:
+                for _path, digest, findings in batch:
+                    self._cache[digest] = findings
+                    wanted.add(digest)
+                self._dirty = self._dirty or bool(batch)
+            for path, _digest, findings in batch:
+                yield path, findings, False
+
+        with self._lock:
+            stale = [d for d in self._cache if d not in wanted]
+            for digest in stale:
+                del self._cache[digest]
+            self._dirty = self._dirty or bool(stale)
+
+    def _pool_batches(self, chunks):
+        # Erst hier importiert: der Pool lädt multiprocessing (Startzeit der CLI)
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks))) as pool:
+            futures = [pool.submit(lint_files, chunk, self.schema) for chunk in chunks]
+            for future in as_completed(futures):
+                yield future.result()
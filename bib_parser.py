@@ -0,0 +1,346 @@
+"""
+LaTeX Quellen Manager - BibTeX-Tokenizer
+
+Linearer Single-Pass-Parser für BibTeX. Liest Einträge gestreamt aus einer
+Datei, einem Dateiobjekt oder einem Byte-Puffer und liefert alle Einträge
+mit Byte-Offsets (Start des ``@`` bis hinter die schließende Klammer), damit
+einzelne Einträge später an Ort und Stelle ersetzt werden können.
+
+Unterstützt verschachtelte Klammern, die ``\\{``/``\\}``-Escapes aus
+generate_bibtex(), Werte in Anführungszeichen, ``#``-Verkettung,
+``@string``-Makros sowie ``@comment``/``@preamble`` und ``%``-Kommentare.
+"""
+
+import re
+
+# Standard-Makros (BibTeX kennt die Monatsnamen ohne @string)
+DEFAULT_MACROS = {
+    "jan": "1", "feb": "2", "mar": "3", "apr": "4", "may": "5", "jun": "6",
+    "jul": "7", "aug": "8", "sep": "9", "oct": "10", "nov": "11", "dec": "12",
+}
+
+CHUNK_SIZE = 1 << 20
+
+_HEAD      = re.compile(rb"[ \t\r\n]*([A-Za-z]+)[ \t\r\n]*([{(])")
+_HEAD_PARTIAL = re.compile(rb"[ \t\r\n]*[A-Za-z]*[ \t\r\n]*")
+_KEY       = re.compile(rb"[ \t\r\n]*([^,\s{}()\"=#%]*)[ \t\r\n]*")
+_WS        = re.compile(rb"[ \t\r\n]*")
+_NAME_EQ   = re.compile(rb"([A-Za-z_][\w\-:.+]*)[ \t\r\n]*=[ \t\r\n]*")
+_FIELD_FAST = re.compile(
+    rb"[ \t\r\n]*([A-Za-z_][\w\-:.+]*)[ \t\r\n]*=[ \t\r\n]*\{([^{}\\]*)\}(?![ \t\r\n]*#)[ \t\r\n]*,?")
+# Ganzer Eintrag ohne Verschachtelung, Escapes, Anführungszeichen oder Makros.
+# Possessive Quantoren (ab Python 3.11) vermeiden unnötiges Backtracking.
+def _compile_entry_fast(p: bytes):
+    ws = rb"[ \t\r\n]*" + p
+    field = ws + rb"[A-Za-z_][\w\-:.+]*" + p + ws + rb"=" + ws + rb"\{[^{}\\]*" + p + rb"\}"
+    return re.compile(
+        rb"@" + ws + rb"([A-Za-z]+)" + ws + rb"\{" + ws + rb"([^,\s{}()\"=#%]+)" + ws + rb","
+        rb"((?:" + field + ws + rb",)*" + p + rb"(?:" + field + rb")?)" + ws + rb"\}")
+
+
+try:
+    _ENTRY_FAST = _compile_entry_fast(b"+")
+except re.error:
+    _ENTRY_FAST = _compile_entry_fast(b"")
+_SPECIAL   = frozenset(("string", "comment", "preamble"))
+_BRACES    = re.compile(rb"[{}\\]")
+_QUOTED    = re.compile(rb'[{}"\\]')
+_BARE      = re.compile(rb"[\w\-:.+]+")
+_ESCAPES   = re.compile(r"\\([{}])")
+
+_CLOSER = {ord("{"): ord("}"), ord("("): ord(")")}
+_LBRACE, _RBRACE, _QUOTE, _HASH, _COMMA, _BACKSLASH = b"{", b"}", b'"', b"#", b",", b"\\"
+
+
+class BibEntry:
+    """
+    Ein geparster BibTeX-Eintrag mit Byte-Offsets im Quelltext.
+    Bei einfachen Einträgen werden die Felder erst beim ersten Zugriff dekodiert.
+    """
+
+    __slots__ = ("entry_type", "key", "start", "end", "raw", "simple", "_fields", "_body")
+
+    def __init__(self, entry_type: str, key: str, fields, start: int, end: int, body: bytes = None):
+        self.entry_type = entry_type
+        self.key = key
+        self.start = start
+        self.end = end
+        self.raw = None        # Quelltext des Eintrags (nur mit keep_raw=True)
+        self.simple = body is not None  # nur {…}-Werte ohne Verschachtelung/Makros
+        self._fields = fields
+        self._body = body
+
+    @property
+    def fields(self) -> dict:
+        if self._fields is None:
+            self._fields = _split_simple_fields(self._body)
+            self._body = None
+        return self._fields
+
+    def __repr__(self):
+        return f"BibEntry(@{self.entry_type}{{{self.key}}}, {self.start}:{self.end})"
+
+
+class _Incomplete(Exception):
+    """Der Puffer endet mitten im Eintrag – mehr Daten nötig."""
+
+
+class _Malformed(Exception):
+    """Syntaxfehler im Eintrag; der Parser setzt beim nächsten @ wieder auf."""
+
+
+def iter_entries(source, macros: dict = None, chunk_size: int = CHUNK_SIZE, keep_raw: bool = False):
+    """
+    Liefert alle Einträge aus ``source`` als BibEntry.
+    source: Inhalt als bytes/str, ein pathlib.Path oder ein binäres Dateiobjekt.
+    ``@string``-Definitionen werden in ``macros`` gesammelt und aufgelöst.
+    keep_raw: zusätzlich den Quelltext jedes Eintrags (bytes) in ``entry.raw`` ablegen.
+    """
+    macros = dict(DEFAULT_MACROS) if macros is None else macros
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield from _iter_buffer(bytes(source), None, macros, chunk_size, keep_raw)
+    elif hasattr(source, "read"):
+        yield from _iter_buffer(b"", source, macros, chunk_size, keep_raw)
+    else:
+        with open(source, "rb") as f:
+            yield from _iter_buffer(b"", f, macros, chunk_size, keep_raw)
+
+
+def parse_entries(source, macros: dict = None) -> list:
+    """Alle Einträge als Liste."""
+    return list(iter_entries(source, macros))
+
+
+def _iter_buffer(buf: bytes, stream, macros: dict, chunk_size: int, keep_raw: bool = False):
+    base = 0       # Byte-Offset von buf[0] im Gesamtstrom
+    pos = 0
+    eof = stream is None
+    if not eof:
+        buf = stream.read(chunk_size)
+        eof = len(buf) < chunk_size
+
+    while True:
+        at = buf.find(b"@", pos)
+        if at == -1:
+            if eof:
+                return
+            buf, base, pos, eof = _refill(buf, base, len(buf), stream, chunk_size)
+            continue
+        # @ in einer %-Kommentarzeile überspringen (nur wenn die Zeile mit %
+        # beginnt; % in Feldwerten wie url={…%20…} oder \% ist kein Kommentar)
+        line_start = buf.rfind(b"\n", 0, at) + 1
+        if buf[line_start:at].lstrip()[:1] == b"%":
+            pos = buf.find(b"\n", at)
+            if pos == -1:
+                if eof:
+                    return
+                buf, base, pos, eof = _refill(buf, base, line_start, stream, chunk_size)
+            continue
+
+        try:
+            entry, end = _parse_at(buf, at, macros)
+        except _Incomplete:
+            if eof:
+                return
+            buf, base, pos, eof = _refill(buf, base, at, stream, chunk_size)
+            continue
+        except _Malformed:
+            pos = at + 1
+            continue
+        pos = end
+        if entry is not None:
+            if keep_raw:
+                entry.raw = buf[at:end]
+            entry.start += base
+            entry.end += base
+            yield entry
+
+
+def _refill(buf: bytes, base: int, keep: int, stream, chunk_size: int):
+    """Verwirft den verarbeiteten Teil von buf und hängt den nächsten Block an."""
+    chunk = stream.read(max(chunk_size, len(buf) - keep))
+    eof = len(chunk) == 0
+    return buf[keep:] + chunk, base + keep, 0, eof
+
+
+def _parse_at(buf: bytes, at: int, macros: dict):
+    """Parst den Eintrag ab dem @ an Position at. Gibt (BibEntry|None, Ende) zurück."""
+    fm = _ENTRY_FAST.match(buf, at)
+    if fm is not None:
+        entry_type = fm.group(1).decode("ascii").lower()
+        if entry_type not in _SPECIAL:
+            key = fm.group(2).decode("utf-8", errors="replace")
+            return BibEntry(entry_type, key, None, at, fm.end(), fm.group(3)), fm.end()
+
+    m = _HEAD.match(buf, at + 1)
+    if m is None:
+        if _HEAD_PARTIAL.match(buf, at + 1).end() >= len(buf):
+            raise _Incomplete
+        raise _Malformed
+    entry_type = m.group(1).decode("ascii").lower()
+    opener = buf[m.end(2) - 1]
+    closer = _CLOSER[opener]
+    pos = m.end()
+
+    if entry_type == "comment" or entry_type == "preamble":
+        end = _skip_balanced(buf, pos, opener, closer)
+        return None, end
+
+    if entry_type == "string":
+        fields, end = _parse_fields(buf, pos, closer, macros)
+        for name, value in fields.items():
+            macros[name] = value
+        return None, end
+
+    km = _KEY.match(buf, pos)
+    key = km.group(1).decode("utf-8", errors="replace")
+    pos = km.end()
+    if pos >= len(buf):
+        raise _Incomplete
+    if buf[pos] == _COMMA[0]:
+        pos += 1
+    elif buf[pos] != closer:
+        raise _Malformed
+    fields, end = _parse_fields(buf, pos, closer, macros)
+    return BibEntry(entry_type, key, fields, at, end), end
+
+
+def _parse_fields(buf: bytes, pos: int, closer: int, macros: dict):
+    fields = {}
+    n = len(buf)
+    while True:
+        fm = _FIELD_FAST.match(buf, pos)
+        if fm is not None:
+            # Häufigster Fall: name = {Wert ohne Klammern/Escapes},
+            if fm.end() >= n:
+                raise _Incomplete
+            fields[fm.group(1).decode("ascii").lower()] = fm.group(2).decode("utf-8", errors="replace").strip()
+            pos = fm.end()
+            continue
+
+        pos = _WS.match(buf, pos).end()
+        if pos >= n:
+            raise _Incomplete
+        c = buf[pos]
+        if c == closer:
+            return fields, pos + 1
+        if c == _COMMA[0]:
+            pos += 1
+            continue
+
+        nm = _NAME_EQ.match(buf, pos)
+        if nm is None:
+            bm = _BARE.match(buf, pos)
+            if bm is not None and _WS.match(buf, bm.end()).end() >= n:
+                raise _Incomplete
+            raise _Malformed
+        name = nm.group(1).decode("ascii").lower()
+        if nm.end() >= n:
+            raise _Incomplete
+        value, pos = _parse_value(buf, nm.end(), macros)
+        fields[name] = value
+
+
+def _parse_value(buf: bytes, pos: int, macros: dict):
+    """Liest einen (ggf. mit # verketteten) Feldwert."""
+    parts = []
+    n = len(buf)
+    while True:
+        pos = _WS.match(buf, pos).end()
+        if pos >= n:
+            raise _Incomplete
+        c = buf[pos]
+        if c == _LBRACE[0]:
+            raw, pos = _read_braced(buf, pos + 1)
+            parts.append(_decode(raw))
+        elif c == _QUOTE[0]:
+            raw, pos = _read_quoted(buf, pos + 1)
+            parts.append(_decode(raw))
+        else:
+            bm = _BARE.match(buf, pos)
+            if bm is None:
+                raise _Malformed
+            if bm.end() >= n:
+                raise _Incomplete
+            word = bm.group().decode("utf-8", errors="replace")
+            parts.append(word if word.isdigit() else macros.get(word.lower(), ""))
+            pos = bm.end()
+
+        pos = _WS.match(buf, pos).end()
+        if pos >= n:
+            raise _Incomplete
+        if buf[pos] != _HASH[0]:
+            return "".join(parts).strip(), pos
+        pos += 1
+
+
+def _read_braced(buf: bytes, start: int):
+    """Inhalt bis zur passenden schließenden Klammer; start zeigt hinter die öffnende."""
+    depth = 1
+    i = start
+    search = _BRACES.search
+    while True:
+        m = search(buf, i)
+        if m is None:
+            raise _Incomplete
+        ch = buf[m.start()]
+        if ch == _BACKSLASH[0]:
+            i = m.start() + 2
+            continue
+        if ch == _LBRACE[0]:
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return buf[start:m.start()], m.end()
+        i = m.end()
+
+
+def _read_quoted(buf: bytes, start: int):
+    """Inhalt bis zum schließenden Anführungszeichen auf Klammerebene 0."""
+    depth = 0
+    i = start
+    search = _QUOTED.search
+    while True:
+        m = search(buf, i)
+        if m is None:
+            raise _Incomplete
+        ch = buf[m.start()]
+        if ch == _BACKSLASH[0]:
+            i = m.start() + 2
+            continue
+        if ch == _LBRACE[0]:
+            depth += 1
+        elif ch == _RBRACE[0]:
+            depth -= 1
+        elif depth == 0:
+            return buf[start:m.start()], m.end()
+        i = m.end()
+
+
+def _skip_balanced(buf: bytes, pos: int, opener: int, closer: int) -> int:
+    if opener == _LBRACE[0]:
+        return _read_braced(buf, pos)[1]
+    end = buf.find(bytes([closer]), pos)
+    if end == -1:
+        raise _Incomplete
+    return end + 1
+
+
+def _split_simple_fields(body: bytes) -> dict:
+    """Felder eines Eintrags aus dem Schnellpfad – Werte enthalten garantiert keine Klammern."""
+    fields = {}
+    for part in body.decode("utf-8", errors="replace").split("}"):
+        name, sep, value = part.partition("{")
+        if sep:
+            fields[name.strip(" \t\r\n,=").lower()] = value.strip()
+    return fields
+
+
+def _decode(raw: bytes) -> str:
+    text = raw.decode("utf-8", errors="replace")
+    if "\\" in text:
+        text = _ESCAPES.sub(r"\1", text)
+    return text
@@ -0,0 +1,409 @@
+"""
+LaTeX Quellen Manager - Metadaten aus DOI und ISBN
+
+Löst DOIs (Crossref) und ISBNs (Open Library) in Eintragstyp und Felder im
+Format von ENTRY_TYPES auf. Backends sind austauschbar: jedes kennt seine
+Basis-URL, die sich z.B. auf einen lokalen Test-Server umstellen lässt.
+
+Mehrere Abfragen laufen parallel in einem begrenzten Thread-Pool, je Host
+wird ein Mindestabstand zwischen Anfragen eingehalten. Antworten (auch
+"nicht gefunden") werden als JSON-Dateien mit Ablaufzeit gecacht; bei zu
+vielen Einträgen werden die am längsten nicht genutzten entfernt.
+"""
+
+import os
+import re
+import json
+import html
+import time
+import hashlib
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from bib_duplicates import normalize_doi, normalize_isbns
+from bib_parser import iter_entries
+
+# Gleichzeitige Abfragen
+RESOLVE_WORKERS = 4
+
+# Timeout je HTTP-Anfrage (Sekunden)
+HTTP_TIMEOUT = 10
+
+# Anfragen pro Sekunde und Host
+HOST_RATE = 2.0
+
+# Gültigkeit gecachter Antworten (Sekunden); "nicht gefunden" kürzer
+CACHE_TTL = 30 * 24 * 3600
+NEGATIVE_TTL = 24 * 3600
+
+# Höchstzahl gecachter Antworten
+CACHE_MAX_ENTRIES = 5000
+
+USER_AGENT = "LaTeX-Quellen-Manager/4.1 (+https://github.com/alexanderdrexl/LaTeX_Source_Manager)"
+
+_TAG = re.compile(r"<[^>]+>")
+
+
+class ResolveError(Exception):
+    pass
+
+
+def identifier_kind(text: str) -> tuple:
+    """("doi"|"isbn", normalisierter Wert) oder ("", "")."""
+    doi = normalize_doi(text or "")
+    if doi:
+        return "doi", doi
+    isbns = normalize_isbns(text or "")
+    if isbns:
+        return "isbn", sorted(isbns)[0]
+    return "", ""
+
+
+def _clean(text) -> str:
+    """Text ohne HTML/JATS-Auszeichnung und überflüssige Leerzeichen."""
+    return re.sub(r"\s+", " ", html.unescape(_TAG.sub("", str(text or "")))).strip()
+
+
+def _json_object(data: bytes) -> dict:
+    """Antwort als JSON-Objekt; ValueError bei anderem JSON (z.B. Liste eines Proxys)."""
+    payload = json.loads(data)
+    if not isinstance(payload, dict):
+        raise ValueError(f"JSON-Objekt erwartet, {type(payload).__name__} erhalten")
+    return payload
+
+
+def _first(value) -> str:
+    if isinstance(value, list):
+        value = value[0] if value else ""
+    return _clean(value)
+
+
+def _person(given: str, family: str) -> str:
+    return f"{family}, {given}" if given and family else (family or given)
+
+
+def _split_name(name: str) -> str:
+    """"Vorname Nachname" -> "Nachname, Vorname" (bereits mit Komma: unverändert)."""
+    name = _clean(name)
+    if "," in name or " " not in name:
+        return name
+    given, family = name.rsplit(" ", 1)
+    return f"{family}, {given}"
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+class Backend:
+    """Basisklasse: kind ("doi"/"isbn"), url(Kennung) und parse(Antwort)."""
+
+    name = ""
+    kind = ""
+    base_url = ""
+
+    def __init__(self, base_url: str = ""):
+        if base_url:
+            self.base_url = base_url.rstrip("/")
+
+    @property
+    def host(self) -> str:
+        return urllib.parse.urlsplit(self.base_url).netloc
+
+    def url(self, identifier: str) -> str:
+        raise NotImplementedError
+
+    def parse(self, data: bytes, identifier: str):
+        """(entry_type, fields) oder None, wenn die Antwort nichts enthält."""
+        raise NotImplementedError
+
+
+class CrossrefBackend(Backend):
+    name = "crossref"
+    kind = "doi"
+    base_url = "https://api.crossref.org"
+
+    TYPES = {
+        "journal-article": "article", "book": "book", "monograph": "book",
+        "edited-book": "book", "reference-book": "book", "book-chapter": "inbook",
+        "book-section": "inbook", "book-part": "inbook", "proceedings-article": "inproceedings",
+        "proceedings": "proceedings", "report": "report", "dissertation": "phdthesis",
+        "dataset": "dataset", "standard": "standard", "posted-content": "online",
+    }
+
+    def url(self, identifier: str) -> str:
+        return f"{self.base_url}/works/{urllib.parse.quote(identifier, safe='/')}"
+
+    def parse(self, data: bytes, identifier: str):
+        msg = _json_object(data).get("message") or {}
+        if not msg:
+            return None
+        entry_type = self.TYPES.get(msg.get("type", ""), "misc")
+        fields = {
+            "author": " and ".join(_person(_clean(a.get("given")), _clean(a.get("family"))) or _clean(a.get("name"))
+                                   for a in msg.get("author", [])),
+            "editor": " and ".join(_person(_clean(a.get("given")), _clean(a.get("family"))) or _clean(a.get("name"))
+                                   for a in msg.get("editor", [])),
+            "title": _first(msg.get("title")),
+            "subtitle": _first(msg.get("subtitle")),
+            "volume": _clean(msg.get("volume")),
+            "number": _clean(msg.get("issue")),
+            "pages": _clean(msg.get("page")).replace("-", "--"),
+            "doi": _clean(msg.get("DOI")) or identifier,
+            "issn": _first(msg.get("ISSN")),
+            "isbn": _first(msg.get("ISBN")),
+            "publisher": _clean(msg.get("publisher")),
+            "location": _clean(msg.get("publisher-location")),
+            "url": _clean(msg.get("URL")),
+        }
+        container = _first(msg.get("container-title"))
+        fields["journal" if entry_type == "article" else "booktitle"] = container
+        parts = ((msg.get("issued") or {}).get("date-parts") or [[]])[0]
+        if parts and parts[0]:
+            fields["date"] = str(parts[0])
+        return entry_type, {k: v for k, v in fields.items() if v}
+
+
+class OpenLibraryBackend(Backend):
+    name = "openlibrary"
+    kind = "isbn"
+    base_url = "https://openlibrary.org"
+
+    def url(self, identifier: str) -> str:
+        query = urllib.parse.urlencode({"bibkeys": f"ISBN:{identifier}", "format": "json", "jscmd": "data"})
+        return f"{self.base_url}/api/books?{query}"
+
+    def parse(self, data: bytes, identifier: str):
+        book = _json_object(data).get(f"ISBN:{identifier}")
+        if not book:
+            return None
+        year = re.search(r"\d{4}", book.get("publish_date", ""))
+        fields = {
+            "author": " and ".join(_split_name(a.get("name", "")) for a in book.get("authors", [])),
+            "title": _clean(book.get("title")),
+            "subtitle": _clean(book.get("subtitle")),
+            "publisher": _first([p.get("name", "") for p in book.get("publishers", [])]),
+            "location": _first([p.get("name", "") for p in book.get("publish_places", [])]),
+            "date": year.group(0) if year else "",
+            "isbn": identifier,
+        }
+        return "book", {k: v for k, v in fields.items() if v}
+
+
+# Verfügbare Backends (Name -> Klasse)
+BACKENDS = {cls.name: cls for cls in (CrossrefBackend, OpenLibraryBackend)}
+
+
+# ---------------------------------------------------------------------------
+# Ratenbegrenzung & Cache
+# ---------------------------------------------------------------------------
+class RateLimiter:
+    """Mindestabstand zwischen zwei Anfragen an denselben Host."""
+
+    def __init__(self, rate: float = HOST_RATE, rates: dict = None):
+        self._rate = rate
+        self._rates = rates or {}
+        self._lock = threading.Lock()
+        self._next = {}               # Host -> frühester Zeitpunkt der nächsten Anfrage
+
+    def wait(self, host: str):
+        rate = self._rates.get(host, self._rate)
+        if not rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, 0.0))
+            self._next[host] = slot + 1.0 / rate
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ResponseCache:
+    """HTTP-Antworten als JSON-Dateien (Name: Hash der URL) mit Ablaufzeit und LRU-Verdrängung."""
+
+    def __init__(self, directory, ttl: float = CACHE_TTL, negative_ttl: float = NEGATIVE_TTL,
+                 max_entries: int = CACHE_MAX_ENTRIES):
+        self.directory = str(directory)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._count = None
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url: str):
+        """(Status, Body) oder None (nicht vorhanden oder abgelaufen)."""
+        path = self._path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                item = json.load(f)
+        except (OSError, ValueError):
+            return None
+        ttl = self.ttl if item.get("status") == 200 else self.negative_ttl
+        if item.get("url") != url or time.time() - item.get("fetched", 0) > ttl:
+            return None
+        try:
+            os.utime(path)            # Zuletzt genutzt (für die Verdrängung)
+        except OSError:
+            pass
+        return item["status"], item["body"].encode("utf-8")
+
+    def put(self, url: str, status: int, body: bytes):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(url)
+        existed = os.path.exists(path)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"url": url, "status": status, "fetched": time.time(),
+                       "body": body.decode("utf-8", errors="replace")}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        with self._lock:
+            if self._count is None:
+                self._count = sum(1 for n in os.listdir(self.directory) if n.endswith(".json"))
+            elif not existed:
+                self._count += 1
+            if self._count > self.max_entries:
+                self._evict()
+
+    def discard(self, url: str):
+        """Entfernt eine Antwort (z.B. einen Body, der sich nicht auswerten ließ)."""
+        try:
+            os.remove(self._path(url))
+        except OSError:
+            return
+        with self._lock:
+            if self._count is not None:
+                self._count -= 1
+
+    def _evict(self):
+        """Entfernt die am längsten nicht genutzten Einträge (auf 90 % der Höchstzahl)."""
+        entries = []
+        for de in os.scandir(self.directory):
+            if de.name.endswith(".json"):
+                try:
+                    entries.append((de.stat().st_mtime, de.path))
+                except OSError:
+                    pass
+        entries.sort()
+        excess = len(entries) - int(self.max_entries * 0.9)
+        for _mtime, path in entries[:max(excess, 0)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._count = len(entries) - max(excess, 0)
+
+
+# ---------------------------------------------------------------------------
+# Resolver
+# ---------------------------------------------------------------------------
+class Resolver:
+    """Fragt die Backends der passenden Art der Reihe nach ab (erster Treffer zählt)."""
+
+    def __init__(self, backends, cache: ResponseCache = None, limiter: RateLimiter = None,
+                 workers: int = RESOLVE_WORKERS, timeout: float = HTTP_TIMEOUT):
+        self.backends = list(backends)
+        self.cache = cache
+        self.limiter = limiter or RateLimiter()
+        self.workers = workers
+        self.timeout = timeout
+
+    def fetch(self, backend: Backend, url: str) -> tuple:
+        """(Status, Body, aus dem Cache?); Netzwerkfehler werden nicht gecacht."""
+        if self.cache is not None:
+            hit = self.cache.get(url)
+            if hit is not None:
+                return hit[0], hit[1], True
+        self.limiter.wait(backend.host)
+        req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT, "Accept": "application/json"})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                status, body = resp.status, resp.read()
+        except urllib.error.HTTPError as e:
+            if e.code != 404:
+                raise ResolveError(f"{backend.name}: HTTP {e.code}")
+            status, body = 404, b""
+        except (urllib.error.URLError, OSError) as e:
+            raise ResolveError(f"{backend.name}: {getattr(e, 'reason', e)}")
+        if self.cache is not None:
+            self.cache.put(url, status, body)
+        return status, body, False
+
+    def resolve(self, text: str) -> dict:
+        """
+        Löst eine DOI oder ISBN auf. Gibt identifier, kind, entry_type,
+        fields, source (Backend) und cached zurück; wirft ResolveError.
+        """
+        kind, identifier = identifier_kind(text)
+        if not kind:
+            raise ResolveError("Keine gültige DOI oder ISBN.")
+        errors = []
+        for backend in self.backends:
+            if backend.kind != kind:
+                continue
+            url = backend.url(identifier)
+            try:
+                status, body, cached = self.fetch(backend, url)
+                parsed = backend.parse(body, identifier) if status == 200 and body else None
+            except ResolveError as e:
+                errors.append(str(e))
+                continue
+            except (ValueError, AttributeError, TypeError) as e:
+                # Nicht auswertbare Antwort (auch unerwarteter Aufbau): nicht im
+                # Cache behalten, sonst wiederholt sich der Fehler bis zum Ablauf
+                if self.cache is not None:
+                    self.cache.discard(url)
+                errors.append(f"{backend.name}: ungültige Antwort ({e})")
+                continue
+            if parsed is not None:
+                entry_type, fields = parsed
+                return {"identifier": identifier, "kind": kind, "entry_type": entry_type,
+                        "fields": fields, "source": backend.name, "cached": cached}
+        raise ResolveError("; ".join(errors) or f"Keine Daten zu {kind.upper()} {identifier} gefunden.")
+
+    def resolve_many(self, texts) -> dict:
+        """{Eingabe: Ergebnis oder {"error": …}}, parallel im begrenzten Pool."""
+        texts = list(dict.fromkeys(texts))
+
+        def one(text):
+            try:
+                return self.resolve(text)
+            except ResolveError as e:
+                return {"error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+            return dict(zip(texts, pool.map(one, texts)))
+
+
+def build_backends(config: dict) -> list:
+    """Backends aus {Name: Basis-URL} (Reihenfolge = Priorität); unbekannte Namen werden ignoriert."""
+    return [BACKENDS[name](base_url or "") for name, base_url in config.items() if name in BACKENDS]
+
+
+# ---------------------------------------------------------------------------
+# Felder ergänzen
+# ---------------------------------------------------------------------------
+def add_fields(data: bytes, additions: dict) -> bytes:
+    """
+    Fügt Felder vor der schließenden Klammer der Einträge ein
+    ({Zitierschlüssel: {Feld: Wert}}). Bestehende Felder bleiben unverändert.
+    """
+    inserts = []
+    for entry in iter_entries(data):
+        fields = additions.get(entry.key)
+        if not fields:
+            continue
+        p = entry.end - 1
+        while p > entry.start and data[p - 1:p].isspace():
+            p -= 1
+        prefix = b"" if data[p - 1:p] == b"," else b","
+        lines = "".join(f"\n  {k:<14} = {{{v.replace('{', '').replace('}', '')}}},"
+                        for k, v in fields.items())
+        inserts.append((p, prefix + lines.encode("utf-8")))
+    for pos, text in sorted(inserts, reverse=True):
+        data = data[:pos] + text + data[pos:]
+    return data
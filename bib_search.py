@@ -0,0 +1,228 @@
+"""
+LaTeX Quellen Manager - Volltextsuche
+
+Invertierter Index über alle BibTeX-Felder der Bibliothek. Tokens werden
+mit normalize_string() umlaut-gefaltet und klein geschrieben. Unterstützt
+Ranking (TF-IDF mit Feldgewichten), Präfixsuche und Feldfilter wie
+``author:müller journal:nature``.
+"""
+
+import re
+import math
+import bisect
+import threading
+
+# Gewichtung der Felder beim Ranking
+FIELD_BOOST = {
+    "title": 3.0,
+    "key": 2.0,
+    "author": 2.0,
+    "editor": 1.5,
+    "subtitle": 1.5,
+    "booktitle": 1.2,
+    "journal": 1.2,
+}
+
+# Gewichtung eines Präfixtreffers gegenüber einem exakten Token
+PREFIX_WEIGHT = 0.6
+
+# Kürzere Terme werden nur exakt gesucht
+MIN_PREFIX_LENGTH = 2
+
+# Suchfeld-Aliase (z.B. "jahr:2020")
+FIELD_ALIASES = {
+    "autor": "author",
+    "titel": "title",
+    "jahr": "year",
+    "verlag": "publisher",
+    "zeitschrift": "journal",
+    "typ": "type",
+}
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+_QUERY_RE = re.compile(r'(?:(\w+):)?(?:"([^"]*)"|(\S+))')
+
+
+class SearchIndex:
+    """Invertierter Index: Token -> {Dokument-ID: Gewicht}."""
+
+    def __init__(self, normalizer):
+        self._normalize = normalizer
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._doc_ids = {}      # path -> doc_id
+        self._paths = {}        # doc_id -> path
+        self._doc_terms = {}    # doc_id -> [(field, token), ...] zum Entfernen
+        self._next_id = 0
+        self._all = {}          # token -> {doc_id: gewichtete Häufigkeit}
+        self._by_field = {}     # field -> token -> {doc_id: Häufigkeit}
+        self._vocab = []        # sortierte Tokens (für Präfixsuche)
+        self._field_vocab = {}  # field -> sortierte Tokens
+
+    # ------------------------------------------------------------------
+    # Tokenisierung
+    # ------------------------------------------------------------------
+    def tokenize(self, text: str) -> list:
+        return _TOKEN_RE.findall(self._normalize(text).casefold())
+
+    @staticmethod
+    def document_fields(rec) -> dict:
+        """Alle durchsuchbaren Felder eines Index-Records."""
+        fields = rec.fields
+        for k in ("type", "key", "year"):
+            if getattr(rec, k):
+                fields[k] = getattr(rec, k)
+        name = rec.name
+        if name:
+            fields["file"] = name[:-4] if name.endswith(".bib") else name
+        return fields
+
+    # ------------------------------------------------------------------
+    # Aktualisierung
+    # ------------------------------------------------------------------
+    def rebuild(self, records):
+        with self._lock:
+            self._reset()
+            for rec in records:
+                self._add(rec.path, rec, keep_sorted=False)
+            # Vokabular einmalig sortieren statt bei jedem neuen Token einzufügen
+            self._vocab = sorted(self._all)
+            self._field_vocab = {f: sorted(idx) for f, idx in self._by_field.items()}
+
+    def on_change(self, path: str, rec):
+        """Listener für LibraryIndex: rec=None bedeutet gelöscht."""
+        with self._lock:
+            self._remove(path)
+            if rec is not None:
+                self._add(path, rec)
+
+    def __len__(self):
+        return len(self._doc_ids)
+
+    def _add(self, path: str, rec, keep_sorted: bool = True):
+        doc = self._next_id
+        self._next_id += 1
+        self._doc_ids[path] = doc
+        self._paths[doc] = path
+
+        terms = set()
+        for field, value in self.document_fields(rec).items():
+            if not value:
+                continue
+            boost = FIELD_BOOST.get(field, 1.0)
+            field_index = self._by_field.get(field)
+            if field_index is None:
+                field_index = self._by_field[field] = {}
+                self._field_vocab[field] = []
+            for token in self.tokenize(value):
+                postings = self._all.get(token)
+                if postings is None:
+                    postings = self._all[token] = {}
+                    if keep_sorted:
+                        bisect.insort(self._vocab, token)
+                postings[doc] = postings.get(doc, 0.0) + boost
+
+                fpostings = field_index.get(token)
+                if fpostings is None:
+                    fpostings = field_index[token] = {}
+                    if keep_sorted:
+                        bisect.insort(self._field_vocab[field], token)
+                fpostings[doc] = fpostings.get(doc, 0) + 1
+                terms.add((field, token))
+        self._doc_terms[doc] = tuple(terms)
+
+    def _remove(self, path: str):
+        doc = self._doc_ids.pop(path, None)
+        if doc is None:
+            return
+        del self._paths[doc]
+        for field, token in self._doc_terms.pop(doc, ()):
+            postings = self._all.get(token)
+            if postings is not None and postings.pop(doc, None) is not None and not postings:
+                del self._all[token]
+                _discard_sorted(self._vocab, token)
+            field_index = self._by_field.get(field, {})
+            fpostings = field_index.get(token)
+            if fpostings is not None and fpostings.pop(doc, None) is not None and not fpostings:
+                del field_index[token]
+                _discard_sorted(self._field_vocab[field], token)
+
+    # ------------------------------------------------------------------
+    # Suche
+    # ------------------------------------------------------------------
+    def parse_query(self, query: str) -> list:
+        """Zerlegt eine Anfrage in [(field|None, token), ...]."""
+        terms = []
+        for m in _QUERY_RE.finditer(query):
+            field = (m.group(1) or "").lower() or None
+            if field:
+                field = FIELD_ALIASES.get(field, field)
+            text = m.group(2) if m.group(2) is not None else m.group(3)
+            for token in self.tokenize(text):
+                terms.append((field, token))
+        return terms
+
+    def search(self, query: str, limit: int = 0) -> list:
+        """
+        Gibt [(path, score), ...] absteigend nach Relevanz zurück.
+        Alle Terme müssen zutreffen (UND); jeder Term passt auch als Präfix.
+        """
+        terms = self.parse_query(query)
+        if not terms:
+            return []
+        with self._lock:
+            n_docs = max(len(self._doc_ids), 1)
+            scores = None
+            for field, token in terms:
+                term_scores = self._term_scores(field, token, n_docs)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {d: s + term_scores[d] for d, s in scores.items() if d in term_scores}
+                if not scores:
+                    return []
+            ranked = sorted(scores.items(), key=lambda x: (-x[1], self._paths[x[0]]))
+            if limit > 0:
+                ranked = ranked[:limit]
+            return [(self._paths[d], round(s, 4)) for d, s in ranked]
+
+    def _term_scores(self, field, token: str, n_docs: int) -> dict:
+        if field is None:
+            index, vocab = self._all, self._vocab
+        else:
+            index = self._by_field.get(field)
+            vocab = self._field_vocab.get(field)
+            if index is None:
+                return {}
+
+        scores = {}
+        for candidate in _prefix_range(vocab, token):
+            postings = index[candidate]
+            weight = 1.0 if candidate == token else PREFIX_WEIGHT
+            idf = math.log(1.0 + n_docs / len(postings))
+            for doc, tf in postings.items():
+                s = weight * idf * (1.0 + math.log(tf))
+                if s > scores.get(doc, 0.0):
+                    scores[doc] = s
+        return scores
+
+
+def _prefix_range(vocab: list, prefix: str) -> list:
+    """
+    Alle Tokens aus der sortierten Liste, die mit prefix beginnen. Nicht
+    gekürzt: auch kurze Präfixe müssen jedes passende Dokument finden.
+    """
+    start = bisect.bisect_left(vocab, prefix)
+    if len(prefix) < MIN_PREFIX_LENGTH:
+        return [prefix] if start < len(vocab) and vocab[start] == prefix else []
+    # Ende des Bereichs: erstes Token, das größer als jedes Token mit diesem Präfix ist
+    end = bisect.bisect_left(vocab, prefix + "\uffff", start)
+    return vocab[start:end]
+
+
+def _discard_sorted(vocab: list, token: str):
+    i = bisect.bisect_left(vocab, token)
+    if i < len(vocab) and vocab[i] == token:
+        del vocab[i]
@@ -0,0 +1,253 @@
+"""
+LaTeX Quellen Manager - Dateisystem-Überwachung
+
+Beobachtet Verzeichnisse auf geänderte, neue und gelöschte Dateien. Unter
+Linux wird inotify (über ctypes, ohne Zusatzpaket) verwendet, sonst ein
+sparsamer Polling-Fallback mit einem scandir-Durchlauf pro Intervall.
+Änderungen werden kurz gesammelt und gebündelt an den Callback gemeldet.
+
+Dazu ein kleiner Event-Verteiler für Server-Sent Events: jeder Client
+bekommt eine eigene Queue, langsame Clients verlieren alte Ereignisse.
+"""
+
+import os
+import sys
+import json
+import queue
+import select
+import struct
+import threading
+import time
+
+# Polling-Intervall in Sekunden (Fallback ohne inotify)
+POLL_INTERVAL = 1.0
+
+# Wartezeit, in der Ereignisse gesammelt werden (Editoren schreiben oft mehrfach)
+DEBOUNCE = 0.15
+
+# Maximale Anzahl wartender Ereignisse pro SSE-Client
+CLIENT_QUEUE_SIZE = 256
+
+# inotify-Konstanten (linux/inotify.h)
+_IN_MODIFY      = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM  = 0x00000040
+_IN_MOVED_TO    = 0x00000080
+_IN_CREATE      = 0x00000100
+_IN_DELETE      = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_IGNORED     = 0x00008000
+_IN_NONBLOCK    = 0o4000
+_IN_CLOEXEC     = 0o2000000
+_WATCH_MASK = (_IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO |
+               _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MODIFY)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_inotify():
+    """libc mit inotify-Funktionen oder None (z.B. unter Windows)."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError, ImportError):
+        return None
+
+
+class Watcher:
+    """
+    Überwacht Verzeichnisse; callback(paths) erhält die Menge der geänderten Pfade.
+    watch(directory, predicate): predicate(dateiname) filtert relevante Dateien.
+    """
+
+    def __init__(self, callback, interval: float = POLL_INTERVAL, use_inotify: bool = True):
+        self._callback = callback
+        self._interval = interval
+        self._targets = {}            # Verzeichnis -> [predicate, ...]
+        self._stop = threading.Event()
+        self._thread = None
+        self._libc = _load_inotify() if use_inotify else None
+        self.backend = "inotify" if self._libc is not None else "polling"
+
+    def watch(self, directory, predicate):
+        directory = os.path.abspath(str(directory))
+        self._targets.setdefault(directory, []).append(predicate)
+
+    def _relevant(self, directory: str, name: str) -> bool:
+        return any(p(name) for p in self._targets.get(directory, ()))
+
+    def start(self):
+        if self._thread is not None or not self._targets:
+            return
+        self._stop.clear()
+        run = self._run_inotify if self._libc is not None else self._run_polling
+        self._thread = threading.Thread(target=run, name="lqm-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2 * self._interval)
+            self._thread = None
+
+    def _emit(self, paths: set):
+        if paths:
+            try:
+                self._callback(paths)
+            except Exception as e:
+                print(f"  Warnung: Fehler bei der Verarbeitung von Dateiänderungen: {e}")
+
+    # ------------------------------------------------------------------
+    # inotify
+    # ------------------------------------------------------------------
+    def _run_inotify(self):
+        fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            self.backend = "polling"
+            return self._run_polling()
+        try:
+            watches = {}
+            for directory in self._targets:
+                wd = self._libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK)
+                if wd >= 0:
+                    watches[wd] = directory
+            if not watches:
+                self.backend = "polling"
+                return self._run_polling()
+
+            pending = set()
+            first = 0.0
+            while not self._stop.is_set():
+                # Nach dem ersten Ereignis nur noch kurz weitersammeln
+                timeout = DEBOUNCE if pending else self._interval
+                ready, _, _ = select.select([fd], [], [], timeout)
+                if not ready or (pending and time.monotonic() - first > self._interval):
+                    self._emit(pending)
+                    pending = set()
+                    if not ready:
+                        continue
+                if not pending:
+                    first = time.monotonic()
+                try:
+                    data = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                pending |= self._parse_events(data, watches)
+        finally:
+            os.close(fd)
+
+    def _parse_events(self, data: bytes, watches: dict) -> set:
+        paths = set()
+        pos = 0
+        while pos + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, pos)
+            pos += _EVENT_HEADER.size
+            name = os.fsdecode(data[pos:pos + length].rstrip(b"\0"))
+            pos += length
+            directory = watches.get(wd)
+            if directory is None or mask & _IN_IGNORED:
+                continue
+            if name and self._relevant(directory, name):
+                paths.add(os.path.join(directory, name))
+        return paths
+
+    # ------------------------------------------------------------------
+    # Polling
+    # ------------------------------------------------------------------
+    def _snapshot(self) -> dict:
+        snap = {}
+        for directory in self._targets:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for de in entries:
+                if not self._relevant(directory, de.name):
+                    continue
+                try:
+                    st = de.stat()
+                except OSError:
+                    continue
+                snap[de.path] = (st.st_mtime_ns, st.st_size)
+        return snap
+
+    def _run_polling(self):
+        before = self._snapshot()
+        while not self._stop.wait(self._interval):
+            after = self._snapshot()
+            changed = {p for p in before.keys() | after.keys() if before.get(p) != after.get(p)}
+            before = after
+            self._emit(changed)
+
+
+class EventBroker:
+    """
+    Verteilt Ereignisse (dicts) an die verbundenen SSE-Clients. Clients und
+    Ereignisse können einem Bereich (z.B. dem Zielverzeichnis eines
+    Projekts) zugeordnet sein; ein Ereignis mit Bereich erreicht nur Clients
+    desselben Bereichs, Ereignisse und Clients ohne Bereich gelten für alle.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = {}            # Queue -> Bereich (None = alle)
+        self._closed = False
+
+    def subscribe(self, scope=None) -> queue.Queue:
+        """Queue für einen neuen Client; None in der Queue bedeutet Ende des Stroms."""
+        q = queue.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        with self._lock:
+            if self._closed:
+                q.put_nowait(None)
+            else:
+                self._clients[q] = scope
+        return q
+
+    def unsubscribe(self, q: queue.Queue):
+        with self._lock:
+            self._clients.pop(q, None)
+
+    def publish(self, event: dict, scope=None):
+        with self._lock:
+            clients = [q for q, s in self._clients.items()
+                       if scope is None or s is None or s == scope]
+        if not clients:
+            return
+        data = format_sse(event)
+        for q in clients:
+            _put_latest(q, data)
+
+    def close(self):
+        """Beendet die Ströme aller Clients (z.B. beim Herunterfahren des Servers)."""
+        with self._lock:
+            self._closed = True
+            clients = list(self._clients)
+            self._clients.clear()
+        for q in clients:
+            _put_latest(q, None)
+
+    def __len__(self):
+        return len(self._clients)
+
+
+def _put_latest(q: queue.Queue, data):
+    try:
+        q.put_nowait(data)
+    except queue.Full:
+        # Client kommt nicht hinterher: ältestes Ereignis verwerfen
+        try:
+            q.get_nowait()
+            q.put_nowait(data)
+        except (queue.Empty, queue.Full):
+            pass
+
+
+def format_sse(event: dict) -> str:
+    """Formatiert ein Ereignis als SSE-Nachricht (Ereignisname aus event["type"])."""
+    payload = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event.get('type', 'message')}\ndata: {payload}\n\n"
@@ -0,0 +1,457 @@
+"""
+LaTeX Quellen Manager - Modell der LaTeX-Hauptdatei
+
+Hält die Hauptdatei im Speicher samt der Menge aller ``\\addbibresource``-
+Einträge. Abschnittsmarker-Positionen, das Ende des Präambels
+(``\\begin{document}``), die letzte ``\\addbibresource``-Zeile und die
+Kommentarzeilen werden bei Bedarf ermittelt und bis zur nächsten Änderung
+gecacht. Das Modell wird bei jedem Zugriff per stat (mtime + Größe)
+geprüft und nur bei externen Änderungen neu eingelesen. Eigene Änderungen
+werden per Splicing an bekannten Offsets vorgenommen und direkt übernommen.
+
+Alle Änderungen laufen über einen LatexWriter je Datei: ein Worker-Thread
+arbeitet die Warteschlange ab, fasst alle gerade wartenden Änderungen zu
+einem Schreibzugriff zusammen und schreibt atomar (temporäre Datei +
+rename). Aufrufer warten auf das Ergebnis ihrer eigenen Änderung.
+"""
+
+import os
+import re
+import queue
+import shutil
+import threading
+import contextlib
+import contextvars
+from collections import Counter, OrderedDict
+
+# Anzahl gleichzeitig gehaltener Dateien (mehrere Projekte)
+MODEL_CACHE_SIZE = 4
+
+# Ein Writer-Thread beendet sich nach so vielen Sekunden ohne Aufträge
+WRITER_IDLE_TIMEOUT = 30.0
+
+# Höchstzahl der Änderungen, die zu einem Schreibzugriff zusammengefasst werden
+WRITER_MAX_BATCH = 256
+
+_RESOURCE_RE = re.compile(r"\\addbibresource\{[^}]+\}")
+_RESOURCE_WORD = "\\addbibresource"
+# Direkt aufeinanderfolgende Zeilen, die mit \addbibresource beginnen
+_RESOURCE_RUN = re.compile(r"(?:[ \t\r\f\v]*\\addbibresource[^\n]*(?:\n|\Z))*")
+_COMMENT_RE = re.compile(r"^(%[^\n]+)", re.MULTILINE)
+_BEGIN_DOCUMENT = "\\begin{document}"
+
+
+class LatexMainFile:
+    """Per mtime validiertes Modell einer LaTeX-Hauptdatei."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.lock = threading.RLock()
+        self._stat = None
+        self._content = ""
+        self._resources = Counter()   # \addbibresource{...} -> Anzahl im Text
+        self._derived = {}            # Cache abgeleiteter Positionen, gilt bis zur nächsten Änderung
+        self._batch_depth = 0
+        self._pending = False         # im Batch geändert, noch nicht geschrieben
+
+    # ------------------------------------------------------------------
+    # Laden & Validieren
+    # ------------------------------------------------------------------
+    def _ensure(self):
+        if self._batch_depth and self._stat is not None:
+            # Im Batch gilt der Stand im Speicher (noch nicht geschrieben)
+            return
+        st = os.stat(self.path)
+        key = (st.st_mtime_ns, st.st_size)
+        if key != self._stat:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._set_content(f.read())
+            self._resources = Counter(_RESOURCE_RE.findall(self._content))
+            self._stat = key
+
+    def _set_content(self, content: str):
+        self._content = content
+        self._derived = {}
+
+    def _cached(self, key, compute):
+        value = self._derived.get(key)
+        if value is None:
+            value = self._derived[key] = compute()
+        return value
+
+    # ------------------------------------------------------------------
+    # Abfragen (jeweils mit vorheriger stat-Prüfung)
+    # ------------------------------------------------------------------
+    @property
+    def content(self) -> str:
+        with self.lock:
+            self._ensure()
+            return self._content
+
+    def has_resource(self, line: str) -> bool:
+        """Ist die \\addbibresource{...}-Zeile bereits vorhanden? (Mengen-Lookup)"""
+        with self.lock:
+            self._ensure()
+            return self._resources[line] > 0
+
+    def resources(self) -> set:
+        with self.lock:
+            self._ensure()
+            return {r for r, n in self._resources.items() if n > 0}
+
+    def position_after(self, search_text: str):
+        """
+        Position hinter der Zeile mit search_text und den direkt folgenden
+        \\addbibresource-Zeilen, oder None. Eine Position hinter der letzten
+        Zeile ohne Zeilenumbruch ist len(content) + 1.
+        """
+        if not search_text:
+            return None
+        with self.lock:
+            self._ensure()
+            pos = self._cached(("after", search_text), lambda: self._position_after(search_text))
+            return pos if pos >= 0 else None
+
+    def _position_after(self, search_text: str) -> int:
+        c = self._content
+        idx = c.find(search_text)
+        if idx == -1:
+            return -1
+        pos = _line_end(c, idx)
+        if pos > len(c):
+            return pos
+        end = _RESOURCE_RUN.match(c, pos).end()
+        if end > pos and end == len(c) and not c.endswith("\n"):
+            # Letzte Zeile ohne Zeilenumbruch
+            return end + 1
+        return end
+
+    @property
+    def last_resource_end(self) -> int:
+        """Position hinter der letzten \\addbibresource-Zeile (-1 = keine)."""
+        with self.lock:
+            self._ensure()
+            return self._cached("last", self._last_resource_end)
+
+    def _last_resource_end(self) -> int:
+        c = self._content
+        end = len(c)
+        while True:
+            i = c.rfind(_RESOURCE_WORD, 0, end)
+            if i == -1:
+                return -1
+            m = _RESOURCE_RE.match(c, i)
+            if m is not None:
+                return _line_end(c, m.end())
+            end = i
+
+    @property
+    def begin_document(self) -> int:
+        """Ende des Präambels: Position von \\begin{document} (-1 = nicht vorhanden)."""
+        with self.lock:
+            self._ensure()
+            return self._cached("begin", lambda: self._content.find(_BEGIN_DOCUMENT))
+
+    def comment_lines(self) -> list:
+        """Alle Zeilen, die mit % beginnen (z.B. Abschnittsmarker)."""
+        with self.lock:
+            self._ensure()
+            return self._cached("comments", lambda: _COMMENT_RE.findall(self._content))
+
+    def resource_lines_containing(self, text: str) -> list:
+        """[(Start, Ende)] aller Zeilen, die \\addbibresource und text enthalten."""
+        with self.lock:
+            self._ensure()
+            c = self._content
+            spans = []
+            i = c.find(text) if text else -1
+            while i != -1:
+                start = c.rfind("\n", 0, i) + 1
+                end = min(_line_end(c, i), len(c))
+                if _RESOURCE_WORD in c[start:end]:
+                    spans.append((start, end))
+                i = c.find(text, end)
+            return spans
+
+    def stale_cache(self) -> list:
+        """
+        Gecachte Werte, die von einer Neuberechnung aus dem Inhalt abweichen
+        (Prüfung der inkrementellen Pflege; leer = alles stimmt).
+        """
+        with self.lock:
+            self._ensure()
+            fresh = LatexMainFile(self.path)
+            fresh._content = self._content
+            compute = {"last": fresh._last_resource_end,
+                       "begin": lambda: fresh._content.find(_BEGIN_DOCUMENT),
+                       "comments": lambda: _COMMENT_RE.findall(fresh._content)}
+            stale = []
+            for key, value in self._derived.items():
+                if isinstance(key, tuple):
+                    expected = fresh._position_after(key[1])
+                else:
+                    expected = compute[key]()
+                if value != expected:
+                    stale.append(key)
+            if +self._resources != Counter(_RESOURCE_RE.findall(self._content)):
+                stale.append("resources")
+            return stale
+
+    # ------------------------------------------------------------------
+    # Ändern
+    # ------------------------------------------------------------------
+    def splice(self, edits) -> str:
+        """
+        Wendet [(Start, Ende, Text)] auf den aktuellen Inhalt an (von hinten
+        nach vorne, Positionen beziehen sich auf den unveränderten Inhalt).
+        Gibt den neuen Inhalt zurück, ohne ihn zu schreiben.
+        """
+        with self.lock:
+            self._ensure()
+            parts = []
+            last = len(self._content)
+            for start, end, text in sorted(edits, key=lambda e: (e[0], e[1]), reverse=True):
+                parts.append(self._content[end:last])
+                parts.append(text)
+                last = start
+            parts.append(self._content[:last])
+            return "".join(reversed(parts))
+
+    def removal_edits(self, spans) -> tuple:
+        """
+        Edits zum Entfernen der Zeilen [(Start, Ende)]; Leerzeilen an den
+        Schnittstellen werden auf höchstens eine zusammengefasst.
+        Gibt (Edits, Liste der entfernten Texte) zurück.
+        """
+        with self.lock:
+            self._ensure()
+            c = self._content
+            edits, removed = [], []
+            for start, end in _merge_spans(spans):
+                # Leerzeilen vor und nach der entfernten Stelle
+                p = start
+                while p > 0:
+                    ls = c.rfind("\n", 0, p - 1) + 1
+                    if c[ls:p].strip():
+                        break
+                    p = ls
+                q = end
+                while q < len(c):
+                    le = min(_line_end(c, q), len(c))
+                    if c[q:le].strip():
+                        break
+                    q = le
+                edits.append((p, q, "\n" if (p < start or q > end) else ""))
+                removed.append(c[start:end])
+            return edits, removed
+
+    def apply(self, edits, added=(), removed=()):
+        """
+        Wendet die Edits an, schreibt die Datei und übernimmt den neuen Inhalt
+        direkt ins Modell. added/removed: eingefügter bzw. entfernter Text, um
+        die Menge der \\addbibresource-Einträge inkrementell nachzuführen.
+        Innerhalb von batch() wird erst am Ende des Blocks geschrieben.
+        """
+        with self.lock:
+            content = self.splice(edits)
+            derived, old_len = self._derived, len(self._content)
+            self._set_content(content)
+            if all(start == end for start, end, _ in edits):
+                # Reine Einfügungen: gecachte Positionen verschieben statt neu suchen
+                self._derived = _shift_positions(derived, edits, old_len)
+            for text in added:
+                self._resources.update(_RESOURCE_RE.findall(text))
+            for text in removed:
+                self._resources.subtract(_RESOURCE_RE.findall(text))
+            if self._batch_depth:
+                self._pending = True
+            else:
+                self._write()
+
+    def _write(self):
+        """Schreibt den Inhalt atomar (temporäre Datei + rename); LaTeX liest nie eine halbe Datei."""
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self._content)
+        try:
+            shutil.copymode(self.path, tmp)
+        except OSError:
+            pass
+        os.replace(tmp, self.path)
+        st = os.stat(self.path)
+        self._stat = (st.st_mtime_ns, st.st_size)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Fasst alle apply()-Aufrufe im Block zu einem Schreibzugriff zusammen.
+        Bricht der Block mit einer Ausnahme ab, wird nichts geschrieben und
+        die Datei beim nächsten Zugriff neu eingelesen.
+        """
+        with self.lock:
+            self._ensure()
+            self._batch_depth += 1
+            ok = False
+            try:
+                yield self
+                ok = True
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth and self._pending:
+                    self._pending = False
+                    if ok:
+                        try:
+                            self._write()
+                        except BaseException:
+                            self._stat = None
+                            raise
+                    else:
+                        self._stat = None
+
+
+def _line_end(content: str, pos: int) -> int:
+    """Position hinter dem Zeilenumbruch der Zeile, in der pos liegt."""
+    end = content.find("\n", pos)
+    return len(content) + 1 if end == -1 else end + 1
+
+
+def _shift_positions(derived: dict, edits, old_len: int) -> dict:
+    """Verschiebt gecachte Positionen um davor eingefügten Text; der Rest wird neu ermittelt."""
+    shifted = {}
+    for key, pos in derived.items():
+        if key == "comments" or pos > old_len:
+            continue
+        if pos >= 0 and any(start == pos for start, _end, _text in edits):
+            # Einfügung genau an der Position: ob sie davor oder dahinter
+            # gehört (z.B. Block am Dateiende mit Leerzeile), neu ermitteln
+            continue
+        if key == "last" and any(_RESOURCE_WORD in text for start, _end, text in edits
+                                 if pos < 0 or start > pos):
+            # Eingefügte \addbibresource-Zeilen hinter der letzten bisherigen
+            # werden zur neuen letzten
+            continue
+        if pos >= 0:
+            pos += sum(len(text) for start, _end, text in edits if start < pos)
+        shifted[key] = pos
+    return shifted
+
+
+def _merge_spans(spans) -> list:
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+_models = OrderedDict()
+_models_lock = threading.Lock()
+
+
+def latex_main_file(path) -> LatexMainFile:
+    """Gecachtes Modell für path (LRU über wenige Dateien)."""
+    key = os.path.abspath(str(path))
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            model = _models[key] = LatexMainFile(path)
+        _models.move_to_end(key)
+        while len(_models) > MODEL_CACHE_SIZE:
+            _models.popitem(last=False)
+        return model
+
+
+# ---------------------------------------------------------------------------
+# Schreib-Warteschlange
+# ---------------------------------------------------------------------------
+class LatexWriter:
+    """
+    Einziger Schreiber einer Hauptdatei. submit(fn) reiht fn(model) ein; der
+    Worker führt alle wartenden Aufträge nacheinander auf dem Modell im
+    Speicher aus (jeweils im Kontext des Aufrufers, z.B. dessen Projekt) und
+    schreibt danach einmal. Schlägt das Schreiben fehl, erhalten alle
+    Aufträge des Batches die Ausnahme.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(str(path))
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.batches = 0              # Schreibzugriffe
+        self.jobs = 0                 # ausgeführte Aufträge
+
+    def submit(self, fn):
+        """Reiht fn(model) ein; gibt ein concurrent.futures.Future zurück."""
+        # Erst hier importiert: concurrent.futures lädt logging (Startzeit der CLI)
+        from concurrent.futures import Future
+        future = Future()
+        with self._lock:
+            self._queue.put((contextvars.copy_context(), fn, future))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="latex-writer", daemon=True)
+                self._thread.start()
+        return future
+
+    def run(self, fn, timeout=None):
+        """Führt fn(model) über die Warteschlange aus und gibt sein Ergebnis zurück."""
+        if threading.current_thread() is self._thread:
+            # Aufruf aus einem laufenden Auftrag: direkt im selben Batch
+            return fn(latex_main_file(self.path))
+        return self.submit(fn).result(timeout)
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=WRITER_IDLE_TIMEOUT)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+                continue
+            jobs = [first]
+            while len(jobs) < WRITER_MAX_BATCH:
+                try:
+                    jobs.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._process(jobs)
+
+    def _process(self, jobs):
+        jobs = [job for job in jobs if job[2].set_running_or_notify_cancel()]
+        model = latex_main_file(self.path)
+        results = []
+        try:
+            with model.batch():
+                for ctx, fn, future in jobs:
+                    try:
+                        results.append((future, ctx.run(fn, model), None))
+                    except Exception as e:
+                        results.append((future, None, e))
+        except Exception as e:
+            # Lesen oder Schreiben fehlgeschlagen: keine Änderung ist wirksam geworden
+            results = [(future, None, e) for _ctx, _fn, future in jobs]
+        self.batches += 1
+        self.jobs += len(results)
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def latex_writer(path) -> LatexWriter:
+    """Der Writer für path (einer je Datei, solange der Prozess läuft)."""
+    key = os.path.abspath(str(path))
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = LatexWriter(key)
+        return writer
@@ -10,451 +10,146 @@ import os
 import sys
 import re
 import json
-import unicodedata
+import signal
+import socket
+import argparse
 import threading
 import subprocess
 import webbrowser
 import datetime
 import pathlib
-from flask import Flask, request, jsonify, render_template, send_from_directory, make_response
+import hashlib
+import time
+import gzip
+import queue
+import functools
+from collections import OrderedDict
+from flask import Flask, Response, request, jsonify, render_template, send_from_directory, make_response
+
+from lqm_core import (
+    BASE_DIR, CACHE_DIR, DEFAULT_SETTINGS, ENTRY_TYPES,
+    current_project, project_scope, settings,
+    normalize_string, generate_cite_key, generate_filename, generate_bibtex, entry_comment,
+    parse_bib_entry, index_file_for, lint_cache_file_for, EXPORT_DEDUP, iter_export, AGGREGATE_DIR, section_labels,
+    bib_rel_path, remove_from_latex_main, update_latex_main, update_latex_main_groups,
+    update_latex_main_many, remove_resources,
+)
+from bib_index import LibraryIndex, record_to_json, format_mtime
+from bib_search import SearchIndex
+from bib_keys import KeyRegistry, unique_key
+from bib_duplicates import DuplicateDetector
+from bib_import import BulkImporter
+from bib_aggregate import AggregateStore
+from bib_history import HistoryStore, HISTORY_DIR, SAVE, EDIT, RENAME, DELETE, IMPORT, ENRICH, RESTORE
+from bib_lint import LintEngine, build_schema, format_lint_report, ERROR, WARNING
+from bib_resolve import Resolver, ResponseCache, ResolveError, build_backends, add_fields
+from bib_watch import Watcher, EventBroker, format_sse
+from latex_model import latex_main_file
+from latex_scan import CitationScanner
+from request_metrics import Metrics, InstrumentedApp, SlowRequestProfiler, ROUTE_KEY
 
 # ---------------------------------------------------------------------------
 # Pfad-Konfiguration
 # ---------------------------------------------------------------------------
-BASE_DIR = pathlib.Path(__file__).parent.resolve()
-SETTINGS_FILE = BASE_DIR / "bibtex_generator_settings.json"
 TEMPLATES_DIR = BASE_DIR / "templates"
 STATIC_DIR = BASE_DIR / "static"
 
 app = Flask(__name__, template_folder=str(TEMPLATES_DIR), static_folder=str(STATIC_DIR))
 
 # ---------------------------------------------------------------------------
-# Standard-Einstellungen
-# ---------------------------------------------------------------------------
-DEFAULT_SETTINGS = {
-    "target_directory": "",
-    "latex_main_path": "",
-    "last_entry_type": "online",
-    "add_date_comment": True,
-    "auto_open_browser": True,
-    "port": 5000,
-    "bib_placement_sections": [
-        {"id": "s1", "label": "Bücher", "search_text": "% Bücher", "active": False},
-        {"id": "s2", "label": "Online-Quellen", "search_text": "% Online-Quellen", "active": False},
-        {"id": "s3", "label": "Artikel & Zeitschriften", "search_text": "% Artikel", "active": False},
-        {"id": "s4", "label": "Berichte & Normen", "search_text": "% Berichte", "active": False},
-        {"id": "s5", "label": "Sonstiges", "search_text": "% Sonstiges", "active": False},
-    ],
-    "default_section_id": "",
-    "addbibresource_placement": {
-        "enabled": False,
-        "search_text": "% Literaturverzeichnis",
-        "after_last_existing": True,
-    },
-}
-
-# ---------------------------------------------------------------------------
-# Alle BibTeX-Eintragstypen (Deutsch) mit ihren Feldern
-# ---------------------------------------------------------------------------
-ENTRY_TYPES = {
-    "online": {
-        "label": "Online-Quelle / Website",
-        "icon": "bi-globe",
-        "fields": [
-            {"key": "author",       "label": "Autor(en)",              "required": True,  "placeholder": "Nachname, Vorname and Nachname2, Vorname2"},
-            {"key": "title",        "label": "Titel",                  "required": True,  "placeholder": "Titel der Webseite"},
-            {"key": "url",          "label": "URL",                    "required": True,  "placeholder": "https://..."},
-            {"key": "urldate",      "label": "Abrufdatum",             "required": True,  "placeholder": "JJJJ-MM-TT", "type": "date"},
-            {"key": "date",         "label": "Veröffentlichungsdatum", "required": False, "placeholder": "JJJJ oder JJJJ-MM-TT", "type": "date"},
-            {"key": "organization", "label": "Organisation / Betreiber","required": False, "placeholder": "Name der Organisation"},
-            {"key": "subtitle",     "label": "Untertitel",             "required": False, "placeholder": "Optionaler Untertitel"},
-            {"key": "note",         "label": "Anmerkung",              "required": False, "placeholder": "Zusätzliche Hinweise"},
-        ]
-    },
-    "book": {
-        "label": "Buch (Monographie)",
-        "icon": "bi-book",
-        "fields": [
-            {"key": "author",    "label": "Autor(en)",          "required": True,  "placeholder": "Nachname, Vorname"},
-            {"key": "title",     "label": "Titel",              "required": True,  "placeholder": "Buchtitel"},
-            {"key": "publisher", "label": "Verlag",             "required": True,  "placeholder": "Verlagsname"},
-            {"key": "date",      "label": "Erscheinungsjahr",   "required": True,  "placeholder": "JJJJ", "type": "year"},
-            {"key": "location",  "label": "Erscheinungsort",    "required": False, "placeholder": "Stadt"},
-            {"key": "edition",   "label": "Auflage",            "required": False, "placeholder": "z.B. 3 oder Dritte"},
-            {"key": "isbn",      "label": "ISBN",               "required": False, "placeholder": "978-3-..."},
-            {"key": "series",    "label": "Schriftenreihe",     "required": False, "placeholder": "Name der Reihe"},
-            {"key": "volume",    "label": "Band",               "required": False, "placeholder": "Bandnummer"},
-            {"key": "subtitle",  "label": "Untertitel",         "required": False, "placeholder": "Optionaler Untertitel"},
-            {"key": "editor",    "label": "Herausgeber",        "required": False, "placeholder": "Nur wenn kein Autor"},
-            {"key": "note",      "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
-        ]
-    },
-    "article": {
-        "label": "Zeitschriftenartikel",
-        "icon": "bi-journal-text",
-        "fields": [
-            {"key": "author",   "label": "Autor(en)",          "required": True,  "placeholder": "Nachname, Vorname"},
-            {"key": "title",    "label": "Titel des Artikels", "required": True,  "placeholder": "Artikeltitel"},
-            {"key": "journal",  "label": "Zeitschrift",        "required": True,  "placeholder": "Name der Zeitschrift"},
-            {"key": "date",     "label": "Erscheinungsjahr",   "required": True,  "placeholder": "JJJJ", "type": "year"},
-            {"key": "volume",   "label": "Jahrgang / Band",    "required": False, "placeholder": "z.B. 42"},
-            {"key": "number",   "label": "Heft / Ausgabe",     "required": False, "placeholder": "z.B. 3"},
-            {"key": "pages",    "label": "Seiten",             "required": False, "placeholder": "z.B. 123--145"},
-            {"key": "doi",      "label": "DOI",                "required": False, "placeholder": "10.xxxx/xxxxx"},
-            {"key": "issn",     "label": "ISSN",               "required": False, "placeholder": "XXXX-XXXX"},
-            {"key": "url",      "label": "URL",                "required": False, "placeholder": "https://..."},
-            {"key": "subtitle", "label": "Untertitel",         "required": False, "placeholder": "Optionaler Untertitel"},
-            {"key": "note",     "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
-        ]
-    },
-    "inbook": {
-        "label": "Buchkapitel",
-        "icon": "bi-bookmark",
-        "fields": [
-            {"key": "author",    "label": "Autor(en)",          "required": True,  "placeholder": "Nachname, Vorname"},
-            {"key": "title",     "label": "Titel des Kapitels", "required": True,  "placeholder": "Kapiteltitel"},
-            {"key": "booktitle", "label": "Buchtitel",          "required": True,  "placeholder": "Titel des Gesamtwerks"},
-            {"key": "publisher", "label": "Verlag",             "required": True,  "placeholder": "Verlagsname"},
-            {"key": "date",      "label": "Erscheinungsjahr",   "required": True,  "placeholder": "JJJJ", "type": "year"},
-            {"key": "pages",     "label": "Seiten",             "required": False, "placeholder": "z.B. 123--145"},
-            {"key": "chapter",   "label": "Kapitel-Nr.",        "required": False, "placeholder": "z.B. 5"},
-            {"key": "editor",    "label": "Herausgeber",        "required": False, "placeholder": "Nachname, Vorname"},
-            {"key": "location",  "label": "Erscheinungsort",    "required": False, "placeholder": "Stadt"},
-            {"key": "edition",   "label": "Auflage",            "required": False, "placeholder": "z.B. 2"},
-            {"key": "isbn",      "label": "ISBN",               "required": False, "placeholder": "978-3-..."},
-            {"key": "note",      "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
-        ]
-    },
-    "incollection": {
-        "label": "Beitrag in Sammelwerk",
-        "icon": "bi-collection",
-        "fields": [
-            {"key": "author",    "label": "Autor(en)",          "required": True,  "placeholder": "Nachname, Vorname"},
-            {"key": "title",     "label": "Titel des Beitrags","required": True,  "placeholder": "Beitragstitel"},
-            {"key": "booktitle", "label": "Titel des Sammelwerks","required": True,"placeholder": "Sammelwerkstitel"},
-            {"key": "editor",    "label": "Herausgeber",        "required": True,  "placeholder": "Nachname, Vorname"},
-            {"key": "publisher", "label": "Verlag",             "required": True,  "placeholder": "Verlagsname"},
-            {"key": "date",      "label": "Erscheinungsjahr",   "required": True,  "placeholder": "JJJJ", "type": "year"},
-            {"key": "pages",     "label": "Seiten",             "required": False, "placeholder": "z.B. 45--67"},
-            {"key": "location",  "label": "Erscheinungsort",    "required": False, "placeholder": "Stadt"},
-            {"key": "isbn",      "label": "ISBN",               "required": False, "placeholder": "978-3-..."},
-            {"key": "note",      "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
-        ]
-    },
-    "inproceedings": {
-        "label": "Konferenzbeitrag",
-        "icon": "bi-people",
-        "fields": [
-            {"key": "author",       "label": "Autor(en)",           "required": True,  "placeholder": "Nachname, Vorname"},
-            {"key": "title",        "label": "Titel des Beitrags",  "required": True,  "placeholder": "Vortragstitel"},
-            {"key": "booktitle",    "label": "Name der Konferenz",  "required": True,  "placeholder": "Proceedings of ..."},
-            {"key": "date",         "label": "Jahr",                "required": True,  "placeholder": "JJJJ", "type": "year"},
-            {"key": "pages",        "label": "Seiten",              "required": False, "placeholder": "z.B. 10--18"},
-            {"key": "editor",       "label": "Herausgeber",         "required": False, "placeholder": "Nachname, Vorname"},
-            {"key": "publisher",    "label": "Verlag",              "required": False, "placeholder": "Verlagsname"},
-            {"key": "location",     "label": "Veranstaltungsort",   "required": False, "placeholder": "Stadt, Land"},
-            {"key": "organization", "label": "Veranstalter",        "required": False, "placeholder": "Name der Organisation"},
-            {"key": "doi",          "label": "DOI",                 "required": False, "placeholder": "10.xxxx/xxxxx"},
-            {"key": "isbn",         "label": "ISBN",                "required": False, "placeholder": "978-3-..."},
-            {"key": "note",         "label": "Anmerkung",           "required": False, "placeholder": "Zusätzliche Hinweise"},
-        ]
-    },
-    "proceedings": {
-        "label": "Konferenzband",
-        "icon": "bi-journals",
-        "fields": [
-            {"key": "title",        "label": "Titel des Tagungsbands","required": True,  "placeholder": "Proceedings of ..."},
-            {"key": "editor",       "label": "Herausgeber",           "required": True,  "placeholder": "Nachname, Vorname"},
-            {"key": "date",         "label": "Jahr",                  "required": True,  "placeholder": "JJJJ", "type": "year"},
-            {"key": "publisher",    "label": "Verlag",                "required": False, "placeholder": "Verlagsname"},
-            {"key": "location",     "label": "Erscheinungsort",       "required": False, "placeholder": "Stadt"},
-            {"key": "organization", "label": "Veranstalter",          "required": False, "placeholder": "Name der Organisation"},
-            {"key": "isbn",         "label": "ISBN",                  "required": False, "placeholder": "978-3-..."},
-            {"key": "note",         "label": "Anmerkung",             "required": False, "placeholder": "Zusätzliche Hinweise"},
-        ]
-    },
-    "techreport": {
-        "label": "Technischer Bericht",
-        "icon": "bi-file-earmark-text",
-        "fields": [
-            {"key": "author",      "label": "Autor(en)",          "required": True,  "placeholder": "Nachname, Vorname"},
-            {"key": "title",       "label": "Titel",              "required": True,  "placeholder": "Berichtstitel"},
-            {"key": "institution", "label": "Institution",        "required": True,  "placeholder": "Name der Institution"},
-            {"key": "date",        "label": "Jahr",               "required": True,  "placeholder": "JJJJ", "type": "year"},
-            {"key": "type",        "label": "Berichtstyp",        "required": False, "placeholder": "z.B. Technical Report"},
-            {"key": "number",      "label": "Berichtsnummer",     "required": False, "placeholder": "z.B. TR-2024-001"},
-            {"key": "location",    "label": "Ort",                "required": False, "placeholder": "Stadt"},
-            {"key": "url",         "label": "URL",                "required": False, "placeholder": "https://..."},
-            {"key": "note",        "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
-        ]
-    },
-    "report": {
-        "label": "Bericht / Forschungsbericht",
-        "icon": "bi-clipboard-data",
-        "fields": [
-            {"key": "author",      "label": "Autor(en)",          "required": True,  "placeholder": "Nachname, Vorname"},
-            {"key": "title",       "label": "Titel",              "required": True,  "placeholder": "Berichtstitel"},
-            {"key": "institution", "label": "Institution",        "required": True,  "placeholder": "Name der Institution"},
-            {"key": "date",        "label": "Jahr",               "required": True,  "placeholder": "JJJJ", "type": "year"},
-            {"key": "type",        "label": "Berichtsart",        "required": False, "placeholder": "z.B. Forschungsbericht"},
-            {"key": "number",      "label": "Berichtsnummer",     "required": False, "placeholder": "z.B. 2024/01"},
-            {"key": "location",    "label": "Ort",                "required": False, "placeholder": "Stadt"},
-            {"key": "url",         "label": "URL",                "required": False, "placeholder": "https://..."},
-            {"key": "note",        "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
-        ]
-    },
-    "mastersthesis": {
-        "label": "Masterarbeit",
-        "icon": "bi-mortarboard",
-        "fields": [
-            {"key": "author",      "label": "Autor",              "required": True,  "placeholder": "Nachname, Vorname"},
-            {"key": "title",       "label": "Titel",              "required": True,  "placeholder": "Titel der Masterarbeit"},
-            {"key": "institution", "label": "Hochschule",         "required": True,  "placeholder": "Name der Hochschule"},
-            {"key": "date",        "label": "Jahr",               "required": True,  "placeholder": "JJJJ", "type": "year"},
-            {"key": "location",    "label": "Ort",                "required": False, "placeholder": "Ort der Hochschule"},
-            {"key": "type",        "label": "Typ",                "required": False, "placeholder": "Masterarbeit"},
-            {"key": "url",         "label": "URL",                "required": False, "placeholder": "https://..."},
-            {"key": "note",        "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
-        ]
-    },
-    "phdthesis": {
-        "label": "Dissertation / Doktorarbeit",
-        "icon": "bi-award",
-        "fields": [
-            {"key": "author",      "label": "Autor",              "required": True,  "placeholder": "Nachname, Vorname"},
-            {"key": "title",       "label": "Titel",              "required": True,  "placeholder": "Titel der Dissertation"},
-            {"key": "institution", "label": "Universität",        "required": True,  "placeholder": "Name der Universität"},
-            {"key": "date",        "label": "Jahr",               "required": True,  "placeholder": "JJJJ", "type": "year"},
-            {"key": "location",    "label": "Ort",                "required": False, "placeholder": "Ort der Universität"},
-            {"key": "url",         "label": "URL",                "required": False, "placeholder": "https://..."},
-            {"key": "doi",         "label": "DOI",                "required": False, "placeholder": "10.xxxx/xxxxx"},
-            {"key": "note",        "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
-        ]
-    },
-    "thesis": {
-        "label": "Abschlussarbeit (allgemein)",
-        "icon": "bi-file-earmark-ruled",
-        "fields": [
-            {"key": "author",      "label": "Autor",              "required": True,  "placeholder": "Nachname, Vorname"},
-            {"key": "title",       "label": "Titel",              "required": True,  "placeholder": "Titel der Arbeit"},
-            {"key": "institution", "label": "Hochschule",         "required": True,  "placeholder": "Name der Hochschule"},
-            {"key": "date",        "label": "Jahr",               "required": True,  "placeholder": "JJJJ", "type": "year"},
-            {"key": "type",        "label": "Typ der Arbeit",     "required": True,  "placeholder": "z.B. Bachelorarbeit, Seminararbeit"},
-            {"key": "location",    "label": "Ort",                "required": False, "placeholder": "Ort der Hochschule"},
-            {"key": "url",         "label": "URL",                "required": False, "placeholder": "https://..."},
-            {"key": "note",        "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
-        ]
-    },
-    "manual": {
-        "label": "Handbuch / Dokumentation",
-        "icon": "bi-tools",
-        "fields": [
-            {"key": "title",        "label": "Titel",              "required": True,  "placeholder": "Name des Handbuchs"},
-            {"key": "author",       "label": "Autor(en)",          "required": False, "placeholder": "Nachname, Vorname (optional)"},
-            {"key": "organization", "label": "Organisation",       "required": False, "placeholder": "Hersteller / Verlag"},
-            {"key": "date",         "label": "Jahr",               "required": False, "placeholder": "JJJJ", "type": "year"},
-            {"key": "edition",      "label": "Version / Auflage",  "required": False, "placeholder": "z.B. 2.1"},
-            {"key": "location",     "label": "Ort",                "required": False, "placeholder": "Stadt"},
-            {"key": "url",          "label": "URL",                "required": False, "placeholder": "https://..."},
-            {"key": "note",         "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
-        ]
-    },
-    "standard": {
-        "label": "Norm / Standard",
-        "icon": "bi-patch-check",
-        "fields": [
-            {"key": "title",        "label": "Bezeichnung / Titel","required": True,  "placeholder": "z.B. DIN EN ISO 9001:2015"},
-            {"key": "number",       "label": "Norm-Nummer",        "required": True,  "placeholder": "z.B. DIN EN ISO 9001"},
-            {"key": "organization", "label": "Normungsgremium",    "required": True,  "placeholder": "z.B. DIN, ISO, IEEE"},
-            {"key": "date",         "label": "Jahr",               "required": True,  "placeholder": "JJJJ", "type": "year"},
-            {"key": "type",         "label": "Typ",                "required": False, "placeholder": "z.B. Norm, Richtlinie"},
-            {"key": "location",     "label": "Erscheinungsort",    "required": False, "placeholder": "z.B. Berlin"},
-            {"key": "url",          "label": "URL",                "required": False, "placeholder": "https://..."},
-            {"key": "note",         "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
-        ]
-    },
-    "patent": {
-        "label": "Patent",
-        "icon": "bi-lightbulb",
-        "fields": [
-            {"key": "author",    "label": "Erfinder",           "required": True,  "placeholder": "Nachname, Vorname"},
-            {"key": "title",     "label": "Titel der Erfindung","required": True,  "placeholder": "Patentbezeichnung"},
-            {"key": "number",    "label": "Patentnummer",       "required": True,  "placeholder": "z.B. EP1234567"},
-            {"key": "date",      "label": "Anmeldedatum",       "required": True,  "placeholder": "JJJJ-MM-TT", "type": "date"},
-            {"key": "location",  "label": "Land",               "required": False, "placeholder": "z.B. Deutschland"},
-            {"key": "holder",    "label": "Patentinhaber",      "required": False, "placeholder": "Firma / Person"},
-            {"key": "url",       "label": "URL",                "required": False, "placeholder": "https://..."},
-            {"key": "note",      "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
-        ]
-    },
-    "dataset": {
-        "label": "Datensatz / Datenbank",
-        "icon": "bi-database",
-        "fields": [
-            {"key": "author",      "label": "Autor(en) / Ersteller","required": True,  "placeholder": "Nachname, Vorname"},
-            {"key": "title",       "label": "Titel des Datensatzes","required": True,  "placeholder": "Datensatzbezeichnung"},
-            {"key": "date",        "label": "Erscheinungsjahr",     "required": True,  "placeholder": "JJJJ", "type": "year"},
-            {"key": "institution", "label": "Herausgebende Stelle", "required": False, "placeholder": "Organisation / Institut"},
-            {"key": "url",         "label": "URL / DOI-Link",       "required": False, "placeholder": "https://..."},
-            {"key": "doi",         "label": "DOI",                  "required": False, "placeholder": "10.xxxx/xxxxx"},
-            {"key": "version",     "label": "Version",              "required": False, "placeholder": "z.B. 1.2"},
-            {"key": "note",        "label": "Anmerkung",            "required": False, "placeholder": "Zusätzliche Hinweise"},
-        ]
-    },
-    "software": {
-        "label": "Software / Programm",
-        "icon": "bi-code-square",
-        "fields": [
-            {"key": "author",       "label": "Entwickler / Autor",  "required": True,  "placeholder": "Nachname, Vorname oder Org."},
-            {"key": "title",        "label": "Programmname",        "required": True,  "placeholder": "Name der Software"},
-            {"key": "date",         "label": "Jahr",                "required": True,  "placeholder": "JJJJ", "type": "year"},
-            {"key": "version",      "label": "Version",             "required": False, "placeholder": "z.B. 3.4.1"},
-            {"key": "organization", "label": "Unternehmen",         "required": False, "placeholder": "Herstellerfirma"},
-            {"key": "url",          "label": "URL",                 "required": False, "placeholder": "https://..."},
-            {"key": "howpublished", "label": "Vertrieb",            "required": False, "placeholder": "z.B. Open Source, Commercial"},
-            {"key": "note",         "label": "Anmerkung",           "required": False, "placeholder": "Lizenz etc."},
-        ]
-    },
-    "misc": {
-        "label": "Sonstiges",
-        "icon": "bi-three-dots",
-        "fields": [
-            {"key": "author",       "label": "Autor(en)",          "required": False, "placeholder": "Nachname, Vorname"},
-            {"key": "title",        "label": "Titel",              "required": True,  "placeholder": "Bezeichnung"},
-            {"key": "date",         "label": "Jahr",               "required": False, "placeholder": "JJJJ", "type": "year"},
-            {"key": "howpublished", "label": "Veröffentlichungsart","required": False, "placeholder": "z.B. Broschüre, Poster"},
-            {"key": "organization", "label": "Organisation",       "required": False, "placeholder": "Name der Organisation"},
-            {"key": "url",          "label": "URL",                "required": False, "placeholder": "https://..."},
-            {"key": "note",         "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
-        ]
-    },
-    "unpublished": {
-        "label": "Unveröffentlichtes Werk",
-        "icon": "bi-file-lock",
-        "fields": [
-            {"key": "author",  "label": "Autor(en)",   "required": True,  "placeholder": "Nachname, Vorname"},
-            {"key": "title",   "label": "Titel",       "required": True,  "placeholder": "Titel des Werks"},
-            {"key": "note",    "label": "Anmerkung",   "required": True,  "placeholder": "Pflichtfeld: Erläuterung (z.B. eingereicht bei ...)"},
-            {"key": "date",    "label": "Jahr",        "required": False, "placeholder": "JJJJ", "type": "year"},
-            {"key": "url",     "label": "URL",         "required": False, "placeholder": "https://..."},
-        ]
-    },
-    "booklet": {
-        "label": "Broschüre / Flugblatt",
-        "icon": "bi-newspaper",
-        "fields": [
-            {"key": "title",        "label": "Titel",              "required": True,  "placeholder": "Titel der Broschüre"},
-            {"key": "author",       "label": "Autor(en)",          "required": False, "placeholder": "Nachname, Vorname"},
-            {"key": "howpublished", "label": "Veröffentlichungsart","required": False, "placeholder": "z.B. Flugblatt, Broschüre"},
-            {"key": "date",         "label": "Jahr",               "required": False, "placeholder": "JJJJ", "type": "year"},
-            {"key": "organization", "label": "Herausgeber",        "required": False, "placeholder": "Organisation"},
-            {"key": "location",     "label": "Ort",                "required": False, "placeholder": "Stadt"},
-            {"key": "note",         "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
-        ]
-    },
-    "periodical": {
-        "label": "Periodikum / Zeitschrift (gesamte Ausgabe)",
-        "icon": "bi-calendar3",
-        "fields": [
-            {"key": "title",   "label": "Titel der Zeitschrift", "required": True,  "placeholder": "Zeitschriftenname"},
-            {"key": "editor",  "label": "Herausgeber",           "required": False, "placeholder": "Nachname, Vorname"},
-            {"key": "date",    "label": "Jahr",                  "required": True,  "placeholder": "JJJJ", "type": "year"},
-            {"key": "volume",  "label": "Jahrgang",              "required": False, "placeholder": "z.B. 12"},
-            {"key": "number",  "label": "Ausgabe",               "required": False, "placeholder": "z.B. 4"},
-            {"key": "issn",    "label": "ISSN",                  "required": False, "placeholder": "XXXX-XXXX"},
-            {"key": "note",    "label": "Anmerkung",             "required": False, "placeholder": "Zusätzliche Hinweise"},
-        ]
-    },
-}
-
-# ---------------------------------------------------------------------------
-# Einstellungsverwaltung
-# ---------------------------------------------------------------------------
-class SettingsManager:
-    def __init__(self):
-        self._data = dict(DEFAULT_SETTINGS)
-        self._load()
-
-    def _load(self):
-        if SETTINGS_FILE.exists():
-            try:
-                with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
-                    stored = json.load(f)
-                # Deep merge: top level only für einfache Werte, sections ersetzen
-                for k, v in stored.items():
-                    self._data[k] = v
-                # Fehlende Keys aus Defaults nachfüllen
-                for k, v in DEFAULT_SETTINGS.items():
-                    if k not in self._data:
-                        self._data[k] = v
-            except Exception:
-                pass
+# HTTP-Caching (ETag / 304) & Kompression
+# ---------------------------------------------------------------------------
+# JSON-Antworten ab dieser Größe (Bytes) werden gzip-komprimiert
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+# Die komprimierte Variante bekommt einen eigenen (starken) ETag
+GZIP_ETAG_SUFFIX = "-gz"
 
-    def save(self):
-        with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
-            json.dump(self._data, f, ensure_ascii=False, indent=2)
+# Kennung des Server-Prozesses: Zähler beginnen nach einem Neustart wieder bei 0
+_BOOT_ID = format(time.time_ns(), "x")
 
-    def get(self, key, default=None):
-        return self._data.get(key, default)
 
-    def set(self, key, value):
-        self._data[key] = value
-        self.save()
+def make_etag(*parts) -> str:
+    """Starker ETag aus Versionszählern und weiteren Bestandteilen (z.B. Query-Parametern)."""
+    raw = "\0".join(str(p) for p in (_BOOT_ID,) + parts)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:24]
 
-    def all(self):
-        return dict(self._data)
 
-    def update(self, data: dict):
-        self._data.update(data)
-        self.save()
+def _query_signature() -> str:
+    """Query-Parameter in fester Reihenfolge (Teil des ETags)."""
+    return "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
 
 
-settings = SettingsManager()
+def conditional_json(etag: str, build):
+    """
+    Antwortet mit 304, wenn der Client die Version etag bereits hat (If-None-Match).
+    Sonst wird build() aufgerufen und das Ergebnis als JSON mit ETag geliefert;
+    der Browser muss vor jeder Verwendung nachfragen (no-cache).
+    """
+    inm = request.if_none_match
+    for candidate in (etag, etag + GZIP_ETAG_SUFFIX):
+        if inm.contains(candidate):
+            resp = make_response("", 304)
+            resp.set_etag(candidate)
+            break
+    else:
+        resp = make_response(jsonify(build()))
+        resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.vary.add("Accept-Encoding")
+    return resp
 
 
-# ---------------------------------------------------------------------------
-# Hilfsfunktionen
-# ---------------------------------------------------------------------------
-def normalize_string(text: str) -> str:
-    """Normalisiert Text für Dateinamen & Zitierschlüssel."""
-    text = text.replace("ä", "ae").replace("ö", "oe").replace("ü", "ue") \
-               .replace("Ä", "Ae").replace("Ö", "Oe").replace("Ü", "Ue").replace("ß", "ss")
-    nfkd = unicodedata.normalize("NFD", text)
-    return "".join(c for c in nfkd if not unicodedata.combining(c))
+@app.after_request
+def compress_response(resp):
+    """Komprimiert große JSON-Antworten, wenn der Client gzip akzeptiert."""
+    if (resp.status_code != 200 or resp.mimetype != "application/json"
+            or resp.direct_passthrough or resp.is_streamed
+            or "Content-Encoding" in resp.headers):
+        return resp
+    resp.vary.add("Accept-Encoding")
+    if not request.accept_encodings["gzip"]:
+        return resp
+    data = resp.get_data()
+    if len(data) < GZIP_MIN_SIZE:
+        return resp
+    resp.set_data(gzip.compress(data, GZIP_LEVEL, mtime=0))
+    resp.headers["Content-Encoding"] = "gzip"
+    etag, weak = resp.get_etag()
+    if etag and not weak:
+        resp.set_etag(etag + GZIP_ETAG_SUFFIX)
+    return resp
 
 
-def generate_cite_key(title: str, author: str = "", year: str = "") -> str:
-    """Erzeugt einen BibTeX-Zitierschlüssel."""
-    if not title and not author:
-        return "quelle_" + datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+# ---------------------------------------------------------------------------
+# Metriken & Profiling
+# ---------------------------------------------------------------------------
+# Zielverzeichnis der cProfile-Dateien langsamer Anfragen (--profile-slow)
+PROFILE_DIR = CACHE_DIR / "profiles"
 
-    base = normalize_string(title or author)
-    key = re.sub(r"[^a-zA-Z0-9_]", "", base.replace(" ", "_"))
-    key = re.sub(r"_+", "_", key).strip("_").lower()
+metrics = Metrics()
+settings.on_save = functools.partial(metrics.inc, "lqm_settings_writes_total",
+                                     help_text="Schreibzugriffe auf die Einstellungsdatei.")
+app.wsgi_app = InstrumentedApp(app.wsgi_app, metrics)
 
-    if year:
-        yr = re.sub(r"[^0-9]", "", year)[:4]
-        if yr:
-            key = f"{key}_{yr}"
 
-    return key[:60] if len(key) > 60 else key
+@app.before_request
+def remember_route():
+    """Route (nicht die konkrete URL) als Label für die Metriken."""
+    request.environ[ROUTE_KEY] = request.url_rule.rule if request.url_rule is not None else None
 
 
-def generate_filename(cite_key: str) -> str:
-    """Erzeugt einen sauberen Dateinamen aus dem Zitierschlüssel."""
-    return re.sub(r"[^a-zA-Z0-9_\-]", "", cite_key) + ".bib"
+def enable_profiling(threshold_ms: float, directory=PROFILE_DIR):
+    """Speichert für Anfragen über threshold_ms ein cProfile-Profil in directory."""
+    app.wsgi_app.profiler = SlowRequestProfiler(directory, threshold_ms)
 
 
-def generate_bibtex(entry_type: str, fields: dict, cite_key: str) -> str:
-    """Baut den vollständigen BibTeX-Eintrag als String zusammen."""
-    lines = [f"@{entry_type}{{{cite_key},"]
-    for k, v in fields.items():
-        v = v.strip()
-        if v:
-            escaped = v.replace("{", "\\{").replace("}", "\\}")
-            lines.append(f"  {k:<14} = {{{escaped}}},")
-    lines.append("}")
-    return "\n".join(lines)
+@app.route("/api/metrics", methods=["GET"])
+def api_metrics():
+    """Latenzen, Bytes, geöffnete Dateien u.a. je Route im Prometheus-Textformat."""
+    resp = Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
 
 
 # ---------------------------------------------------------------------------
@@ -463,13 +158,13 @@ def generate_bibtex(entry_type: str, fields: dict, cite_key: str) -> str:
 @app.route("/")
 def index():
     resp = make_response(render_template("index.html"))
-    resp.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
-    resp.headers["Pragma"] = "no-cache"
-    return resp
+    # Immer nachfragen, aber unveränderte Seite nicht erneut senden
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.add_etag()
+    return resp.make_conditional(request)
 
 
-@app.route("/api/entry-types")
-def get_entry_types():
+def _entry_types_json() -> dict:
     result = {}
     for key, val in ENTRY_TYPES.items():
         result[key] = {
@@ -477,19 +172,42 @@ def get_entry_types():
             "icon": val["icon"],
             "fields": val["fields"],
         }
-    return jsonify(result)
+    return result
+
+
+# Die Eintragstypen ändern sich zur Laufzeit nicht
+_ENTRY_TYPES_ETAG = make_etag("entry-types")
+
+
+@app.route("/api/entry-types")
+def get_entry_types():
+    return conditional_json(_ENTRY_TYPES_ETAG, _entry_types_json)
 
 
 @app.route("/api/settings", methods=["GET"])
 def get_settings():
-    return jsonify(settings.all())
+    return conditional_json(make_etag("settings", settings.version, settings.project_name()), settings.all)
+
+
+def _watched_paths() -> tuple:
+    """Pfade, die der Watcher überwacht (immer die des aktiven Projekts)."""
+    with project_scope(""):
+        return settings.get("target_directory"), settings.get("latex_main_path")
 
 
 @app.route("/api/settings", methods=["POST"])
 def update_settings():
     data = request.get_json(force=True)
+    watched = _watched_paths()
+    aggregate_mode = settings.get("aggregate_sections", False)
     settings.update(data)
-    return jsonify({"ok": True, "settings": settings.all()})
+    # Überwachung auf neue Pfade umstellen
+    if _watcher is not None and watched != _watched_paths():
+        start_watcher()
+    result = {"ok": True, "settings": settings.all()}
+    if aggregate_mode != settings.get("aggregate_sections", False):
+        result["aggregates"] = switch_aggregate_mode(settings.get("aggregate_sections", False))
+    return jsonify(result)
 
 
 @app.route("/api/cite-key", methods=["POST"])
@@ -500,7 +218,30 @@ def api_cite_key():
         body.get("author", ""),
         body.get("date", ""),
     )
-    return jsonify({"cite_key": key, "filename": generate_filename(key)})
+    # Vorhandene Schlüssel bekommen ein Suffix (_a, _b, …)
+    unique = free_cite_key(key)
+    return jsonify({"cite_key": unique, "filename": generate_filename(unique), "collision": unique != key})
+
+
+@app.route("/api/cite-key/complete", methods=["GET"])
+def api_cite_key_complete():
+    """
+    Vorhandene Zitierschlüssel mit dem Präfix prefix (für Vorschläge beim Tippen),
+    dazu ob prefix selbst vergeben ist und der nächste freie Schlüssel.
+    """
+    prefix = request.args.get("prefix", "").strip()
+    try:
+        limit = max(int(request.args.get("limit") or 20), 0)
+    except ValueError:
+        return jsonify({"ok": False, "error": "Ungültiger limit-Parameter."}), 400
+    registry = get_key_registry()
+    if registry is None or not prefix:
+        return jsonify({"keys": [], "taken": False, "available": prefix})
+    return jsonify({
+        "keys":      registry.complete(prefix, limit),
+        "taken":     prefix in registry,
+        "available": free_cite_key(prefix),
+    })
 
 
 @app.route("/api/preview", methods=["POST"])
@@ -510,24 +251,20 @@ def api_preview():
     fields = body.get("fields", {})
     cite_key = body.get("cite_key", "")
     if not cite_key:
-        cite_key = generate_cite_key(
+        cite_key = free_cite_key(generate_cite_key(
             fields.get("title", ""),
             fields.get("author", ""),
             fields.get("date", ""),
-        )
+        ))
     bibtex = generate_bibtex(entry_type, fields, cite_key)
     return jsonify({"bibtex": bibtex, "cite_key": cite_key})
 
 
-@app.route("/api/save", methods=["POST"])
-def api_save():
-    """Speichert die BibTeX-Datei und aktualisiert optional die LaTeX-Hauptdatei."""
-    body = request.get_json(force=True)
-    entry_type = body.get("entry_type", "misc")
+def entry_names(body: dict) -> tuple:
+    """Zitierschlüssel und Dateiname eines Eintrags (ggf. automatisch erzeugt)."""
     fields = body.get("fields", {})
     cite_key = body.get("cite_key", "")
     filename = body.get("filename", "")
-    section_id = body.get("section_id", "")
 
     if not cite_key:
         cite_key = generate_cite_key(
@@ -539,35 +276,77 @@ def api_save():
         filename = generate_filename(cite_key)
     if not filename.endswith(".bib"):
         filename += ".bib"
+    return cite_key, filename
 
-    target_dir = pathlib.Path(settings.get("target_directory", ""))
-    if not target_dir or not str(target_dir).strip():
-        return jsonify({"ok": False, "error": "Kein Zielverzeichnis konfiguriert. Bitte in den Einstellungen festlegen."}), 400
+
+# Schlüsselwahl und Schreiben neuer Dateien dürfen sich nicht überschneiden
+_save_lock = threading.Lock()
+
+
+def write_bib_entry(body: dict, target_dir: pathlib.Path) -> dict:
+    """
+    Schreibt eine .bib-Datei aus den Formulardaten (entry_type, fields,
+    cite_key, filename, section_id). Die LaTeX-Hauptdatei bleibt unverändert.
+    Vergebene Schlüssel und vorhandene Dateien erhalten ein Suffix (_a, _b, …),
+    es wird nie eine vorhandene Datei überschrieben.
+    Gibt cite_key, filename, filepath und den geschriebenen Inhalt zurück.
+    """
+    entry_type = body.get("entry_type", "misc")
+    fields = body.get("fields", {})
+    section_id = body.get("section_id", "")
+    requested_key, filename = entry_names(body)
+    auto_filename = filename == generate_filename(requested_key)
 
     target_dir.mkdir(parents=True, exist_ok=True)
-    filepath = target_dir / filename
 
-    # BibTeX-Inhalt erzeugen
-    bibtex = generate_bibtex(entry_type, fields, cite_key)
+    def file_taken(name: str) -> bool:
+        return (target_dir / name).exists()
+
+    with _save_lock:
+        cite_key = requested_key
+        registry = get_key_registry()
+        if registry is not None:
+            # Automatischer Dateiname folgt dem Schlüssel und muss ebenfalls frei sein
+            extra = (lambda k: file_taken(generate_filename(k))) if auto_filename else None
+            cite_key = registry.unique(requested_key, extra)
+        if auto_filename:
+            filename = generate_filename(cite_key)
+        elif file_taken(filename):
+            filename = unique_key(filename[:-4], lambda s: file_taken(s + ".bib")) + ".bib"
+        filepath = target_dir / filename
+
+        # BibTeX-Inhalt erzeugen
+        bibtex = generate_bibtex(entry_type, fields, cite_key)
+
+        # Datums- und Abschnittskommentar
+        bibtex = entry_comment(section_id) + bibtex
+
+        # Datei schreiben ("x": niemals eine vorhandene Datei überschreiben)
+        with open(filepath, "x", encoding="utf-8") as f:
+            f.write(bibtex)
+        if registry is not None:
+            registry.set_keys(str(filepath), [cite_key])
 
-    # Datumskommentar
-    add_date = settings.get("add_date_comment", True)
-    if add_date:
-        now_str = datetime.datetime.now().strftime("%d.%m.%Y %H:%M")
-        comment = f"% Hinzugefügt am: {now_str}\n"
+    return {"filepath": filepath, "cite_key": cite_key, "filename": filename, "content": bibtex}
 
-        # Abschnittskommentar
-        if section_id:
-            sections = settings.get("bib_placement_sections", [])
-            sec = next((s for s in sections if s["id"] == section_id), None)
-            if sec:
-                comment += f"% Abschnitt: {sec['label']}\n"
 
-        bibtex = comment + bibtex
+@app.route("/api/save", methods=["POST"])
+def api_save():
+    """Speichert die BibTeX-Datei und aktualisiert optional die LaTeX-Hauptdatei."""
+    body = request.get_json(force=True)
+    section_id = body.get("section_id", "")
+
+    target_dir = pathlib.Path(settings.get("target_directory", ""))
+    if not target_dir or not str(target_dir).strip():
+        return jsonify({"ok": False, "error": "Kein Zielverzeichnis konfiguriert. Bitte in den Einstellungen festlegen."}), 400
 
-    # Datei schreiben
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(bibtex)
+    saved = write_bib_entry(body, target_dir)
+    filepath = saved["filepath"]
+    record_versions(SAVE, [(filepath, filepath.read_bytes())])
+    aggregates = get_aggregates()
+    if aggregates is not None:
+        aggregates.put(filepath.name, saved["content"], section_id)
+    _index_touch(filepath)
 
     # LaTeX-Hauptdatei aktualisieren
     latex_updated = False
@@ -575,20 +354,105 @@ def api_save():
     latex_main = settings.get("latex_main_path", "")
     if latex_main and pathlib.Path(latex_main).exists():
         try:
-            latex_updated, latex_error = update_latex_main(filepath, pathlib.Path(latex_main), section_id)
+            if aggregates is not None:
+                # Eintrag steht in der Sammeldatei; nur diese muss eingebunden sein
+                _added, latex_error = include_aggregates([section_id], pathlib.Path(latex_main))
+                latex_updated = latex_error is None
+            else:
+                latex_updated, latex_error = update_latex_main(filepath, pathlib.Path(latex_main), section_id)
         except Exception as e:
             latex_error = str(e)
 
     return jsonify({
         "ok": True,
         "filepath": str(filepath),
-        "cite_key": cite_key,
-        "filename": filename,
+        "cite_key": saved["cite_key"],
+        "filename": saved["filename"],
         "latex_updated": latex_updated,
         "latex_error": latex_error,
     })
 
 
+@app.route("/api/save-batch", methods=["POST"])
+def api_save_batch():
+    """
+    Speichert viele Einträge auf einmal: {"entries": [...], "section_id": "..."}.
+    Jeder Eintrag hat dasselbe Format wie bei /api/save. Die LaTeX-Hauptdatei
+    wird genau einmal neu geschrieben; das Ergebnis enthält den Status je Eintrag.
+    """
+    body = request.get_json(force=True)
+    entries = body.get("entries")
+    default_section = body.get("section_id", "")
+    if not isinstance(entries, list) or not entries:
+        return jsonify({"ok": False, "error": "Keine Einträge übergeben."}), 400
+
+    target = settings.get("target_directory", "")
+    if not target or not str(target).strip():
+        return jsonify({"ok": False, "error": "Kein Zielverzeichnis konfiguriert. Bitte in den Einstellungen festlegen."}), 400
+    target_dir = pathlib.Path(target)
+
+    results = []
+    written = []                 # [(Ergebnis, Pfad, section_id)]
+    contents = {}                # Pfad -> geschriebener Inhalt
+    for item in entries:
+        if not isinstance(item, dict):
+            results.append({"ok": False, "error": "Ungültiger Eintrag."})
+            continue
+        item = dict(item)
+        item.setdefault("section_id", default_section)
+        try:
+            # Gleiche Schlüssel/Dateinamen im Stapel erhalten wie bei /api/save ein Suffix
+            saved = write_bib_entry(item, target_dir)
+        except Exception as e:
+            results.append({"ok": False, "error": str(e)})
+            continue
+        result = {
+            "ok": True,
+            "filepath": str(saved["filepath"]),
+            "cite_key": saved["cite_key"],
+            "filename": saved["filename"],
+            "latex_updated": False,
+        }
+        results.append(result)
+        written.append((result, saved["filepath"], item["section_id"]))
+        contents[saved["filepath"]] = saved["content"]
+
+    groups = {}
+    for _r, path, section_id in written:
+        groups.setdefault(section_id, []).append(path)
+    record_versions(SAVE, [(path, path.read_bytes()) for _r, path, _s in written])
+    aggregates = get_aggregates()
+    if aggregates is not None:
+        for section_id, paths in groups.items():
+            aggregates.put_many([(p.name, contents[p]) for p in paths], section_id)
+    _index_touch(*(path for _r, path, _s in written))
+
+    # Alle \addbibresource-Zeilen mit einem einzigen Schreibzugriff einfügen
+    latex_error = None
+    latex_main = settings.get("latex_main_path", "")
+    if written and latex_main and pathlib.Path(latex_main).exists():
+        try:
+            if aggregates is not None:
+                _added, latex_error = include_aggregates(groups, pathlib.Path(latex_main))
+                for result, _p, _s in written:
+                    result["latex_updated"] = latex_error is None
+            else:
+                added, latex_error = update_latex_main_groups(groups, pathlib.Path(latex_main))
+                for result, path, _s in written:
+                    result["latex_updated"] = str(path) in added
+        except Exception as e:
+            latex_error = str(e)
+
+    saved_count = sum(1 for r in results if r["ok"])
+    return jsonify({
+        "ok": saved_count > 0,
+        "results": results,
+        "saved": saved_count,
+        "failed": len(results) - saved_count,
+        "latex_error": latex_error,
+    })
+
+
 @app.route("/api/browse-directory", methods=["POST"])
 def api_browse_directory():
     """Öffnet einen Systemdialog zur Verzeichnisauswahl (Windows)."""
@@ -631,9 +495,7 @@ def api_check_latex_sections():
     if not latex_main or not pathlib.Path(latex_main).exists():
         return jsonify({"sections": [], "error": "LaTeX-Datei nicht gefunden"})
     try:
-        with open(latex_main, "r", encoding="utf-8") as f:
-            content = f.read()
-        found = re.findall(r"^(%[^\n]+)", content, re.MULTILINE)
+        found = latex_main_file(latex_main).comment_lines()
         return jsonify({"sections": found[:30]})
     except Exception as e:
         return jsonify({"sections": [], "error": str(e)})
@@ -642,22 +504,22 @@ def api_check_latex_sections():
 @app.route("/api/history", methods=["GET"])
 def api_history():
     """Gibt eine Liste aller .bib-Dateien im Zielverzeichnis zurück."""
-    target_dir = pathlib.Path(settings.get("target_directory", ""))
-    if not target_dir or not target_dir.exists():
+    index = get_library_index(refresh=True)
+    if index is None:
         return jsonify({"files": []})
-    files = []
-    for f in sorted(target_dir.glob("*.bib"), key=lambda x: x.stat().st_mtime, reverse=True):
-        try:
-            stat = f.stat()
+
+    def build():
+        files = []
+        for rec in index.records()[:50]:
             files.append({
-                "name": f.name,
-                "path": str(f),
-                "modified": datetime.datetime.fromtimestamp(stat.st_mtime).strftime("%d.%m.%Y %H:%M"),
-                "size": stat.st_size,
+                "name": rec.name,
+                "path": rec.path,
+                "modified": format_mtime(rec.mtime),
+                "size": rec.size,
             })
-        except Exception:
-            pass
-    return jsonify({"files": files[:50]})
+        return {"files": files}
+
+    return conditional_json(library_etag(index, "history"), build)
 
 
 @app.route("/api/file-content", methods=["POST"])
@@ -671,75 +533,682 @@ def api_file_content():
         target_dir = pathlib.Path(settings.get("target_directory", ""))
         if target_dir and target_dir.exists():
             p.relative_to(target_dir)
-        with open(p, "r", encoding="utf-8") as f:
-            content = f.read()
+        index = get_library_index()
+        if index is not None:
+            content = index.read_content(p)
+        else:
+            with open(p, "r", encoding="utf-8") as f:
+                content = f.read()
         return jsonify({"content": content})
     except Exception as e:
         return jsonify({"content": "", "error": str(e)})
 
 
 # ---------------------------------------------------------------------------
-# BibTeX-Parser (für Bibliotheks-Ansicht)
+# Bibliotheks-Index
 # ---------------------------------------------------------------------------
-def parse_bib_entry(content: str) -> dict:
-    """Parsed den ersten @type{key,...} Block aus einem BibTeX-String."""
-    entry = {"type": "", "key": "", "title": "", "author": "", "year": "",
-             "publisher": "", "isbn": "", "url": "", "doi": "", "journal": "", "fields": {}}
-    m = re.search(r"@(\w+)\s*\{([^,]+),", content)
-    if m:
-        entry["type"] = m.group(1).lower()
-        entry["key"]  = m.group(2).strip()
+# Geschätzter Speicher je Eintrag für Index, Suchindex und Schlüsselverzeichnis
+# (Bytes, gemessen mit tracemalloc an der synthetischen 10k-Bibliothek)
+LIBRARY_BYTES_PER_ENTRY = 9 * 1024
+# Prüfschema der Bibliotheken (aus den Eintragstypen, für alle gleich)
+LINT_SCHEMA = build_schema(ENTRY_TYPES)
+
+
+class Library:
+    """
+    Index eines Zielverzeichnisses samt Suchindex, Schlüsselverzeichnis,
+    Sammeldateien, Versionsspeicher und den Caches von Prüfung, Dubletten-
+    und Zitationsanalyse (je Bibliothek, damit ein Projektwechsel sie nicht
+    verwirft).
+    """
+
+    def __init__(self, target_dir: pathlib.Path, epoch: int):
+        self.epoch = epoch
+        self.index = LibraryIndex(target_dir, index_file_for(target_dir), parse_bib_entry)
+        self.index.load()
+        self.search = SearchIndex(normalize_string)
+        self.search.rebuild(self.index.records())
+        self.registry = KeyRegistry()
+        self.registry.rebuild(self.index.records())
+        self.aggregates = AggregateStore(target_dir / AGGREGATE_DIR, section_labels,
+                                         lambda: settings.get("aggregate_sections", False))
+        self.history = HistoryStore(target_dir / HISTORY_DIR)
+        self.lint = LintEngine(LINT_SCHEMA, lint_cache_file_for(target_dir))
+        self.duplicates = DuplicateDetector(normalize_string)
+        self.duplicates_lock = threading.Lock()
+        self.duplicates_cache = (None, [])    # (ETag des Index-Stands, Cluster)
+        self.citations = CitationScanner()
+        self.index.add_listener(self.search.on_change)
+        self.index.add_listener(self.registry.on_change)
+        self.index.add_listener(self.aggregates.on_change)
+        self.index.add_listener(functools.partial(_publish_library_change, self.index))
+        self.index.refresh()
+
+    def memory_estimate(self) -> int:
+        return len(self.index) * LIBRARY_BYTES_PER_ENTRY
+
+
+_libraries = OrderedDict()            # Zielverzeichnis -> Library (zuletzt genutzte am Ende)
+_library_index_lock = threading.Lock()
+_library_epoch = 0                    # zählt neu geladene Indizes (ETag-Bestandteil)
+
+
+def _evict_libraries(keep: str):
+    """Entlädt die am längsten nicht genutzten Bibliotheken, bis das Speicherbudget passt."""
+    budget = settings.get("project_memory_budget_mb", 256) * 1024 * 1024
+    total = sum(lib.memory_estimate() for lib in _libraries.values())
+    for key in list(_libraries):
+        if total <= budget:
+            break
+        if key == keep:
+            continue
+        lib = _libraries.pop(key)
+        lib.index.save()
+        total -= lib.memory_estimate()
+        metrics.inc("lqm_library_evictions_total", help_text="Wegen des Speicherbudgets entladene Projekt-Indizes.")
+
+
+def get_library(refresh: bool = False):
+    """
+    Liefert die Bibliothek des aktuellen Projekts (oder None). Bereits
+    geladene Bibliotheken anderer Projekte bleiben im Speicher, solange
+    das Speicherbudget reicht.
+    """
+    global _library_epoch
+    target = settings.get("target_directory", "")
+    if not target or not str(target).strip():
+        return None
+    target_dir = pathlib.Path(target)
+    if not target_dir.exists():
+        return None
+
+    key = str(target_dir)
+    with _library_index_lock:
+        lib = _libraries.get(key)
+        if lib is None:
+            _library_epoch += 1
+            lib = _libraries[key] = Library(target_dir, _library_epoch)
+            _evict_libraries(keep=key)
+            return lib
+        _libraries.move_to_end(key)
+    if refresh:
+        lib.index.refresh()
+    return lib
+
+
+def get_library_index(refresh: bool = False):
+    """Liefert den Index für das Zielverzeichnis des aktuellen Projekts (oder None)."""
+    lib = get_library(refresh)
+    return lib.index if lib is not None else None
+
+
+def get_search_index(refresh: bool = False):
+    """Volltext-Index zum aktuellen Bibliotheks-Index (oder None)."""
+    lib = get_library(refresh)
+    return lib.search if lib is not None else None
 
-    for field_m in re.finditer(r"^\s*(\w+)\s*=\s*\{([^}]*)\}", content, re.MULTILINE):
-        k = field_m.group(1).lower()
-        v = field_m.group(2).strip()
-        entry["fields"][k] = v
-        if k in ("title", "author", "date", "year", "publisher", "isbn", "url", "doi", "journal"):
-            entry[k] = v
 
-    # Jahr aus date extrahieren wenn nötig
-    if not entry["year"] and entry.get("date"):
-        yr = re.match(r"(\d{4})", entry["date"])
-        if yr:
-            entry["year"] = yr.group(1)
+def get_key_registry():
+    """Verzeichnis aller Zitierschlüssel der aktuellen Bibliothek (oder None)."""
+    lib = get_library()
+    return lib.registry if lib is not None else None
 
-    return entry
+
+def get_history():
+    """Versionsspeicher der aktuellen Bibliothek (oder None)."""
+    lib = get_library()
+    return lib.history if lib is not None else None
+
+
+def record_versions(op: str, changes, previous=None):
+    """
+    Hält [(Pfad, Inhalt | None)] im Versionsspeicher fest (siehe
+    HistoryStore.record). Fehler dort lassen die eigentliche Operation
+    gelingen und werden nur gezählt.
+    """
+    history = get_history()
+    if history is None:
+        return
+    # Generator: große Änderungen (Import) werden Datei für Datei übernommen
+    named = ((pathlib.Path(path).name, data, *(pathlib.Path(o).name for o in old))
+             for path, data, *old in changes)
+    previous = {pathlib.Path(k).name: v for k, v in (previous or {}).items()}
+    try:
+        history.record(op, named, previous)
+    except OSError:
+        metrics.inc("lqm_history_errors_total", help_text="Nicht gespeicherte Versionen (Schreibfehler).")
+
+
+def free_cite_key(key: str) -> str:
+    """key oder der erste freie Schlüssel key_a, key_b, … (Schlüssel und Dateiname frei)."""
+    index = get_library_index()
+    if index is None:
+        return key
+    return get_key_registry().unique(key, lambda k: (index.target_dir / generate_filename(k)).exists())
+
+
+def library_etag(index, *parts) -> str:
+    """ETag für Antworten, die nur vom Inhalt des Bibliotheks-Index abhängen."""
+    lib = _libraries.get(str(index.target_dir))
+    epoch = lib.epoch if lib is not None else 0
+    return make_etag("library", epoch, index.target_dir, index.generation, *parts)
+
+
+def _index_touch(*paths):
+    """Hält den Index nach Schreibzugriffen der API aktuell."""
+    index = get_library_index()
+    if index is None:
+        return
+    for p in paths:
+        index.update_path(p)
+    index.save()
+
+
+def query_library(index, args, offset: int = 0, limit: int = 0) -> tuple:
+    """Filter der Bibliotheks-Ansicht (type, year, q, sort) auf den Index anwenden."""
+    # Textsuche über den Volltext-Index (Tokens und Präfixe, nach Relevanz)
+    query = args.get("q", "").strip()
+    paths = None
+    if query:
+        paths = [p for p, _score in get_search_index().search(query)]
+        # Dazu wie bisher Teilwörter in Titel, Autor, Schlüssel, Verlag und
+        # Dateiname ("buch" findet "Lehrbuch"), hinter den Volltexttreffern
+        found = set(paths)
+        substring, _total = index.query(text=query)
+        paths.extend(r.path for r in substring if r.path not in found)
+
+    return index.query(
+        entry_type=args.get("type", ""),
+        year=args.get("year", ""),
+        sort=args.get("sort", "modified"),
+        offset=offset,
+        limit=limit,
+        paths=paths,
+    )
 
 
 @app.route("/api/library", methods=["GET"])
 def api_library():
-    """Gibt alle .bib-Dateien mit geparsten Metadaten zurück."""
-    target_dir = pathlib.Path(settings.get("target_directory", ""))
-    if not target_dir or not target_dir.exists():
-        return jsonify({"files": []})
+    """
+    Gibt die .bib-Dateien mit geparsten Metadaten zurück.
+    Query-Parameter: type, year, q (Textsuche), sort, cursor, limit.
+    Ohne limit wird die komplette (gefilterte) Liste geliefert.
+    """
+    index = get_library_index(refresh=True)
+    if index is None:
+        return jsonify({"files": [], "total": 0, "library_size": 0,
+                        "facets": {"types": {}, "years": {}}, "next_cursor": None})
+
+    args = request.args
+    try:
+        offset = max(int(args.get("cursor") or 0), 0)
+        limit  = max(int(args.get("limit") or 0), 0)
+    except ValueError:
+        return jsonify({"ok": False, "error": "Ungültiger cursor/limit-Parameter."}), 400
+
+    def build():
+        page, total = query_library(index, args, offset, limit)
+        next_offset = offset + len(page)
+        return {
+            "files":        [record_to_json(r) for r in page],
+            "total":        total,
+            "library_size": len(index),
+            "facets":       index.facets(),
+            "next_cursor":  str(next_offset) if limit and next_offset < total else None,
+        }
+
+    return conditional_json(library_etag(index, _query_signature()), build)
+
+
+@app.route("/api/search", methods=["GET"])
+def api_search():
+    """
+    Volltextsuche über alle Felder der Bibliothek.
+    Query-Parameter: q (z.B. "author:müller netz"), limit (Standard 20).
+    """
+    query = request.args.get("q", "").strip()
+    try:
+        limit = max(int(request.args.get("limit") or 20), 0)
+    except ValueError:
+        return jsonify({"ok": False, "error": "Ungültiger limit-Parameter."}), 400
+
+    index = get_library_index()
+    if index is None or not query:
+        return jsonify({"results": [], "total": 0, "took_ms": 0.0})
+
+    started = time.perf_counter()
+    hits = get_search_index().search(query)
+    results = []
+    for path, score in hits[:limit] if limit else hits:
+        rec = index.get(path)
+        if rec:
+            item = record_to_json(rec)
+            item["score"] = score
+            results.append(item)
+    took_ms = (time.perf_counter() - started) * 1000
+    return jsonify({"results": results, "total": len(hits), "took_ms": round(took_ms, 2)})
+
+
+# ---------------------------------------------------------------------------
+# Dublettenerkennung
+# ---------------------------------------------------------------------------
+def duplicate_clusters(lib) -> list:
+    """Dubletten-Cluster des aktuellen Index-Stands einer Bibliothek (gecacht)."""
+    etag = library_etag(lib.index, "duplicates")
+    with lib.duplicates_lock:
+        if lib.duplicates_cache[0] != etag:
+            lib.duplicates_cache = (etag, lib.duplicates.find(lib.index.records()))
+        return lib.duplicates_cache[1]
+
+
+@app.route("/api/duplicates", methods=["GET"])
+def api_duplicates():
+    """
+    Gruppen mehrfach erfasster Quellen (gleiche DOI/ISBN oder sehr ähnlicher
+    Titel bei gleichem Erstautor und Jahr). Das Ergebnis wird je Index-Stand
+    nur einmal berechnet.
+    """
+    lib = get_library(refresh=True)
+    if lib is None:
+        return jsonify({"clusters": [], "total": 0, "entries": 0, "took_ms": 0.0})
+    index = lib.index
+    etag = library_etag(index, "duplicates")
+
+    def build():
+        started = time.perf_counter()
+        out = []
+        for cluster in duplicate_clusters(lib):
+            files = [record_to_json(rec) for rec in map(index.get, cluster["paths"]) if rec]
+            if len(files) > 1:
+                out.append({"reasons": cluster["reasons"], "files": files})
+        took_ms = (time.perf_counter() - started) * 1000
+        return {
+            "clusters": out,
+            "total":    len(out),
+            "entries":  sum(len(c["files"]) for c in out),
+            "took_ms":  round(took_ms, 2),
+        }
+
+    return conditional_json(etag, build)
+
+
+# ---------------------------------------------------------------------------
+# Export als eine .bib-Datei
+# ---------------------------------------------------------------------------
+@app.route("/api/export", methods=["GET"])
+def api_export():
+    """
+    Exportiert die (gefilterte) Bibliothek als eine .bib-Datei, gestreamt.
+    Filter wie /api/library (type, year, q, sort; zusätzlich sort=key),
+    dedup: "keys" (doppelte Zitierschlüssel weglassen) oder "sources"
+    (zusätzlich von jeder Dublettengruppe nur die erste Datei).
+    """
+    lib = get_library(refresh=True)
+    if lib is None:
+        return jsonify({"ok": False, "error": "Kein Zielverzeichnis konfiguriert."}), 400
+    index = lib.index
+    dedup = request.args.get("dedup", "")
+    if dedup not in EXPORT_DEDUP:
+        return jsonify({"ok": False, "error": f"Unbekannter dedup-Wert: {dedup}"}), 400
+
+    records, total = query_library(index, request.args)
+    skip = set()
+    if dedup == "sources":
+        wanted = {rec.path: n for n, rec in enumerate(records)}
+        for cluster in duplicate_clusters(lib):
+            # Die erste Datei der Gruppe in Exportreihenfolge bleibt erhalten
+            members = sorted((p for p in cluster["paths"] if p in wanted), key=wanted.get)
+            skip.update(members[1:])
+
+    def stream():
+        stamp = datetime.datetime.now().strftime("%d.%m.%Y %H:%M")
+        yield f"% Exportiert am {stamp} aus {index.target_dir} ({total - len(skip)} Dateien)\n\n"
+        yield from iter_export(records, "keys" if dedup else "", skip)
+
+    resp = Response(stream(), mimetype="text/x-bibtex")
+    resp.headers["Content-Disposition"] = 'attachment; filename="export.bib"'
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+
+# ---------------------------------------------------------------------------
+# Zitationsanalyse
+# ---------------------------------------------------------------------------
+@app.route("/api/citations", methods=["GET"])
+def api_citations():
+    """
+    Gleicht die Zitate des LaTeX-Projekts (Hauptdatei samt \\input/\\include)
+    mit der Bibliothek ab: used (zitierte Schlüssel der Bibliothek mit Anzahl),
+    unused (nie zitiert) und unresolved (zitiert, aber nicht in der Bibliothek,
+    mit Fundstellen).
+    """
+    latex_main = settings.get("latex_main_path", "")
+    if not latex_main or not pathlib.Path(latex_main).is_file():
+        return jsonify({"ok": False, "error": "Keine LaTeX-Hauptdatei konfiguriert."}), 400
+    lib = get_library(refresh=True)
+    if lib is None:
+        return jsonify({"ok": False, "error": "Kein Zielverzeichnis konfiguriert."}), 400
+    index = lib.index
+
+    started = time.perf_counter()
+    scan = lib.citations.scan(latex_main)
+    took_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def rel(path: str) -> str:
+        return bib_rel_path(pathlib.Path(path), pathlib.Path(latex_main))
+
+    def build():
+        registry = get_key_registry()
+        used, unresolved = [], []
+        for key, locations in sorted(scan["cites"].items(), key=lambda kv: kv[0].casefold()):
+            if key in registry:
+                used.append({"key": key, "count": len(locations)})
+            else:
+                unresolved.append({"key": key, "locations": [
+                    {"file": rel(path), "line": line} for path, line in locations]})
+        cited = {key.casefold() for key in scan["cites"]}
+        # \nocite{*} bindet die ganze Bibliothek ein
+        unused = [] if scan["nocite_all"] else sorted(
+            (k for k in registry.keys() if k.casefold() not in cited), key=str.casefold)
+        return {
+            "used": used,
+            "unused": unused,
+            "unresolved": unresolved,
+            "nocite_all": scan["nocite_all"],
+            "files": [rel(p) for p in scan["files"]],
+            "missing_files": [rel(p) for p in scan["missing"]],
+            "parsed": scan["parsed"],
+            "took_ms": took_ms,
+        }
+
+    return conditional_json(library_etag(index, "citations", latex_main, scan["signature"]), build)
+
+
+# ---------------------------------------------------------------------------
+# Prüfung der Bibliothek
+# ---------------------------------------------------------------------------
+# Fortschrittsmeldung im Strom alle n Dateien
+LINT_PROGRESS_EVERY = 250
 
-    files = []
-    for f in sorted(target_dir.glob("*.bib"), key=lambda x: x.stat().st_mtime, reverse=True):
+
+def run_lint(lib):
+    """
+    Prüft alle Dateien einer Bibliothek. Liefert Ereignisse für den Strom: file
+    (nur Dateien mit Befunden), progress und zum Schluss done mit der Zusammenfassung.
+    """
+    files = [(r.path, r.hash) for r in lib.index.records("key")]
+    started = time.perf_counter()
+    counts = {ERROR: 0, WARNING: 0}
+    done = cached = 0
+    yield {"type": "start", "total": len(files)}
+    for path, findings, from_cache in lib.lint.run(files):
+        done += 1
+        cached += from_cache
+        if findings:
+            for f in findings:
+                counts[f["severity"]] = counts.get(f["severity"], 0) + 1
+            yield {"type": "file", "path": path, "name": os.path.basename(path), "findings": findings}
+        if done % LINT_PROGRESS_EVERY == 0:
+            yield {"type": "progress", "done": done, "total": len(files)}
+    lib.lint.save()
+    yield {"type": "done", "checked": done, "cached": cached, "errors": counts[ERROR],
+           "warnings": counts[WARNING], "took_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+@app.route("/api/lint", methods=["GET"])
+def api_lint():
+    """
+    Prüfbericht der ganzen Bibliothek: Dateien mit Befunden samt Anzahl der
+    Fehler und Warnungen. ?format=text liefert den Bericht als Klartext.
+    """
+    lib = get_library(refresh=True)
+    if lib is None:
+        return jsonify({"ok": False, "error": "Kein Zielverzeichnis konfiguriert."}), 400
+
+    def build():
+        files, summary = [], {}
+        for event in run_lint(lib):
+            if event["type"] == "file":
+                files.append({k: event[k] for k in ("path", "name", "findings")})
+            elif event["type"] == "done":
+                summary = {k: v for k, v in event.items() if k != "type"}
+        files.sort(key=lambda item: item["name"].casefold())
+        return dict(summary, files=files)
+
+    if request.args.get("format") == "text":
+        resp = Response(format_lint_report(build()["files"]), mimetype="text/plain")
+        resp.headers["Cache-Control"] = "no-store"
+        return resp
+    return conditional_json(library_etag(lib.index, "lint", lib.lint.signature), build)
+
+
+@app.route("/api/lint/stream", methods=["GET"])
+def api_lint_stream():
+    """Wie /api/lint, die Befunde kommen aber als Server-Sent Events, sobald sie vorliegen."""
+    lib = get_library(refresh=True)
+    if lib is None:
+        return jsonify({"ok": False, "error": "Kein Zielverzeichnis konfiguriert."}), 400
+
+    def stream():
+        for event in run_lint(lib):
+            yield format_sse(event)
+
+    resp = Response(stream(), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+
+# ---------------------------------------------------------------------------
+# Metadaten aus DOI/ISBN
+# ---------------------------------------------------------------------------
+RESOLVER_CACHE_DIR = CACHE_DIR / "resolver"
+_resolver = None
+_resolver_config = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver() -> Resolver:
+    """Resolver passend zu den Backend-Einstellungen (bei Änderung neu aufgebaut)."""
+    global _resolver, _resolver_config
+    config = dict(settings.get("resolver_backends") or DEFAULT_SETTINGS["resolver_backends"])
+    with _resolver_lock:
+        if _resolver is None or config != _resolver_config:
+            _resolver = Resolver(build_backends(config), ResponseCache(RESOLVER_CACHE_DIR))
+            _resolver_config = config
+        return _resolver
+
+
+def _type_fields(entry_type: str) -> list:
+    """Feldnamen eines Eintragstyps laut ENTRY_TYPES (unbekannt: misc)."""
+    info = ENTRY_TYPES.get(entry_type) or ENTRY_TYPES["misc"]
+    return [f["key"] for f in info["fields"]]
+
+
+@app.route("/api/resolve", methods=["POST"])
+def api_resolve():
+    """Eintragstyp und Felder zu einer DOI oder ISBN (für das Formular)."""
+    body = request.get_json(force=True)
+    try:
+        result = get_resolver().resolve(body.get("identifier", ""))
+    except ResolveError as e:
+        return jsonify({"ok": False, "error": str(e)})
+    entry_type = result["entry_type"] if result["entry_type"] in ENTRY_TYPES else "misc"
+    allowed = _type_fields(entry_type)
+    return jsonify({
+        "ok": True,
+        "entry_type": entry_type,
+        "fields": {k: v for k, v in result["fields"].items() if k in allowed},
+        "source": result["source"],
+        "cached": result["cached"],
+    })
+
+
+@app.route("/api/resolve/enrich", methods=["POST"])
+def api_resolve_enrich():
+    """
+    Ergänzt bei allen Einträgen mit DOI oder ISBN die leeren Felder ihres
+    Eintragstyps. Bestehende Werte werden nie überschrieben; dry_run zeigt
+    nur an, was ergänzt würde.
+    """
+    body = request.get_json(force=True, silent=True) or {}
+    dry_run = bool(body.get("dry_run"))
+    index = get_library_index(refresh=True)
+    if index is None:
+        return jsonify({"ok": False, "error": "Kein Zielverzeichnis konfiguriert."}), 400
+
+    candidates = []
+    for rec in index.records():
+        identifier = rec.doi or rec.isbn
+        if not identifier or not rec.key:
+            continue
+        present = {k for k, v in rec.fields.items() if str(v).strip()}
+        missing = [k for k in _type_fields(rec.type) if k not in present]
+        if missing:
+            candidates.append((rec, identifier, missing))
+
+    started = time.perf_counter()
+    results = get_resolver().resolve_many(identifier for _rec, identifier, _missing in candidates)
+    updated, failed, written, versions, previous = [], [], [], [], {}
+    for rec, identifier, missing in candidates:
+        result = results[identifier]
+        if "error" in result:
+            failed.append({"path": rec.path, "error": result["error"]})
+            continue
+        additions = {k: result["fields"][k] for k in missing if result["fields"].get(k)}
+        if not additions:
+            continue
+        updated.append({"path": rec.path, "key": rec.key, "fields": sorted(additions)})
+        if dry_run:
+            continue
+        p = pathlib.Path(rec.path)
         try:
-            stat = f.stat()
-            with open(f, "r", encoding="utf-8") as fh:
-                content = fh.read()
-            entry = parse_bib_entry(content)
-            files.append({
-                "name":     f.name,
-                "path":     str(f),
-                "modified": datetime.datetime.fromtimestamp(stat.st_mtime).strftime("%d.%m.%Y %H:%M"),
-                "size":     stat.st_size,
-                "type":     entry["type"],
-                "key":      entry["key"],
-                "title":    entry["title"],
-                "author":   entry["author"],
-                "year":     entry["year"],
-                "publisher":entry["publisher"],
-                "isbn":     entry["isbn"],
-                "url":      entry["url"],
-                "doi":      entry["doi"],
-                "journal":  entry["journal"],
-            })
-        except Exception:
-            pass
+            original = p.read_bytes()
+            data = add_fields(original, {rec.key: additions})
+            tmp = p.with_name(p.name + ".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, p)
+        except OSError as e:
+            updated.pop()
+            failed.append({"path": rec.path, "error": str(e)})
+            continue
+        written.append((p.name, data.decode("utf-8", errors="replace")))
+        versions.append((p, data))
+        previous[p] = original
+    if written:
+        # Mit dem Stand vor dem Ergänzen, damit es rückgängig gemacht werden kann
+        record_versions(ENRICH, versions, previous)
+        aggregates = get_aggregates()
+        if aggregates is not None:
+            aggregates.put_many(written)
+        _index_touch(*(u["path"] for u in updated))
+    return jsonify({
+        "ok": True,
+        "checked": len(candidates),
+        "updated": updated,
+        "failed": failed,
+        "dry_run": dry_run,
+        "took_ms": round((time.perf_counter() - started) * 1000, 1),
+    })
 
-    return jsonify({"files": files})
+
+# ---------------------------------------------------------------------------
+# Dateisystem-Überwachung & Live-Updates (Server-Sent Events)
+# ---------------------------------------------------------------------------
+events = EventBroker()
+_watcher = None
+_watcher_lock = threading.Lock()
+
+# Abstand der Keep-Alive-Kommentare im SSE-Strom (Sekunden)
+SSE_KEEPALIVE = 15.0
+
+# Höchstzahl gleichzeitiger SSE-Clients (None = unbegrenzt; im Servermodus
+# gesetzt, da jeder Strom dauerhaft einen Worker-Thread belegt)
+_sse_max_clients = None
+
+
+def event_scope(target_dir) -> str:
+    """Bereich der Live-Ereignisse eines Projekts: sein Zielverzeichnis."""
+    return os.path.normcase(os.path.abspath(target_dir)) if target_dir else ""
+
+
+def _publish_library_change(index, path: str, rec):
+    """
+    Listener des Bibliotheks-Index: meldet neu geparste und entfernte Dateien
+    an die Clients, die diese Bibliothek anzeigen (nicht an andere Projekte).
+    """
+    event = {"type": "library", "path": path, "library_size": len(index)}
+    if rec is None:
+        event["action"] = "delete"
+    else:
+        event["action"] = "upsert"
+        event["file"] = record_to_json(rec)
+    events.publish(event, scope=event_scope(index.target_dir))
+
+
+def _on_fs_change(paths: set):
+    """Callback des Watchers: nur die betroffenen Index-Einträge neu einlesen."""
+    index = get_library_index()
+    latex_main = settings.get("latex_main_path", "")
+    latex_abs = os.path.normcase(os.path.abspath(latex_main)) if latex_main else ""
+    target_abs = os.path.normcase(os.path.abspath(index.target_dir)) if index is not None else ""
+    for p in sorted(paths):
+        if latex_abs and os.path.normcase(p) == latex_abs:
+            events.publish({"type": "latex", "action": "modified", "path": latex_main},
+                           scope=event_scope(settings.get("target_directory", "")))
+        elif index is not None and os.path.normcase(os.path.dirname(p)) == target_abs:
+            # Änderungen meldet der Index selbst über _publish_library_change
+            index.sync_path(index.target_dir / os.path.basename(p))
+    if index is not None:
+        index.save()
+
+
+def start_watcher():
+    """(Re-)Startet die Überwachung von Zielverzeichnis und LaTeX-Hauptdatei."""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is not None:
+            _watcher.stop()
+        watcher = Watcher(_on_fs_change)
+        target, latex_main = _watched_paths()
+        if target and pathlib.Path(target).is_dir():
+            watcher.watch(target, lambda name: name.endswith(".bib"))
+        if latex_main and pathlib.Path(latex_main).parent.is_dir():
+            latex_name = pathlib.Path(latex_main).name
+            watcher.watch(pathlib.Path(latex_main).parent, lambda name: name == latex_name)
+        watcher.start()
+        _watcher = watcher
+        return watcher
+
+
+@app.route("/api/events", methods=["GET"])
+def api_events():
+    """Server-Sent Events mit Änderungen an Bibliothek und LaTeX-Hauptdatei (des Projekts der Anfrage)."""
+    if _sse_max_clients is not None and len(events) >= _sse_max_clients:
+        return jsonify({"ok": False, "error": "Zu viele Live-Verbindungen."}), 503
+    client = events.subscribe(event_scope(settings.get("target_directory", "")))
+
+    def stream():
+        try:
+            yield "retry: 3000\n\n"
+            yield format_sse({"type": "hello", "watcher": _watcher.backend if _watcher else None})
+            while True:
+                try:
+                    data = client.get(timeout=SSE_KEEPALIVE)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if data is None:
+                    # Server wird beendet
+                    return
+                yield data
+        finally:
+            events.unsubscribe(client)
+
+    resp = Response(stream(), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
 
 
 @app.route("/api/bib/save-edit", methods=["POST"])
@@ -753,8 +1222,11 @@ def api_bib_save_edit():
         target_dir = pathlib.Path(settings.get("target_directory", ""))
         if target_dir and target_dir.exists():
             p.relative_to(target_dir)  # Sicherheitscheck
+        previous = {p: p.read_bytes()} if p.exists() else None
         with open(p, "w", encoding="utf-8") as f:
             f.write(content)
+        record_versions(EDIT, [(p, p.read_bytes())], previous)
+        _index_touch(p)
         return jsonify({"ok": True})
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)})
@@ -771,13 +1243,18 @@ def api_bib_delete():
         if target_dir and target_dir.exists():
             p.relative_to(target_dir)  # Sicherheitscheck
         bib_filename = p.name
+        previous = p.read_bytes()
         p.unlink()
+        record_versions(DELETE, [(p, None)], {p: previous})
+        aggregates = get_aggregates()
+        # Sammeldatei-Modus: Block entfernen, die Sammeldatei bleibt eingebunden
+        tex_removed = aggregates.remove(bib_filename) if aggregates is not None else False
+        _index_touch(p)
 
         # Automatisch aus LaTeX-Hauptdatei entfernen
-        tex_removed = False
         tex_error   = None
         latex_main  = settings.get("latex_main_path", "")
-        if latex_main and pathlib.Path(latex_main).exists():
+        if aggregates is None and latex_main and pathlib.Path(latex_main).exists():
             tex_removed, tex_error = remove_from_latex_main(
                 bib_filename, pathlib.Path(latex_main)
             )
@@ -809,130 +1286,389 @@ def api_bib_rename():
         if new_path.exists():
             return jsonify({"ok": False, "error": f"Datei '{new_name}' existiert bereits."})
         p.rename(new_path)
+        data = new_path.read_bytes()
+        record_versions(RENAME, [(new_path, data, p)], {p: data})
+        aggregates = get_aggregates()
+        if aggregates is not None:
+            aggregates.rename(p.name, new_name)
+        _index_touch(p, new_path)
         return jsonify({"ok": True, "new_path": str(new_path), "new_name": new_name})
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)})
 
 
 # ---------------------------------------------------------------------------
-# LaTeX-Datei-Integration
+# Versionen
 # ---------------------------------------------------------------------------
-def remove_from_latex_main(bib_filename: str, latex_path: pathlib.Path) -> tuple:
+def _version_json(op: dict) -> dict:
+    result = {
+        "seq": op["seq"],
+        "op": op["op"],
+        "name": op["name"],
+        "blob": op["blob"],
+        "deleted": op["blob"] is None,
+        "modified": datetime.datetime.fromtimestamp(op["ts"]).strftime("%d.%m.%Y %H:%M:%S"),
+    }
+    if op.get("from"):
+        result["from"] = op["from"]
+    return result
+
+
+@app.route("/api/versions", methods=["GET"])
+def api_versions():
     """
-    Entfernt die \\addbibresource{...filename.bib}-Zeile sauber aus der .tex-Datei.
-    Gibt (True, None) bei Erfolg oder (False, Fehlermeldung) zurück.
+    Ohne name: alle Dateien mit Historie (auch gelöschte) samt Speicherbedarf.
+    Mit name (Dateiname oder Pfad): alle Stände dieser Datei, neueste zuerst.
     """
+    history = get_history()
+    if history is None:
+        return jsonify({"ok": False, "error": "Kein Zielverzeichnis konfiguriert."}), 400
+    name = request.args.get("name", "").strip()
+    if name:
+        name = pathlib.Path(name).name
+        return jsonify({"ok": True, "name": name, "versions": [_version_json(op) for op in history.versions(name)]})
+    files = history.files()
+    if request.args.get("deleted"):
+        files = [f for f in files if f["deleted"] and not f["renamed_to"]]
+    for f in files:
+        f["modified"] = datetime.datetime.fromtimestamp(f.pop("ts")).strftime("%d.%m.%Y %H:%M:%S")
+    return jsonify({"ok": True, "files": files, "stats": history.stats()})
+
+
+@app.route("/api/versions/<int:seq>", methods=["GET"])
+def api_version_content(seq):
+    """Inhalt eines Stands."""
+    history = get_history()
+    op = history.get(seq) if history is not None else None
+    if op is None:
+        return jsonify({"ok": False, "error": "Version nicht gefunden."}), 404
+    if op["blob"] is None:
+        return jsonify({"ok": False, "error": "Dieser Stand ist eine Löschung und hat keinen Inhalt."}), 400
     try:
-        with open(latex_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-
-        new_lines = []
-        found = False
-        for line in lines:
-            # Entfernen wenn die Zeile \addbibresource enthält UND den Dateinamen
-            if r"\addbibresource" in line and bib_filename in line:
-                found = True
-                # Zeile überspringen (nicht in new_lines aufnehmen)
-            else:
-                new_lines.append(line)
-
-        if not found:
-            return False, f"'{bib_filename}' nicht in LaTeX-Datei gefunden."
-
-        # Mehr als 2 aufeinanderfolgende Leerzeilen → maximal 1 Leerzeile
-        cleaned = []
-        blank_count = 0
-        for line in new_lines:
-            if line.strip() == "":
-                blank_count += 1
-                if blank_count <= 1:
-                    cleaned.append(line)
+        content = history.blob(op["blob"]).decode("utf-8", errors="replace")
+    except KeyError:
+        return jsonify({"ok": False, "error": "Inhalt der Version fehlt im Speicher."}), 500
+    return jsonify({"ok": True, **_version_json(op), "content": content})
+
+
+@app.route("/api/versions/<int:seq>/restore", methods=["POST"])
+def api_version_restore(seq):
+    """
+    Stellt einen Stand wieder her: {"name": optional anderer Dateiname, z.B.
+    der aktuelle Name nach einer Umbenennung}. Der bisherige Inhalt bleibt als
+    Version erhalten; eine gelöschte Datei wird wieder in die LaTeX-Hauptdatei
+    bzw. ihre Sammeldatei eingebunden.
+    """
+    body = request.get_json(force=True, silent=True) or {}
+    history = get_history()
+    op = history.get(seq) if history is not None else None
+    if op is None:
+        return jsonify({"ok": False, "error": "Version nicht gefunden."}), 404
+    if op["blob"] is None:
+        return jsonify({"ok": False, "error": "Dieser Stand ist eine Löschung und hat keinen Inhalt."}), 400
+    name = str(body.get("name") or op["name"]).strip()
+    if not name.endswith(".bib") or re.search(r'[<>:"/\\|?*]', name):
+        return jsonify({"ok": False, "error": "Ungültiger Dateiname."}), 400
+    try:
+        data = history.blob(op["blob"])
+    except KeyError:
+        return jsonify({"ok": False, "error": "Inhalt der Version fehlt im Speicher."}), 500
+
+    target_dir = get_library_index().target_dir
+    p = target_dir / name
+    existed = p.exists()
+    tmp = p.with_name(p.name + ".tmp")
+    try:
+        previous = {p: p.read_bytes()} if existed else None
+        tmp.write_bytes(data)
+        os.replace(tmp, p)
+    except OSError as e:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return jsonify({"ok": False, "error": f"Wiederherstellen fehlgeschlagen: {e}"})
+    record_versions(RESTORE, [(p, data)], previous)
+    text = data.decode("utf-8", errors="replace")
+    aggregates = get_aggregates()
+    section_id = aggregates.put(p.name, text) if aggregates is not None else None
+    _index_touch(p)
+
+    latex_updated, latex_error = False, None
+    latex_main = settings.get("latex_main_path", "")
+    if not existed and latex_main and pathlib.Path(latex_main).exists():
+        try:
+            if aggregates is not None:
+                _added, latex_error = include_aggregates([section_id], pathlib.Path(latex_main))
+                latex_updated = latex_error is None
             else:
-                blank_count = 0
-                cleaned.append(line)
+                section_id = _aggregate_store().section_from_text(text)
+                latex_updated, latex_error = update_latex_main(p, pathlib.Path(latex_main), section_id)
+        except Exception as e:
+            latex_error = str(e)
+    return jsonify({"ok": True, "path": str(p), "name": p.name, "created": not existed,
+                    "latex_updated": latex_updated, "latex_error": latex_error})
+
+
+@app.route("/api/import", methods=["POST"])
+def api_import():
+    """
+    Massenimport einer großen .bib-Datei (gestreamt, Eintrag für Eintrag).
+    Multipart-Upload (Feld "file") oder JSON mit "path" auf eine lokale Datei.
+    Parameter: mode ("split" = eine Datei pro Eintrag, "grouped" = eine Datei),
+    section_id, update_latex (Standard: ja).
+    """
+    upload = request.files.get("file")
+    body = request.form if upload else (request.get_json(silent=True) or {})
+    mode = body.get("mode", "split")
+    section_id = body.get("section_id", "")
+    update_latex = str(body.get("update_latex", "true")).lower() not in ("0", "false", "no")
 
-        with open(latex_path, "w", encoding="utf-8") as f:
-            f.writelines(cleaned)
+    target = settings.get("target_directory", "")
+    if not target or not str(target).strip():
+        return jsonify({"ok": False, "error": "Kein Zielverzeichnis konfiguriert. Bitte in den Einstellungen festlegen."}), 400
+    target_dir = pathlib.Path(target)
 
-        return True, None
+    if upload:
+        source, source_name = upload.stream, upload.filename or "import.bib"
+    else:
+        source = pathlib.Path(body.get("path", ""))
+        source_name = source.name
+        if not body.get("path") or not source.is_file():
+            return jsonify({"ok": False, "error": "Importdatei nicht gefunden."}), 400
+
+    index = get_library_index(refresh=True)
+    taken = get_key_registry().keys() if index is not None else []
+    started = time.perf_counter()
+    try:
+        importer = BulkImporter(
+            target_dir,
+            key_factory=generate_cite_key,
+            filename_factory=generate_filename,
+            mode=mode,
+            taken_keys=taken,
+            header=entry_comment(section_id, prefix=f"Importiert aus {source_name} am"),
+            group_name=source_name,
+            # Versionen je geschriebenem Paket, nicht den ganzen Import auf einmal
+            on_written=functools.partial(record_versions, IMPORT),
+        )
+        result = importer.run(source)
     except Exception as e:
-        return False, str(e)
+        return jsonify({"ok": False, "error": str(e)})
+
+    # Sammeldatei mit einem Schreibzugriff ergänzen (Dateien einzeln gelesen),
+    # Index einmal abgleichen statt pro Datei
+    aggregates = get_aggregates()
+    if aggregates is not None and importer.written:
+        aggregates.put_many(((p.name, p.read_text(encoding="utf-8")) for p in map(pathlib.Path, importer.written)),
+                            section_id)
+    if index is not None:
+        index.refresh()
+
+    # LaTeX-Hauptdatei nur einmal am Ende aktualisieren
+    latex_added = 0
+    latex_error = None
+    latex_main = settings.get("latex_main_path", "")
+    if update_latex and importer.written and latex_main and pathlib.Path(latex_main).exists():
+        try:
+            if aggregates is not None:
+                added, latex_error = include_aggregates([section_id], pathlib.Path(latex_main))
+                latex_added = len(added)
+            else:
+                latex_added, latex_error = update_latex_main_many(
+                    importer.written, pathlib.Path(latex_main), section_id)
+        except Exception as e:
+            latex_error = str(e)
+
+    result.update({
+        "ok": True,
+        "mode": mode,
+        "latex_added": latex_added,
+        "latex_error": latex_error,
+        "took_ms": round((time.perf_counter() - started) * 1000, 1),
+    })
+    if mode == "grouped":
+        result["filepath"] = str(importer.group_path)
+    return jsonify(result)
+
+
+# ---------------------------------------------------------------------------
+# Projekte
+# ---------------------------------------------------------------------------
+# Header, mit dem die Oberfläche das Projekt einer Anfrage wählt (alternativ ?project=)
+PROJECT_HEADER = "X-LQM-Project"
+
+
+@app.before_request
+def select_project():
+    """Projekt der Anfrage aus ?project= oder dem Header (sonst das aktive Projekt)."""
+    name = request.args.get("project") or request.headers.get(PROJECT_HEADER, "")
+    request.environ["lqm.project_token"] = current_project.set(name)
+    if name and settings.project_name() != name:
+        return jsonify({"ok": False, "error": f"Unbekanntes Projekt: {name}"}), 404
+
+
+@app.teardown_request
+def reset_project(_exc=None):
+    token = request.environ.pop("lqm.project_token", None)
+    if token is not None:
+        current_project.reset(token)
+
+
+@app.route("/api/projects", methods=["GET"])
+def api_projects():
+    """Alle Projekte mit Zielverzeichnis, Hauptdatei und Ladezustand ihres Index."""
+    with _library_index_lock:
+        loaded = {key: len(lib.index) for key, lib in _libraries.items()}
+        used = sum(lib.memory_estimate() for lib in _libraries.values())
+    items = []
+    for name, profile in sorted(settings.projects().items(), key=lambda kv: kv[0].casefold()):
+        target = profile.get("target_directory", "")
+        key = str(pathlib.Path(target)) if target else ""
+        items.append({
+            "name": name,
+            "target_directory": target,
+            "latex_main_path": profile.get("latex_main_path", ""),
+            "loaded": key in loaded,
+            "entries": loaded.get(key),
+        })
+    return jsonify({
+        "active": settings.get("active_project", ""),
+        "current": settings.project_name(),
+        "projects": items,
+        "memory_budget_mb": settings.get("project_memory_budget_mb", 256),
+        "memory_used_mb": round(used / (1024 * 1024), 1),
+    })
 
 
-def update_latex_main(bib_filepath: pathlib.Path, latex_path: pathlib.Path, section_id: str = "") -> tuple:
+@app.route("/api/projects", methods=["POST"])
+def api_project_save():
     """
-    Fügt \\addbibresource{...} in die LaTeX-Hauptdatei ein.
-    Gibt (True, None) bei Erfolg oder (False, Fehlermeldung) zurück.
+    Legt ein Projekt an oder ändert es (name plus Werte der PROJECT_KEYS).
+    Neue Projekte übernehmen ohne copy_current=false die aktuellen Werte.
     """
-    with open(latex_path, "r", encoding="utf-8") as f:
-        content = f.read()
+    body = request.get_json(force=True)
+    name = str(body.get("name", "")).strip()
+    try:
+        profile = settings.save_project(name, body, copy_current=body.get("copy_current", True))
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    return jsonify({"ok": True, "name": name, "project": profile})
+
+
+@app.route("/api/projects/<name>", methods=["DELETE"])
+def api_project_delete(name):
+    """Entfernt ein Projektprofil (die Dateien bleiben unberührt)."""
+    if not settings.remove_project(name):
+        return jsonify({"ok": False, "error": f"Unbekanntes Projekt: {name}"}), 404
+    return jsonify({"ok": True, "active": settings.get("active_project", "")})
 
-    # Relativen Pfad berechnen
+
+@app.route("/api/projects/active", methods=["POST"])
+def api_project_activate():
+    """Setzt das aktive Projekt (Standard für Anfragen ohne Projekt und für die Überwachung)."""
+    name = str(request.get_json(force=True).get("name", "")).strip()
+    watched = _watched_paths()
     try:
-        rel = bib_filepath.relative_to(latex_path.parent)
-        rel_str = str(rel).replace("\\", "/")
-    except ValueError:
-        rel_str = str(bib_filepath).replace("\\", "/")
-
-    new_line = f"\\addbibresource{{{rel_str}}}"
-
-    # Duplikat-Check
-    if new_line in content:
-        return False, f"Eintrag '{rel_str}' ist bereits in der LaTeX-Datei vorhanden."
-
-    placement_cfg = settings.get("addbibresource_placement", {})
-    search_text = ""
-
-    # Abschnitts-Suchtext ermitteln
-    if section_id:
-        sections = settings.get("bib_placement_sections", [])
-        sec = next((s for s in sections if s["id"] == section_id), None)
-        if sec and sec.get("search_text"):
-            search_text = sec["search_text"]
-
-    if not search_text and placement_cfg.get("enabled") and placement_cfg.get("search_text"):
-        search_text = placement_cfg["search_text"]
-
-    if search_text and search_text in content:
-        # Nach dem Suchtext einfügen
-        idx = content.find(search_text)
-        end_of_line = content.find("\n", idx)
-        if end_of_line == -1:
-            end_of_line = len(content)
-        # Alle bestehenden \addbibresource nach dem Suchtext überspringen
-        insert_pos = end_of_line + 1
-        lines_after = content[insert_pos:].split("\n")
-        offset = 0
-        for line in lines_after:
-            if line.strip().startswith("\\addbibresource"):
-                offset += len(line) + 1
-            else:
-                break
-        insert_pos += offset
-        new_content = content[:insert_pos] + new_line + "\n" + content[insert_pos:]
-    elif placement_cfg.get("after_last_existing", True):
-        # Nach dem letzten vorhandenen \addbibresource einfügen
-        matches = list(re.finditer(r"\\addbibresource\{[^}]+\}", content))
-        if matches:
-            last = matches[-1]
-            end_of_last = content.find("\n", last.end())
-            if end_of_last == -1:
-                end_of_last = len(content)
-            new_content = content[:end_of_last + 1] + new_line + "\n" + content[end_of_last + 1:]
-        else:
-            # Kein vorhandener Eintrag – ans Ende des Präambels
-            begin_doc = content.find("\\begin{document}")
-            if begin_doc != -1:
-                new_content = content[:begin_doc] + new_line + "\n" + content[begin_doc:]
-            else:
-                new_content = content + "\n" + new_line + "\n"
-    else:
-        new_content = content + "\n" + new_line + "\n"
+        settings.activate_project(name)
+    except KeyError:
+        return jsonify({"ok": False, "error": f"Unbekanntes Projekt: {name}"}), 404
+    if _watcher is not None and watched != _watched_paths():
+        start_watcher()
+    return jsonify({"ok": True, "active": name})
 
-    with open(latex_path, "w", encoding="utf-8") as f:
-        f.write(new_content)
 
-    return True, None
+# ---------------------------------------------------------------------------
+# Sammeldateien je Abschnitt
+# ---------------------------------------------------------------------------
+def _aggregate_store():
+    """Sammeldateien der aktuellen Bibliothek, unabhängig vom Modus (oder None)."""
+    lib = get_library()
+    return lib.aggregates if lib is not None else None
+
+
+def get_aggregates():
+    """Sammeldateien der aktuellen Bibliothek, wenn der Modus aktiv ist (sonst None)."""
+    if not settings.get("aggregate_sections", False):
+        return None
+    return _aggregate_store()
+
+
+def include_aggregates(section_ids, latex_path: pathlib.Path) -> tuple:
+    """
+    Stellt sicher, dass die Sammeldateien der Abschnitte in der Hauptdatei
+    eingebunden sind (fehlende Zeilen mit einem Schreibzugriff, jeweils an
+    der Stelle des Abschnitts). Gibt (eingefügte Pfade, Fehler|None) zurück.
+    """
+    store = _aggregate_store()
+    groups = {sid: [pathlib.Path(store.path_for(sid))] for sid in section_ids}
+    return update_latex_main_groups(groups, latex_path)
+
+
+def rebuild_aggregates() -> dict:
+    """
+    Schreibt alle Sammeldateien aus der Bibliothek neu (Zuordnung: bisherige
+    Sammeldatei, sonst Kommentar "% Abschnitt: …") und stellt die Hauptdatei
+    um: Zeilen der Einzeldateien raus, Zeilen der Sammeldateien rein.
+    """
+    index = get_library_index(refresh=True)
+    if index is None:
+        return {"ok": False, "error": "Kein Zielverzeichnis konfiguriert."}
+    items = []
+    for rec in index.records():
+        try:
+            items.append((os.path.basename(rec.path), pathlib.Path(rec.path).read_text(encoding="utf-8")))
+        except OSError:
+            continue
+    counts = _aggregate_store().rebuild(items)
+    result = {"ok": True, "sections": counts, "latex_removed": 0, "latex_added": 0, "latex_error": None}
+
+    latex_main = settings.get("latex_main_path", "")
+    if latex_main and pathlib.Path(latex_main).exists():
+        try:
+            latex_path = pathlib.Path(latex_main)
+            result["latex_removed"] = remove_resources([rec.path for rec in index.records()], latex_path)
+            added, result["latex_error"] = include_aggregates(counts, latex_path)
+            result["latex_added"] = len(added)
+        except Exception as e:
+            result["latex_error"] = str(e)
+    return result
+
+
+def restore_single_files() -> dict:
+    """Gegenstück zu rebuild_aggregates(): bindet wieder jede .bib-Datei einzeln ein."""
+    index = get_library_index(refresh=True)
+    result = {"ok": True, "latex_removed": 0, "latex_added": 0, "latex_error": None}
+    latex_main = settings.get("latex_main_path", "")
+    if index is None or not latex_main or not pathlib.Path(latex_main).exists():
+        return result
+    store = _aggregate_store()
+    groups = {}
+    for rec in index.records():
+        section_id = store.section_of(os.path.basename(rec.path)) or ""
+        groups.setdefault(section_id, []).append(rec.path)
+    try:
+        latex_path = pathlib.Path(latex_main)
+        section_ids = store.section_ids()
+        result["latex_removed"] = remove_resources([store.path_for(s) for s in section_ids], latex_path)
+        added, result["latex_error"] = update_latex_main_groups(groups, latex_path)
+        result["latex_added"] = len(added)
+    except Exception as e:
+        result["latex_error"] = str(e)
+    return result
+
+
+def switch_aggregate_mode(enabled: bool) -> dict:
+    """Stellt die Bibliothek beim Umschalten der Einstellung um."""
+    return rebuild_aggregates() if enabled else restore_single_files()
+
+
+@app.route("/api/aggregates/rebuild", methods=["POST"])
+def api_aggregates_rebuild():
+    """Baut die Sammeldateien neu auf (z.B. nach Änderungen außerhalb des Managers)."""
+    if not settings.get("aggregate_sections", False):
+        return jsonify({"ok": False, "error": "Sammeldateien sind nicht aktiviert."}), 400
+    return jsonify(rebuild_aggregates())
 
 
 # ---------------------------------------------------------------------------
@@ -969,11 +1705,153 @@ def open_browser(port: int):
     webbrowser.open(url)
 
 
+# ---------------------------------------------------------------------------
+# Serverbetrieb (PID-Datei, Produktivmodus, Herunterfahren)
+# ---------------------------------------------------------------------------
+PID_FILE = CACHE_DIR / "server.pid"
+
+# Standardwerte für --serve
+SERVE_HOST = "127.0.0.1"
+SERVE_THREADS = 16
+SERVE_TIMEOUT = 60              # Sekunden ohne Aktivität, danach wird die Verbindung geschlossen
+SERVE_CONNECTION_LIMIT = 100
+# Worker-Threads, die nicht von SSE-Strömen belegt werden dürfen
+SERVE_RESERVED_THREADS = 4
+
+
+def write_pid_file(host: str, port: int):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = PID_FILE.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"pid": os.getpid(), "host": host, "port": port}, f)
+    os.replace(tmp, PID_FILE)
+
+
+def remove_pid_file():
+    """Entfernt die PID-Datei, sofern sie zu diesem Prozess gehört."""
+    try:
+        with open(PID_FILE, "r", encoding="utf-8") as f:
+            if json.load(f).get("pid") == os.getpid():
+                PID_FILE.unlink()
+    except (OSError, ValueError, AttributeError):
+        pass
+
+
+def _port_in_use(host: str, port: int) -> bool:
+    if host in ("", "0.0.0.0", "::"):
+        host = "127.0.0.1"
+    try:
+        with socket.create_connection((host, port), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+
+def stop_running_server(timeout: float = 5.0) -> bool:
+    """
+    Beendet einen noch laufenden Server dieser Installation (laut PID-Datei).
+    Gibt True zurück, wenn ein Server beendet wurde.
+    """
+    try:
+        with open(PID_FILE, "r", encoding="utf-8") as f:
+            info = json.load(f)
+        pid, host, port = int(info["pid"]), info.get("host", ""), int(info["port"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+    if pid == os.getpid():
+        return False
+    # Verwaiste PID-Datei (Prozess abgestürzt, PID evtl. neu vergeben)
+    if not _port_in_use(host, port):
+        PID_FILE.unlink(missing_ok=True)
+        return False
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except OSError:
+        PID_FILE.unlink(missing_ok=True)
+        return False
+    deadline = time.monotonic() + timeout
+    while _port_in_use(host, port) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    return True
+
+
+def shutdown():
+    """Aufräumen beim Beenden: Live-Ströme schließen, Überwachung stoppen, Einstellungen und Index sichern."""
+    events.close()
+    if _watcher is not None:
+        _watcher.stop()
+    settings.flush()
+    for lib in list(_libraries.values()):
+        try:
+            lib.index.save()
+        except OSError as e:
+            print(f"  Warnung: Bibliotheks-Index konnte nicht gespeichert werden: {e}")
+    remove_pid_file()
+
+
+def serve(host: str, port: int, threads: int = SERVE_THREADS, timeout: int = SERVE_TIMEOUT,
+          connection_limit: int = SERVE_CONNECTION_LIMIT):
+    """
+    Produktivbetrieb mit waitress: mehrere Worker-Threads, Keep-Alive,
+    Verbindungs-Timeouts. SIGTERM/SIGINT beenden den Server geordnet.
+    """
+    try:
+        from waitress import create_server
+    except ImportError:
+        print("FEHLER: Für --serve wird waitress benötigt.")
+        print("Bitte ausführen: pip install waitress")
+        sys.exit(1)
+
+    global _sse_max_clients
+    _sse_max_clients = max(threads - SERVE_RESERVED_THREADS, 0)
+
+    server = create_server(app, host=host, port=port, threads=threads,
+                           channel_timeout=timeout, connection_limit=connection_limit,
+                           ident="LaTeX Quellen Manager")
+
+    def _terminate(signum, frame):
+        # Offene SSE-Ströme beenden, damit die Worker-Threads frei werden;
+        # waitress fängt SystemExit ab und wartet auf laufende Anfragen.
+        events.close()
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, _terminate)
+    signal.signal(signal.SIGINT, _terminate)
+    server.run()
+
+
 # ---------------------------------------------------------------------------
 # Einstiegspunkt
 # ---------------------------------------------------------------------------
-def main():
-    port = settings.get("port", 5000)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="LaTeX Quellen Manager")
+    parser.add_argument("--serve", action="store_true",
+                        help="Produktivbetrieb mit waitress (mehrere Threads, kein Browser)")
+    parser.add_argument("--host", default=None,
+                        help=f"Bind-Adresse (Standard: {SERVE_HOST})")
+    parser.add_argument("--port", type=int, default=None,
+                        help="Port (Standard: aus den Einstellungen)")
+    parser.add_argument("--threads", type=int, default=SERVE_THREADS,
+                        help=f"Worker-Threads im Servermodus (Standard: {SERVE_THREADS})")
+    parser.add_argument("--timeout", type=int, default=SERVE_TIMEOUT,
+                        help=f"Timeout für inaktive Verbindungen in Sekunden (Standard: {SERVE_TIMEOUT})")
+    parser.add_argument("--connection-limit", type=int, default=SERVE_CONNECTION_LIMIT,
+                        help=f"Maximale Anzahl offener Verbindungen (Standard: {SERVE_CONNECTION_LIMIT})")
+    parser.add_argument("--stop", action="store_true",
+                        help="Laufenden Server beenden und sofort zurückkehren")
+    parser.add_argument("--profile-slow", type=float, default=None, metavar="MS",
+                        help=f"cProfile-Profil für Anfragen über MS Millisekunden nach {PROFILE_DIR} schreiben")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.stop:
+        print("Server beendet." if stop_running_server() else "Kein laufender Server gefunden.")
+        return
+
+    port = args.port or settings.get("port", 5000)
+    host = args.host or SERVE_HOST
 
     # Abhängigkeits-Check
     try:
@@ -986,17 +1864,50 @@ def main():
 
     print("=" * 55)
     print("  LaTeX Quellen Manager v4.1")
-    print(f"  Weboberfläche: http://127.0.0.1:{port}")
+    print(f"  Weboberfläche: http://{host}:{port}")
+    if args.serve:
+        print(f"  Servermodus: waitress, {args.threads} Threads")
+    if args.profile_slow is not None:
+        enable_profiling(args.profile_slow)
+        print(f"  Profiling: Anfragen ab {args.profile_slow:g} ms → {PROFILE_DIR}")
     print("  Zum Beenden: Strg+C drücken")
     print("=" * 55)
 
-    # Browser nach einer kurzen Verzögerung öffnen
-    if settings.get("auto_open_browser", True):
-        t = threading.Timer(1.2, open_browser, args=[port])
-        t.daemon = True
-        t.start()
+    # Bibliotheks-Index laden und mit dem Dateisystem abgleichen
+    try:
+        get_library_index()
+    except Exception as e:
+        print(f"  Warnung: Bibliotheks-Index konnte nicht geladen werden: {e}")
+
+    # Zielverzeichnis und LaTeX-Datei auf externe Änderungen überwachen
+    try:
+        watcher = start_watcher()
+        print(f"  Dateiüberwachung: {watcher.backend}")
+    except Exception as e:
+        print(f"  Warnung: Dateiüberwachung nicht verfügbar: {e}")
+
+    try:
+        write_pid_file(host, port)
+    except OSError as e:
+        print(f"  Warnung: PID-Datei konnte nicht geschrieben werden: {e}")
 
-    app.run(host="127.0.0.1", port=port, debug=False, use_reloader=False)
+    try:
+        if args.serve:
+            serve(host, port, threads=args.threads, timeout=args.timeout,
+                  connection_limit=args.connection_limit)
+            return
+
+        # Browser nach einer kurzen Verzögerung öffnen
+        if settings.get("auto_open_browser", True):
+            t = threading.Timer(1.2, open_browser, args=[port])
+            t.daemon = True
+            t.start()
+
+        app.run(host=host, port=port, debug=False, use_reloader=False)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,180 @@
+"""
+LaTeX Quellen Manager - Zitationsanalyse des LaTeX-Projekts
+
+Folgt ab der Hauptdatei allen ``\\input``, ``\\include``, ``\\subfile`` und
+``\\import``/``\\subimport`` und sammelt die Zitierschlüssel aller
+``\\cite``-Varianten (biblatex und natbib, auch ``\\cites`` mit mehreren
+Schlüsselgruppen). Die Dateien einer Ebene des Include-Baums werden
+parallel gelesen und ausgewertet. Das Ergebnis je Datei wird per stat
+(mtime + Größe) gecacht, sodass nach einer Änderung nur diese Datei neu
+gelesen wird.
+"""
+
+import os
+import re
+import hashlib
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Anzahl paralleler Leser
+SCAN_WORKERS = min(8, (os.cpu_count() or 2) * 2)
+
+# Schutz gegen Endlos-Includes
+MAX_DEPTH = 32
+
+_COMMENT = re.compile(r"(?<!\\)%[^\n]*")
+_INCLUDE = re.compile(r"\\(input|include|subfile|import|subimport|inputfrom|subinputfrom|includefrom|subincludefrom)"
+                      r"\*?\s*(?:\{([^}]*)\})?\s*\{([^}]*)\}")
+_CITE = re.compile(r"\\([A-Za-z]*cite[A-Za-z]*)\*?")
+_CITE_ARGS = re.compile(r"\s*(?:\[[^\]]*\]|\([^)]*\))")
+_CITE_KEYS = re.compile(r"\s*\{([^}]*)\}")
+
+# Befehle mit zwei Pfadargumenten (Verzeichnis, Datei)
+_TWO_ARG = {"import", "subimport", "inputfrom", "subinputfrom", "includefrom", "subincludefrom"}
+# Relativ zum Verzeichnis der einbindenden Datei
+_RELATIVE = {"subimport", "subinputfrom", "subincludefrom"}
+
+# Ergebnis je Datei: includes [(Befehl, Verzeichnis, Datei)], cites [(Schlüssel, Zeile)]
+FileScan = namedtuple("FileScan", "includes cites nocite_all")
+
+
+def parse_tex(content: str) -> FileScan:
+    """Includes und Zitate einer .tex-Datei (Kommentare werden ignoriert)."""
+    text = _COMMENT.sub("", content)
+    includes = []
+    for m in _INCLUDE.finditer(text):
+        command, first, second = m.group(1), (m.group(2) or "").strip(), m.group(3).strip()
+        if command in _TWO_ARG:
+            includes.append((command, first, second))
+        else:
+            # \input{a}{…}: das zweite Argument gehört nicht zum Befehl
+            includes.append((command, "", first if m.group(2) is not None else second))
+
+    cites, nocite_all = [], False
+    line, last = 1, 0
+    for m in _CITE.finditer(text):
+        pos = m.end()
+        groups = []
+        while True:
+            # Optionale Argumente [Vor][Nach] bzw. (Multicite)
+            a = _CITE_ARGS.match(text, pos)
+            while a is not None and a.end() > pos:
+                pos = a.end()
+                a = _CITE_ARGS.match(text, pos)
+            k = _CITE_KEYS.match(text, pos)
+            if k is None:
+                break
+            groups.append(k.group(1))
+            pos = k.end()
+            # Nur \cites, \parencites, … haben mehrere Schlüsselgruppen
+            if not m.group(1).endswith("s"):
+                break
+        if not groups:
+            continue
+        line += text.count("\n", last, m.start())
+        last = m.start()
+        for group in groups:
+            for key in group.split(","):
+                key = key.strip()
+                if key == "*":
+                    nocite_all = True
+                elif key:
+                    cites.append((key, line))
+    return FileScan(includes, cites, nocite_all)
+
+
+def _resolve(root_dir: str, file_dir: str, command: str, directory: str, name: str) -> str:
+    """Absoluter Pfad eines Include-Ziels (.tex wird bei Bedarf ergänzt)."""
+    base = file_dir if command in _RELATIVE else root_dir
+    if command in _TWO_ARG:
+        base = os.path.join(base, directory)
+    path = os.path.normpath(os.path.join(base, name))
+    # Wie TeX: zuerst name.tex, dann name
+    if os.path.isfile(path + ".tex") or (not os.path.splitext(path)[1] and not os.path.isfile(path)):
+        return path + ".tex"
+    return path
+
+
+class CitationScanner:
+    """Gecachte, parallele Zitationsanalyse über den Include-Baum."""
+
+    def __init__(self, workers: int = SCAN_WORKERS):
+        self._workers = workers
+        self._lock = threading.Lock()
+        self._cache = {}              # Pfad -> ((mtime, Größe), FileScan)
+
+    def _scan_file(self, path: str):
+        """(stat-Schlüssel, FileScan, neu gelesen?) oder None, wenn die Datei fehlt."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._cache.get(path)
+        if cached is not None and cached[0] == key:
+            return key, cached[1], False
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                result = parse_tex(f.read())
+        except OSError:
+            return None
+        return key, result, True
+
+    def scan(self, main_path) -> dict:
+        """
+        Wertet die Hauptdatei samt aller eingebundenen Dateien aus. Gibt
+        files (in Breitensuche-Reihenfolge), missing (nicht gefundene Includes),
+        cites ({Schlüssel: [(Datei, Zeile)]}), nocite_all, parsed (Anzahl neu
+        gelesener Dateien) und signature (Hash aller stat-Schlüssel) zurück.
+        """
+        main_path = os.path.abspath(str(main_path))
+        root_dir = os.path.dirname(main_path)
+        files, missing, scans = [], [], {}
+        signature = hashlib.sha1()
+        parsed = 0
+        seen = {main_path}
+        level = [main_path]
+        with ThreadPoolExecutor(max_workers=self._workers) as pool:
+            for _depth in range(MAX_DEPTH):
+                if not level:
+                    break
+                next_level = []
+                for path, res in zip(level, pool.map(self._scan_file, level)):
+                    if res is None:
+                        missing.append(path)
+                        continue
+                    key, scan, fresh = res
+                    parsed += fresh
+                    with self._lock:
+                        self._cache[path] = (key, scan)
+                    files.append(path)
+                    scans[path] = scan
+                    signature.update(f"{path}\0{key[0]}\0{key[1]}\0".encode("utf-8"))
+                    file_dir = os.path.dirname(path)
+                    for command, directory, name in scan.includes:
+                        target = _resolve(root_dir, file_dir, command, directory, name)
+                        if target not in seen:
+                            seen.add(target)
+                            next_level.append(target)
+                level = next_level
+
+        with self._lock:
+            # Dateien, die nicht mehr eingebunden sind, aus dem Cache entfernen
+            for path in [p for p in self._cache if p not in scans]:
+                del self._cache[path]
+
+        cites, nocite_all = {}, False
+        for path in files:
+            scan = scans[path]
+            nocite_all = nocite_all or scan.nocite_all
+            for key, line in scan.cites:
+                cites.setdefault(key, []).append((path, line))
+        return {
+            "files": files,
+            "missing": missing,
+            "cites": cites,
+            "nocite_all": nocite_all,
+            "parsed": parsed,
+            "signature": signature.hexdigest(),
+        }
@@ -0,0 +1,395 @@
+"""
+LaTeX Quellen Manager - Kommandozeile
+
+Batch-Befehle ohne Webserver, Browser und Flask, z.B. für Build-Skripte:
+
+    python lqm_cli.py index [--list | --json]
+    python lqm_cli.py export [-o export.bib] [--type T] [--year J] [--sort S] [--dedup]
+    python lqm_cli.py import quelle.bib [--mode split|grouped] [--section ID] [--no-latex]
+    python lqm_cli.py lint [--format text|json]
+    python lqm_cli.py add TYP feld=wert ... [--key K] [--section ID] [--no-latex]
+    python lqm_cli.py tex-sync [--prune] [--dry-run]
+
+Alle Befehle nutzen die Einstellungen der Weboberfläche (mit --project die
+eines Projektprofils, mit --settings eine andere Datei) und denselben
+Index- und Prüf-Cache. Module werden erst im jeweiligen Befehl importiert,
+damit ein Aufruf schnell startet (gemessen in benchmarks/bench.py,
+cli_startup).
+"""
+
+import os
+import sys
+import argparse
+
+VERSION = "4.1"
+
+
+class CliError(Exception):
+    """Fehler, der als Meldung (ohne Traceback) ausgegeben wird."""
+
+
+# ---------------------------------------------------------------------------
+# Gemeinsame Hilfen
+# ---------------------------------------------------------------------------
+def _target_dir():
+    import pathlib
+    from lqm_core import settings
+    target = settings.get("target_directory", "")
+    if not target or not str(target).strip():
+        raise CliError("Kein Zielverzeichnis konfiguriert. Bitte in den Einstellungen festlegen.")
+    if not os.path.isdir(target):
+        raise CliError(f"Zielverzeichnis nicht gefunden: {target}")
+    return pathlib.Path(target)
+
+
+def _latex_main():
+    """Pfad der LaTeX-Hauptdatei oder None (nicht konfiguriert bzw. nicht vorhanden)."""
+    import pathlib
+    from lqm_core import settings
+    latex_main = settings.get("latex_main_path", "")
+    if latex_main and os.path.isfile(latex_main):
+        return pathlib.Path(latex_main)
+    return None
+
+
+def _load_index(target_dir):
+    """Index aus dem gemeinsamen Cache, mit dem Dateisystem abgeglichen und gespeichert."""
+    from bib_index import LibraryIndex
+    from lqm_core import index_file_for, parse_bib_entry
+    index = LibraryIndex(target_dir, index_file_for(target_dir), parse_bib_entry)
+    index.load()
+    index.refresh()
+    index.save()
+    return index
+
+
+def _aggregates(target_dir):
+    """Sammeldateien, wenn der Modus aktiv ist (sonst None)."""
+    from lqm_core import settings, section_labels, AGGREGATE_DIR
+    if not settings.get("aggregate_sections", False):
+        return None
+    from bib_aggregate import AggregateStore
+    return AggregateStore(target_dir / AGGREGATE_DIR, section_labels, lambda: True)
+
+
+_histories = {}
+
+
+def _record_versions(target_dir, op, changes, previous=None):
+    from bib_history import HistoryStore, HISTORY_DIR
+    history = _histories.get(target_dir)
+    if history is None:
+        history = _histories[target_dir] = HistoryStore(target_dir / HISTORY_DIR)
+    try:
+        history.record(op, changes, previous)
+    except OSError as e:
+        print(f"Warnung: Version nicht gespeichert: {e}", file=sys.stderr)
+
+
+def _include(groups, aggregates, latex_path):
+    """Bindet {section_id: [Pfade]} (bzw. deren Sammeldateien) ein; gibt (Anzahl, Fehler) zurück."""
+    import pathlib
+    from lqm_core import update_latex_main_groups
+    if aggregates is not None:
+        groups = {sid: [pathlib.Path(aggregates.path_for(sid))] for sid in groups}
+    added, error = update_latex_main_groups(groups, latex_path)
+    return len(added), error
+
+
+# ---------------------------------------------------------------------------
+# Befehle
+# ---------------------------------------------------------------------------
+def cmd_index(args) -> int:
+    index = _load_index(_target_dir())
+    records = index.records(args.sort)
+    if args.json:
+        import json
+        from bib_index import record_to_json
+        json.dump([record_to_json(r) for r in records], sys.stdout, ensure_ascii=False, indent=1)
+        sys.stdout.write("\n")
+    elif args.list:
+        for r in records:
+            print("\t".join((r.key, r.type, r.year, r.name, r.title)))
+    else:
+        print(f"{len(index)} Dateien in {index.target_dir}")
+    return 0
+
+
+def cmd_export(args) -> int:
+    import datetime
+    from lqm_core import iter_export
+    index = _load_index(_target_dir())
+    records, total = index.query(entry_type=args.type, year=args.year, sort=args.sort)
+    stamp = datetime.datetime.now().strftime("%d.%m.%Y %H:%M")
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        out.write(f"% Exportiert am {stamp} aus {index.target_dir} ({total} Dateien)\n\n")
+        for text in iter_export(records, "keys" if args.dedup else ""):
+            out.write(text)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if args.output:
+        print(f"{total} Dateien exportiert nach {args.output}", file=sys.stderr)
+    return 0
+
+
+def cmd_import(args) -> int:
+    import pathlib
+    from bib_import import BulkImporter
+    from bib_keys import KeyRegistry
+    from bib_history import IMPORT
+    from lqm_core import generate_cite_key, generate_filename, entry_comment, update_latex_main_many
+
+    source = pathlib.Path(args.source)
+    if not source.is_file():
+        raise CliError(f"Importdatei nicht gefunden: {source}")
+    target_dir = _target_dir()
+    index = _load_index(target_dir)
+    registry = KeyRegistry()
+    registry.rebuild(index.records())
+    importer = BulkImporter(
+        target_dir,
+        key_factory=generate_cite_key,
+        filename_factory=generate_filename,
+        mode=args.mode,
+        taken_keys=registry.keys(),
+        header=entry_comment(args.section, prefix=f"Importiert aus {source.name} am"),
+        group_name=source.name,
+        on_written=lambda batch: _record_versions(target_dir, IMPORT, [(p.name, data) for p, data in batch]),
+    )
+    result = importer.run(source)
+    written = [pathlib.Path(p) for p in importer.written]
+    aggregates = _aggregates(target_dir)
+    if aggregates is not None and written:
+        aggregates.put_many(((p.name, p.read_text(encoding="utf-8")) for p in written), args.section)
+    index.refresh()
+    index.save()
+
+    print(f"{result['imported']} Einträge importiert in {result['files']} Dateien "
+          f"({result['renamed']} Schlüssel umbenannt, {result['generated_keys']} erzeugt)")
+    latex_path = _latex_main()
+    if args.latex and written and latex_path is not None:
+        if aggregates is not None:
+            added, error = _include({args.section: written}, aggregates, latex_path)
+        else:
+            added, error = update_latex_main_many(written, latex_path, args.section)
+        if error:
+            raise CliError(f"LaTeX: {error}")
+        print(f"{added} \\addbibresource-Zeilen eingefügt")
+    return 0
+
+
+def cmd_lint(args) -> int:
+    from bib_lint import LintEngine, build_schema, format_lint_report, ERROR
+    from lqm_core import ENTRY_TYPES, lint_cache_file_for
+    target_dir = _target_dir()
+    index = _load_index(target_dir)
+    engine = LintEngine(build_schema(ENTRY_TYPES), lint_cache_file_for(target_dir))
+    files = []
+    for path, findings, _cached in engine.run([(r.path, r.hash) for r in index.records("key")]):
+        if findings:
+            files.append({"path": path, "name": os.path.basename(path), "findings": findings})
+    engine.save()
+    files.sort(key=lambda f: f["name"].casefold())
+    errors = sum(1 for f in files for x in f["findings"] if x["severity"] == ERROR)
+    if args.format == "json":
+        import json
+        json.dump({"checked": len(index), "files": files}, sys.stdout, ensure_ascii=False, indent=1)
+        sys.stdout.write("\n")
+    else:
+        sys.stdout.write(format_lint_report(files))
+        warnings = sum(len(f["findings"]) for f in files) - errors
+        print(f"{len(index)} Dateien geprüft · {errors} Fehler · {warnings} Warnungen", file=sys.stderr)
+    return 1 if errors else 0
+
+
+def cmd_add(args) -> int:
+    from bib_keys import KeyRegistry
+    from bib_history import SAVE
+    from lqm_core import (ENTRY_TYPES, generate_cite_key, generate_filename, generate_bibtex,
+                          entry_comment, update_latex_main)
+
+    if args.entry_type not in ENTRY_TYPES:
+        raise CliError(f"Unbekannter Eintragstyp: {args.entry_type} "
+                       f"(verfügbar: {', '.join(sorted(ENTRY_TYPES))})")
+    fields = {}
+    for item in args.fields:
+        name, sep, value = item.partition("=")
+        if not sep or not name.strip():
+            raise CliError(f"Feld im Format name=wert erwartet: {item}")
+        fields[name.strip()] = value
+    missing = [f["label"] for f in ENTRY_TYPES[args.entry_type]["fields"]
+               if f.get("required") and not fields.get(f["key"], "").strip()]
+    if missing:
+        print(f"Warnung: Pflichtfelder fehlen: {', '.join(missing)}", file=sys.stderr)
+
+    target_dir = _target_dir()
+    index = _load_index(target_dir)
+    registry = KeyRegistry()
+    registry.rebuild(index.records())
+    key = args.key or generate_cite_key(fields.get("title", ""), fields.get("author", ""),
+                                        fields.get("date", "") or fields.get("year", ""))
+    key = registry.unique(key, lambda k: (target_dir / generate_filename(k)).exists())
+    path = target_dir / generate_filename(key)
+    content = entry_comment(args.section) + generate_bibtex(args.entry_type, fields, key)
+    # "x": niemals eine vorhandene Datei überschreiben
+    with open(path, "x", encoding="utf-8") as f:
+        f.write(content)
+    _record_versions(target_dir, SAVE, [(path.name, path.read_bytes())])
+    aggregates = _aggregates(target_dir)
+    if aggregates is not None:
+        aggregates.put(path.name, content, args.section)
+    index.update_path(path)
+    index.save()
+    print(f"{key}\t{path}")
+
+    latex_path = _latex_main()
+    if args.latex and latex_path is not None:
+        if aggregates is not None:
+            _added, error = _include({args.section: [path]}, aggregates, latex_path)
+        else:
+            _ok, error = update_latex_main(path, latex_path, args.section)
+        if error:
+            raise CliError(f"LaTeX: {error}")
+    return 0
+
+
+def cmd_tex_sync(args) -> int:
+    """Bindet alle Dateien der Bibliothek ein; mit --prune fallen Zeilen fehlender Dateien weg."""
+    import pathlib
+    from bib_aggregate import AggregateStore
+    from latex_model import latex_main_file
+    from lqm_core import (bib_rel_path, remove_resource_lines, update_latex_main_groups,
+                          section_labels, AGGREGATE_DIR)
+
+    target_dir = _target_dir()
+    latex_path = _latex_main()
+    if latex_path is None:
+        raise CliError("Keine LaTeX-Hauptdatei konfiguriert oder Datei nicht gefunden.")
+    index = _load_index(target_dir)
+    aggregates = _aggregates(target_dir)
+    model = latex_main_file(latex_path)
+
+    def line_for(path):
+        return f"\\addbibresource{{{bib_rel_path(pathlib.Path(path), latex_path)}}}"
+
+    if aggregates is not None:
+        wanted = [(sid, aggregates.path_for(sid)) for sid in aggregates.section_ids()]
+    else:
+        # Abschnitt nur für fehlende Zeilen bestimmen (Kommentar "% Abschnitt: …")
+        sections = AggregateStore(target_dir / AGGREGATE_DIR, section_labels)
+        wanted = []
+        for rec in index.records("key"):
+            if not model.has_resource(line_for(rec.path)):
+                wanted.append((sections.section_from_text(index.read_content(rec.path)), rec.path))
+    missing = [(sid, path) for sid, path in wanted if not model.has_resource(line_for(path))]
+
+    stale = []
+    if args.prune:
+        root = os.path.normcase(os.path.abspath(target_dir))
+        for line in sorted(model.resources()):
+            rel = line[len("\\addbibresource{"):-1]
+            path = os.path.abspath(os.path.join(latex_path.parent, rel))
+            inside = os.path.normcase(path).startswith(root + os.sep)
+            if inside and not os.path.exists(path):
+                stale.append(line)
+
+    for _sid, path in missing:
+        print(f"+ {line_for(path)}")
+    for line in stale:
+        print(f"- {line}")
+    if args.dry_run:
+        print(f"{len(missing)} würden eingefügt, {len(stale)} entfernt (--dry-run)", file=sys.stderr)
+        return 0
+
+    removed = remove_resource_lines(stale, latex_path) if stale else 0
+    added = 0
+    if missing:
+        groups = {}
+        for sid, path in missing:
+            groups.setdefault(sid, []).append(path)
+        inserted, error = update_latex_main_groups(groups, latex_path)
+        if error:
+            raise CliError(f"LaTeX: {error}")
+        added = len(inserted)
+    print(f"{added} eingefügt, {removed} entfernt", file=sys.stderr)
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Einstieg
+# ---------------------------------------------------------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="lqm_cli", description="LaTeX Quellen Manager - Kommandozeile")
+    parser.add_argument("--version", action="version", version=f"LaTeX Quellen Manager {VERSION}")
+    parser.add_argument("--project", default="",
+                        help="Projektprofil statt des aktiven Projekts verwenden")
+    parser.add_argument("--settings", default="", metavar="DATEI",
+                        help="Andere Einstellungsdatei verwenden (wie LQM_SETTINGS_FILE)")
+    sub = parser.add_subparsers(dest="command", required=True, metavar="BEFEHL")
+
+    p = sub.add_parser("index", help="Index abgleichen und Bibliothek anzeigen")
+    p.add_argument("--list", action="store_true", help="Eine Zeile je Datei (Schlüssel, Typ, Jahr, Datei, Titel)")
+    p.add_argument("--json", action="store_true", help="Alle Einträge als JSON")
+    p.add_argument("--sort", default="key", choices=("key", "title", "author", "year-asc", "year-desc", "modified"))
+    p.set_defaults(func=cmd_index)
+
+    p = sub.add_parser("export", help="Bibliothek als eine .bib-Datei exportieren")
+    p.add_argument("-o", "--output", help="Zieldatei (Standard: Standardausgabe)")
+    p.add_argument("--type", default="", help="Nur dieser Eintragstyp")
+    p.add_argument("--year", default="", help="Nur dieses Jahr")
+    p.add_argument("--sort", default="key", choices=("key", "title", "author", "year-asc", "year-desc", "modified"))
+    p.add_argument("--dedup", action="store_true", help="Doppelte Zitierschlüssel weglassen")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("import", help="Große .bib-Datei importieren")
+    p.add_argument("source", help="Zu importierende .bib-Datei")
+    p.add_argument("--mode", choices=("split", "grouped"), default="split",
+                   help="split = eine Datei je Eintrag, grouped = eine Datei")
+    p.add_argument("--section", default="", help="Abschnitt (section_id) für die LaTeX-Hauptdatei")
+    p.add_argument("--no-latex", dest="latex", action="store_false", help="LaTeX-Hauptdatei nicht ändern")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("lint", help="Bibliothek prüfen (Exit-Code 1 bei Fehlern)")
+    p.add_argument("--format", choices=("text", "json"), default="text")
+    p.set_defaults(func=cmd_lint)
+
+    p = sub.add_parser("add", help="Neuen Eintrag anlegen")
+    p.add_argument("entry_type", metavar="TYP", help="Eintragstyp, z.B. book, online, article")
+    p.add_argument("fields", nargs="*", metavar="feld=wert", help="Felder, z.B. title=… author=… date=2024")
+    p.add_argument("--key", default="", help="Zitierschlüssel (Standard: aus Titel, Autor und Jahr)")
+    p.add_argument("--section", default="", help="Abschnitt (section_id)")
+    p.add_argument("--no-latex", dest="latex", action="store_false", help="LaTeX-Hauptdatei nicht ändern")
+    p.set_defaults(func=cmd_add)
+
+    p = sub.add_parser("tex-sync", help="Alle .bib-Dateien in die LaTeX-Hauptdatei einbinden")
+    p.add_argument("--prune", action="store_true",
+                   help="Zeilen entfernen, deren Datei im Zielverzeichnis fehlt")
+    p.add_argument("--dry-run", action="store_true", help="Nur anzeigen, nichts ändern")
+    p.set_defaults(func=cmd_tex_sync)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.settings:
+        # Muss vor dem ersten Import von lqm_core gesetzt sein
+        os.environ["LQM_SETTINGS_FILE"] = os.path.abspath(args.settings)
+    from lqm_core import settings, project_scope
+    if args.project and args.project not in settings.projects():
+        print(f"FEHLER: Unbekanntes Projekt: {args.project}", file=sys.stderr)
+        return 2
+    try:
+        with project_scope(args.project):
+            return args.func(args)
+    except BrokenPipeError:
+        # z.B. "lqm_cli.py export | head"
+        return 0
+    except (CliError, OSError, ValueError) as e:
+        print(f"FEHLER: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,909 @@
+"""
+LaTeX Quellen Manager - Kern ohne Flask
+
+Pfade, Einstellungen, Eintragstypen, Zitierschlüssel und BibTeX-Erzeugung
+sowie die Integration in die LaTeX-Hauptdatei. Genutzt von der
+Weboberfläche (latex_quellen_manager.py) und der Kommandozeile (lqm_cli.py);
+importiert nur die Standardbibliothek und die Flask-freien Nachbarmodule.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import pathlib
+import datetime
+import threading
+import unicodedata
+import contextlib
+import contextvars
+
+from bib_parser import iter_entries
+from latex_model import latex_writer
+
+# ---------------------------------------------------------------------------
+# Pfad-Konfiguration
+# ---------------------------------------------------------------------------
+BASE_DIR = pathlib.Path(__file__).parent.resolve()
+# LQM_SETTINGS_FILE: andere Einstellungsdatei (z.B. für Build-Skripte, lqm_cli.py --settings)
+SETTINGS_FILE = pathlib.Path(os.environ.get("LQM_SETTINGS_FILE") or BASE_DIR / "bibtex_generator_settings.json")
+# LQM_CACHE_DIR: anderes Cache-Verzeichnis (Index, Prüfergebnisse, …)
+CACHE_DIR = pathlib.Path(os.environ.get("LQM_CACHE_DIR") or BASE_DIR / ".lqm_cache")
+
+
+# ---------------------------------------------------------------------------
+# Standard-Einstellungen
+# ---------------------------------------------------------------------------
+DEFAULT_SETTINGS = {
+    "target_directory": "",
+    "latex_main_path": "",
+    "last_entry_type": "online",
+    "add_date_comment": True,
+    "aggregate_sections": False,
+    "auto_open_browser": True,
+    "port": 5000,
+    "bib_placement_sections": [
+        {"id": "s1", "label": "Bücher", "search_text": "% Bücher", "active": False},
+        {"id": "s2", "label": "Online-Quellen", "search_text": "% Online-Quellen", "active": False},
+        {"id": "s3", "label": "Artikel & Zeitschriften", "search_text": "% Artikel", "active": False},
+        {"id": "s4", "label": "Berichte & Normen", "search_text": "% Berichte", "active": False},
+        {"id": "s5", "label": "Sonstiges", "search_text": "% Sonstiges", "active": False},
+    ],
+    "default_section_id": "",
+    "addbibresource_placement": {
+        "enabled": False,
+        "search_text": "% Literaturverzeichnis",
+        "after_last_existing": True,
+    },
+    # Projektprofile (Name -> Werte der PROJECT_KEYS); leer = ein Projekt wie bisher
+    "projects": {},
+    "active_project": "",
+    # Speicherbudget für gleichzeitig geladene Projekt-Indizes (MB)
+    "project_memory_budget_mb": 256,
+    # Backends für DOI/ISBN-Abfragen (Name -> Basis-URL, Reihenfolge = Priorität)
+    "resolver_backends": {
+        "crossref": "https://api.crossref.org",
+        "openlibrary": "https://openlibrary.org",
+    },
+}
+
+# ---------------------------------------------------------------------------
+# Alle BibTeX-Eintragstypen (Deutsch) mit ihren Feldern
+# ---------------------------------------------------------------------------
+ENTRY_TYPES = {
+    "online": {
+        "label": "Online-Quelle / Website",
+        "icon": "bi-globe",
+        "fields": [
+            {"key": "author",       "label": "Autor(en)",              "required": True,  "placeholder": "Nachname, Vorname and Nachname2, Vorname2"},
+            {"key": "title",        "label": "Titel",                  "required": True,  "placeholder": "Titel der Webseite"},
+            {"key": "url",          "label": "URL",                    "required": True,  "placeholder": "https://..."},
+            {"key": "urldate",      "label": "Abrufdatum",             "required": True,  "placeholder": "JJJJ-MM-TT", "type": "date"},
+            {"key": "date",         "label": "Veröffentlichungsdatum", "required": False, "placeholder": "JJJJ oder JJJJ-MM-TT", "type": "date"},
+            {"key": "organization", "label": "Organisation / Betreiber","required": False, "placeholder": "Name der Organisation"},
+            {"key": "subtitle",     "label": "Untertitel",             "required": False, "placeholder": "Optionaler Untertitel"},
+            {"key": "note",         "label": "Anmerkung",              "required": False, "placeholder": "Zusätzliche Hinweise"},
+        ]
+    },
+    "book": {
+        "label": "Buch (Monographie)",
+        "icon": "bi-book",
+        "fields": [
+            {"key": "author",    "label": "Autor(en)",          "required": True,  "placeholder": "Nachname, Vorname"},
+            {"key": "title",     "label": "Titel",              "required": True,  "placeholder": "Buchtitel"},
+            {"key": "publisher", "label": "Verlag",             "required": True,  "placeholder": "Verlagsname"},
+            {"key": "date",      "label": "Erscheinungsjahr",   "required": True,  "placeholder": "JJJJ", "type": "year"},
+            {"key": "location",  "label": "Erscheinungsort",    "required": False, "placeholder": "Stadt"},
+            {"key": "edition",   "label": "Auflage",            "required": False, "placeholder": "z.B. 3 oder Dritte"},
+            {"key": "isbn",      "label": "ISBN",               "required": False, "placeholder": "978-3-..."},
+            {"key": "series",    "label": "Schriftenreihe",     "required": False, "placeholder": "Name der Reihe"},
+            {"key": "volume",    "label": "Band",               "required": False, "placeholder": "Bandnummer"},
+            {"key": "subtitle",  "label": "Untertitel",         "required": False, "placeholder": "Optionaler Untertitel"},
+            {"key": "editor",    "label": "Herausgeber",        "required": False, "placeholder": "Nur wenn kein Autor"},
+            {"key": "note",      "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
+        ]
+    },
+    "article": {
+        "label": "Zeitschriftenartikel",
+        "icon": "bi-journal-text",
+        "fields": [
+            {"key": "author",   "label": "Autor(en)",          "required": True,  "placeholder": "Nachname, Vorname"},
+            {"key": "title",    "label": "Titel des Artikels", "required": True,  "placeholder": "Artikeltitel"},
+            {"key": "journal",  "label": "Zeitschrift",        "required": True,  "placeholder": "Name der Zeitschrift"},
+            {"key": "date",     "label": "Erscheinungsjahr",   "required": True,  "placeholder": "JJJJ", "type": "year"},
+            {"key": "volume",   "label": "Jahrgang / Band",    "required": False, "placeholder": "z.B. 42"},
+            {"key": "number",   "label": "Heft / Ausgabe",     "required": False, "placeholder": "z.B. 3"},
+            {"key": "pages",    "label": "Seiten",             "required": False, "placeholder": "z.B. 123--145"},
+            {"key": "doi",      "label": "DOI",                "required": False, "placeholder": "10.xxxx/xxxxx"},
+            {"key": "issn",     "label": "ISSN",               "required": False, "placeholder": "XXXX-XXXX"},
+            {"key": "url",      "label": "URL",                "required": False, "placeholder": "https://..."},
+            {"key": "subtitle", "label": "Untertitel",         "required": False, "placeholder": "Optionaler Untertitel"},
+            {"key": "note",     "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
+        ]
+    },
+    "inbook": {
+        "label": "Buchkapitel",
+        "icon": "bi-bookmark",
+        "fields": [
+            {"key": "author",    "label": "Autor(en)",          "required": True,  "placeholder": "Nachname, Vorname"},
+            {"key": "title",     "label": "Titel des Kapitels", "required": True,  "placeholder": "Kapiteltitel"},
+            {"key": "booktitle", "label": "Buchtitel",          "required": True,  "placeholder": "Titel des Gesamtwerks"},
+            {"key": "publisher", "label": "Verlag",             "required": True,  "placeholder": "Verlagsname"},
+            {"key": "date",      "label": "Erscheinungsjahr",   "required": True,  "placeholder": "JJJJ", "type": "year"},
+            {"key": "pages",     "label": "Seiten",             "required": False, "placeholder": "z.B. 123--145"},
+            {"key": "chapter",   "label": "Kapitel-Nr.",        "required": False, "placeholder": "z.B. 5"},
+            {"key": "editor",    "label": "Herausgeber",        "required": False, "placeholder": "Nachname, Vorname"},
+            {"key": "location",  "label": "Erscheinungsort",    "required": False, "placeholder": "Stadt"},
+            {"key": "edition",   "label": "Auflage",            "required": False, "placeholder": "z.B. 2"},
+            {"key": "isbn",      "label": "ISBN",               "required": False, "placeholder": "978-3-..."},
+            {"key": "note",      "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
+        ]
+    },
+    "incollection": {
+        "label": "Beitrag in Sammelwerk",
+        "icon": "bi-collection",
+        "fields": [
+            {"key": "author",    "label": "Autor(en)",          "required": True,  "placeholder": "Nachname, Vorname"},
+            {"key": "title",     "label": "Titel des Beitrags","required": True,  "placeholder": "Beitragstitel"},
+            {"key": "booktitle", "label": "Titel des Sammelwerks","required": True,"placeholder": "Sammelwerkstitel"},
+            {"key": "editor",    "label": "Herausgeber",        "required": True,  "placeholder": "Nachname, Vorname"},
+            {"key": "publisher", "label": "Verlag",             "required": True,  "placeholder": "Verlagsname"},
+            {"key": "date",      "label": "Erscheinungsjahr",   "required": True,  "placeholder": "JJJJ", "type": "year"},
+            {"key": "pages",     "label": "Seiten",             "required": False, "placeholder": "z.B. 45--67"},
+            {"key": "location",  "label": "Erscheinungsort",    "required": False, "placeholder": "Stadt"},
+            {"key": "isbn",      "label": "ISBN",               "required": False, "placeholder": "978-3-..."},
+            {"key": "note",      "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
+        ]
+    },
+    "inproceedings": {
+        "label": "Konferenzbeitrag",
+        "icon": "bi-people",
+        "fields": [
+            {"key": "author",       "label": "Autor(en)",           "required": True,  "placeholder": "Nachname, Vorname"},
+            {"key": "title",        "label": "Titel des Beitrags",  "required": True,  "placeholder": "Vortragstitel"},
+            {"key": "booktitle",    "label": "Name der Konferenz",  "required": True,  "placeholder": "Proceedings of ..."},
+            {"key": "date",         "label": "Jahr",                "required": True,  "placeholder": "JJJJ", "type": "year"},
+            {"key": "pages",        "label": "Seiten",              "required": False, "placeholder": "z.B. 10--18"},
+            {"key": "editor",       "label": "Herausgeber",         "required": False, "placeholder": "Nachname, Vorname"},
+            {"key": "publisher",    "label": "Verlag",              "required": False, "placeholder": "Verlagsname"},
+            {"key": "location",     "label": "Veranstaltungsort",   "required": False, "placeholder": "Stadt, Land"},
+            {"key": "organization", "label": "Veranstalter",        "required": False, "placeholder": "Name der Organisation"},
+            {"key": "doi",          "label": "DOI",                 "required": False, "placeholder": "10.xxxx/xxxxx"},
+            {"key": "isbn",         "label": "ISBN",                "required": False, "placeholder": "978-3-..."},
+            {"key": "note",         "label": "Anmerkung",           "required": False, "placeholder": "Zusätzliche Hinweise"},
+        ]
+    },
+    "proceedings": {
+        "label": "Konferenzband",
+        "icon": "bi-journals",
+        "fields": [
+            {"key": "title",        "label": "Titel des Tagungsbands","required": True,  "placeholder": "Proceedings of ..."},
+            {"key": "editor",       "label": "Herausgeber",           "required": True,  "placeholder": "Nachname, Vorname"},
+            {"key": "date",         "label": "Jahr",                  "required": True,  "placeholder": "JJJJ", "type": "year"},
+            {"key": "publisher",    "label": "Verlag",                "required": False, "placeholder": "Verlagsname"},
+            {"key": "location",     "label": "Erscheinungsort",       "required": False, "placeholder": "Stadt"},
+            {"key": "organization", "label": "Veranstalter",          "required": False, "placeholder": "Name der Organisation"},
+            {"key": "isbn",         "label": "ISBN",                  "required": False, "placeholder": "978-3-..."},
+            {"key": "note",         "label": "Anmerkung",             "required": False, "placeholder": "Zusätzliche Hinweise"},
+        ]
+    },
+    "techreport": {
+        "label": "Technischer Bericht",
+        "icon": "bi-file-earmark-text",
+        "fields": [
+            {"key": "author",      "label": "Autor(en)",          "required": True,  "placeholder": "Nachname, Vorname"},
+            {"key": "title",       "label": "Titel",              "required": True,  "placeholder": "Berichtstitel"},
+            {"key": "institution", "label": "Institution",        "required": True,  "placeholder": "Name der Institution"},
+            {"key": "date",        "label": "Jahr",               "required": True,  "placeholder": "JJJJ", "type": "year"},
+            {"key": "type",        "label": "Berichtstyp",        "required": False, "placeholder": "z.B. Technical Report"},
+            {"key": "number",      "label": "Berichtsnummer",     "required": False, "placeholder": "z.B. TR-2024-001"},
+            {"key": "location",    "label": "Ort",                "required": False, "placeholder": "Stadt"},
+            {"key": "url",         "label": "URL",                "required": False, "placeholder": "https://..."},
+            {"key": "note",        "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
+        ]
+    },
+    "report": {
+        "label": "Bericht / Forschungsbericht",
+        "icon": "bi-clipboard-data",
+        "fields": [
+            {"key": "author",      "label": "Autor(en)",          "required": True,  "placeholder": "Nachname, Vorname"},
+            {"key": "title",       "label": "Titel",              "required": True,  "placeholder": "Berichtstitel"},
+            {"key": "institution", "label": "Institution",        "required": True,  "placeholder": "Name der Institution"},
+            {"key": "date",        "label": "Jahr",               "required": True,  "placeholder": "JJJJ", "type": "year"},
+            {"key": "type",        "label": "Berichtsart",        "required": False, "placeholder": "z.B. Forschungsbericht"},
+            {"key": "number",      "label": "Berichtsnummer",     "required": False, "placeholder": "z.B. 2024/01"},
+            {"key": "location",    "label": "Ort",                "required": False, "placeholder": "Stadt"},
+            {"key": "url",         "label": "URL",                "required": False, "placeholder": "https://..."},
+            {"key": "note",        "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
+        ]
+    },
+    "mastersthesis": {
+        "label": "Masterarbeit",
+        "icon": "bi-mortarboard",
+        "fields": [
+            {"key": "author",      "label": "Autor",              "required": True,  "placeholder": "Nachname, Vorname"},
+            {"key": "title",       "label": "Titel",              "required": True,  "placeholder": "Titel der Masterarbeit"},
+            {"key": "institution", "label": "Hochschule",         "required": True,  "placeholder": "Name der Hochschule"},
+            {"key": "date",        "label": "Jahr",               "required": True,  "placeholder": "JJJJ", "type": "year"},
+            {"key": "location",    "label": "Ort",                "required": False, "placeholder": "Ort der Hochschule"},
+            {"key": "type",        "label": "Typ",                "required": False, "placeholder": "Masterarbeit"},
+            {"key": "url",         "label": "URL",                "required": False, "placeholder": "https://..."},
+            {"key": "note",        "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
+        ]
+    },
+    "phdthesis": {
+        "label": "Dissertation / Doktorarbeit",
+        "icon": "bi-award",
+        "fields": [
+            {"key": "author",      "label": "Autor",              "required": True,  "placeholder": "Nachname, Vorname"},
+            {"key": "title",       "label": "Titel",              "required": True,  "placeholder": "Titel der Dissertation"},
+            {"key": "institution", "label": "Universität",        "required": True,  "placeholder": "Name der Universität"},
+            {"key": "date",        "label": "Jahr",               "required": True,  "placeholder": "JJJJ", "type": "year"},
+            {"key": "location",    "label": "Ort",                "required": False, "placeholder": "Ort der Universität"},
+            {"key": "url",         "label": "URL",                "required": False, "placeholder": "https://..."},
+            {"key": "doi",         "label": "DOI",                "required": False, "placeholder": "10.xxxx/xxxxx"},
+            {"key": "note",        "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
+        ]
+    },
+    "thesis": {
+        "label": "Abschlussarbeit (allgemein)",
+        "icon": "bi-file-earmark-ruled",
+        "fields": [
+            {"key": "author",      "label": "Autor",              "required": True,  "placeholder": "Nachname, Vorname"},
+            {"key": "title",       "label": "Titel",              "required": True,  "placeholder": "Titel der Arbeit"},
+            {"key": "institution", "label": "Hochschule",         "required": True,  "placeholder": "Name der Hochschule"},
+            {"key": "date",        "label": "Jahr",               "required": True,  "placeholder": "JJJJ", "type": "year"},
+            {"key": "type",        "label": "Typ der Arbeit",     "required": True,  "placeholder": "z.B. Bachelorarbeit, Seminararbeit"},
+            {"key": "location",    "label": "Ort",                "required": False, "placeholder": "Ort der Hochschule"},
+            {"key": "url",         "label": "URL",                "required": False, "placeholder": "https://..."},
+            {"key": "note",        "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
+        ]
+    },
+    "manual": {
+        "label": "Handbuch / Dokumentation",
+        "icon": "bi-tools",
+        "fields": [
+            {"key": "title",        "label": "Titel",              "required": True,  "placeholder": "Name des Handbuchs"},
+            {"key": "author",       "label": "Autor(en)",          "required": False, "placeholder": "Nachname, Vorname (optional)"},
+            {"key": "organization", "label": "Organisation",       "required": False, "placeholder": "Hersteller / Verlag"},
+            {"key": "date",         "label": "Jahr",               "required": False, "placeholder": "JJJJ", "type": "year"},
+            {"key": "edition",      "label": "Version / Auflage",  "required": False, "placeholder": "z.B. 2.1"},
+            {"key": "location",     "label": "Ort",                "required": False, "placeholder": "Stadt"},
+            {"key": "url",          "label": "URL",                "required": False, "placeholder": "https://..."},
+            {"key": "note",         "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
+        ]
+    },
+    "standard": {
+        "label": "Norm / Standard",
+        "icon": "bi-patch-check",
+        "fields": [
+            {"key": "title",        "label": "Bezeichnung / Titel","required": True,  "placeholder": "z.B. DIN EN ISO 9001:2015"},
+            {"key": "number",       "label": "Norm-Nummer",        "required": True,  "placeholder": "z.B. DIN EN ISO 9001"},
+            {"key": "organization", "label": "Normungsgremium",    "required": True,  "placeholder": "z.B. DIN, ISO, IEEE"},
+            {"key": "date",         "label": "Jahr",               "required": True,  "placeholder": "JJJJ", "type": "year"},
+            {"key": "type",         "label": "Typ",                "required": False, "placeholder": "z.B. Norm, Richtlinie"},
+            {"key": "location",     "label": "Erscheinungsort",    "required": False, "placeholder": "z.B. Berlin"},
+            {"key": "url",          "label": "URL",                "required": False, "placeholder": "https://..."},
+            {"key": "note",         "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
+        ]
+    },
+    "patent": {
+        "label": "Patent",
+        "icon": "bi-lightbulb",
+        "fields": [
+            {"key": "author",    "label": "Erfinder",           "required": True,  "placeholder": "Nachname, Vorname"},
+            {"key": "title",     "label": "Titel der Erfindung","required": True,  "placeholder": "Patentbezeichnung"},
+            {"key": "number",    "label": "Patentnummer",       "required": True,  "placeholder": "z.B. EP1234567"},
+            {"key": "date",      "label": "Anmeldedatum",       "required": True,  "placeholder": "JJJJ-MM-TT", "type": "date"},
+            {"key": "location",  "label": "Land",               "required": False, "placeholder": "z.B. Deutschland"},
+            {"key": "holder",    "label": "Patentinhaber",      "required": False, "placeholder": "Firma / Person"},
+            {"key": "url",       "label": "URL",                "required": False, "placeholder": "https://..."},
+            {"key": "note",      "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
+        ]
+    },
+    "dataset": {
+        "label": "Datensatz / Datenbank",
+        "icon": "bi-database",
+        "fields": [
+            {"key": "author",      "label": "Autor(en) / Ersteller","required": True,  "placeholder": "Nachname, Vorname"},
+            {"key": "title",       "label": "Titel des Datensatzes","required": True,  "placeholder": "Datensatzbezeichnung"},
+            {"key": "date",        "label": "Erscheinungsjahr",     "required": True,  "placeholder": "JJJJ", "type": "year"},
+            {"key": "institution", "label": "Herausgebende Stelle", "required": False, "placeholder": "Organisation / Institut"},
+            {"key": "url",         "label": "URL / DOI-Link",       "required": False, "placeholder": "https://..."},
+            {"key": "doi",         "label": "DOI",                  "required": False, "placeholder": "10.xxxx/xxxxx"},
+            {"key": "version",     "label": "Version",              "required": False, "placeholder": "z.B. 1.2"},
+            {"key": "note",        "label": "Anmerkung",            "required": False, "placeholder": "Zusätzliche Hinweise"},
+        ]
+    },
+    "software": {
+        "label": "Software / Programm",
+        "icon": "bi-code-square",
+        "fields": [
+            {"key": "author",       "label": "Entwickler / Autor",  "required": True,  "placeholder": "Nachname, Vorname oder Org."},
+            {"key": "title",        "label": "Programmname",        "required": True,  "placeholder": "Name der Software"},
+            {"key": "date",         "label": "Jahr",                "required": True,  "placeholder": "JJJJ", "type": "year"},
+            {"key": "version",      "label": "Version",             "required": False, "placeholder": "z.B. 3.4.1"},
+            {"key": "organization", "label": "Unternehmen",         "required": False, "placeholder": "Herstellerfirma"},
+            {"key": "url",          "label": "URL",                 "required": False, "placeholder": "https://..."},
+            {"key": "howpublished", "label": "Vertrieb",            "required": False, "placeholder": "z.B. Open Source, Commercial"},
+            {"key": "note",         "label": "Anmerkung",           "required": False, "placeholder": "Lizenz etc."},
+        ]
+    },
+    "misc": {
+        "label": "Sonstiges",
+        "icon": "bi-three-dots",
+        "fields": [
+            {"key": "author",       "label": "Autor(en)",          "required": False, "placeholder": "Nachname, Vorname"},
+            {"key": "title",        "label": "Titel",              "required": True,  "placeholder": "Bezeichnung"},
+            {"key": "date",         "label": "Jahr",               "required": False, "placeholder": "JJJJ", "type": "year"},
+            {"key": "howpublished", "label": "Veröffentlichungsart","required": False, "placeholder": "z.B. Broschüre, Poster"},
+            {"key": "organization", "label": "Organisation",       "required": False, "placeholder": "Name der Organisation"},
+            {"key": "url",          "label": "URL",                "required": False, "placeholder": "https://..."},
+            {"key": "note",         "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
+        ]
+    },
+    "unpublished": {
+        "label": "Unveröffentlichtes Werk",
+        "icon": "bi-file-lock",
+        "fields": [
+            {"key": "author",  "label": "Autor(en)",   "required": True,  "placeholder": "Nachname, Vorname"},
+            {"key": "title",   "label": "Titel",       "required": True,  "placeholder": "Titel des Werks"},
+            {"key": "note",    "label": "Anmerkung",   "required": True,  "placeholder": "Pflichtfeld: Erläuterung (z.B. eingereicht bei ...)"},
+            {"key": "date",    "label": "Jahr",        "required": False, "placeholder": "JJJJ", "type": "year"},
+            {"key": "url",     "label": "URL",         "required": False, "placeholder": "https://..."},
+        ]
+    },
+    "booklet": {
+        "label": "Broschüre / Flugblatt",
+        "icon": "bi-newspaper",
+        "fields": [
+            {"key": "title",        "label": "Titel",              "required": True,  "placeholder": "Titel der Broschüre"},
+            {"key": "author",       "label": "Autor(en)",          "required": False, "placeholder": "Nachname, Vorname"},
+            {"key": "howpublished", "label": "Veröffentlichungsart","required": False, "placeholder": "z.B. Flugblatt, Broschüre"},
+            {"key": "date",         "label": "Jahr",               "required": False, "placeholder": "JJJJ", "type": "year"},
+            {"key": "organization", "label": "Herausgeber",        "required": False, "placeholder": "Organisation"},
+            {"key": "location",     "label": "Ort",                "required": False, "placeholder": "Stadt"},
+            {"key": "note",         "label": "Anmerkung",          "required": False, "placeholder": "Zusätzliche Hinweise"},
+        ]
+    },
+    "periodical": {
+        "label": "Periodikum / Zeitschrift (gesamte Ausgabe)",
+        "icon": "bi-calendar3",
+        "fields": [
+            {"key": "title",   "label": "Titel der Zeitschrift", "required": True,  "placeholder": "Zeitschriftenname"},
+            {"key": "editor",  "label": "Herausgeber",           "required": False, "placeholder": "Nachname, Vorname"},
+            {"key": "date",    "label": "Jahr",                  "required": True,  "placeholder": "JJJJ", "type": "year"},
+            {"key": "volume",  "label": "Jahrgang",              "required": False, "placeholder": "z.B. 12"},
+            {"key": "number",  "label": "Ausgabe",               "required": False, "placeholder": "z.B. 4"},
+            {"key": "issn",    "label": "ISSN",                  "required": False, "placeholder": "XXXX-XXXX"},
+            {"key": "note",    "label": "Anmerkung",             "required": False, "placeholder": "Zusätzliche Hinweise"},
+        ]
+    },
+}
+
+# ---------------------------------------------------------------------------
+# Einstellungsverwaltung
+# ---------------------------------------------------------------------------
+# Verzögerung, mit der Änderungen gesammelt in die Einstellungsdatei geschrieben werden (Sekunden)
+SETTINGS_FLUSH_DELAY = 0.5
+
+# Höchstens so oft wird die Datei auf externe Änderungen geprüft (Sekunden)
+SETTINGS_CHECK_INTERVAL = 1.0
+
+# Einstellungen, die je Projekt gelten (in settings["projects"][name]); fehlt
+# ein Wert im Profil (ältere Profile), gilt der allgemeine
+PROJECT_KEYS = ("target_directory", "latex_main_path", "bib_placement_sections",
+                "default_section_id", "addbibresource_placement", "aggregate_sections")
+
+_PROJECT_NAME = re.compile(r"^[\w][\w .-]{0,63}$")
+
+# Projekt der laufenden Anfrage ("" = aktives Projekt laut Einstellungen)
+current_project = contextvars.ContextVar("lqm_project", default="")
+
+
+@contextlib.contextmanager
+def project_scope(name: str):
+    """Führt den Block mit den Einstellungen eines Projekts aus ("" = aktives Projekt)."""
+    token = current_project.set(name)
+    try:
+        yield
+    finally:
+        current_project.reset(token)
+
+
+class SettingsManager:
+    """
+    Einstellungen im Speicher mit verzögertem, atomarem Schreiben: set() und
+    update() markieren nur als geändert, ein Timer schreibt kurz danach einmal
+    für alle Änderungen. Wird die Datei außerhalb der App geändert (mtime),
+    wird sie neu eingelesen.
+
+    Gibt es Projektprofile, lesen und schreiben get()/set() die PROJECT_KEYS
+    im Profil des aktuellen Projekts (current_project, sonst active_project).
+    """
+
+    def __init__(self, on_save=None):
+        self.on_save = on_save        # Aufruf nach jedem Schreibzugriff (z.B. Metrik)
+        self._lock = threading.RLock()
+        self._data = dict(DEFAULT_SETTINGS)
+        self._version = 0             # Änderungszähler (für ETags)
+        self._dirty = False
+        self._timer = None
+        self._stat = None             # (mtime, Größe) des zuletzt gelesenen/geschriebenen Stands
+        self._checked = 0.0
+        self._load()
+
+    def _file_stat(self):
+        try:
+            st = os.stat(SETTINGS_FILE)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self):
+        if SETTINGS_FILE.exists():
+            try:
+                with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+                # Deep merge: top level only für einfache Werte, sections ersetzen
+                data = dict(DEFAULT_SETTINGS)
+                for k, v in stored.items():
+                    data[k] = v
+                self._data = data
+            except Exception:
+                pass
+        self._stat = self._file_stat()
+
+    def _check_external(self):
+        """Liest die Datei neu ein, wenn sie außerhalb der App geändert wurde."""
+        now = time.monotonic()
+        if now - self._checked < SETTINGS_CHECK_INTERVAL:
+            return
+        self._checked = now
+        stat = self._file_stat()
+        # Ausstehende eigene Änderungen haben Vorrang
+        if stat != self._stat and stat is not None and not self._dirty:
+            self._load()
+            self._version += 1
+
+    @property
+    def version(self) -> int:
+        with self._lock:
+            self._check_external()
+            return self._version
+
+    def save(self):
+        """Schreibt sofort (atomar über eine temporäre Datei)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            tmp = SETTINGS_FILE.with_name(SETTINGS_FILE.name + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, SETTINGS_FILE)
+            self._stat = self._file_stat()
+            self._dirty = False
+        if self.on_save is not None:
+            self.on_save()
+
+    def flush(self):
+        """Schreibt ausstehende Änderungen (Timer, Beenden)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self.save()
+            except OSError as e:
+                print(f"  Warnung: Einstellungen konnten nicht gespeichert werden: {e}")
+
+    def _changed(self):
+        self._version += 1
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(SETTINGS_FLUSH_DELAY, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _profile(self):
+        """Profil des aktuellen Projekts (None = keine Profile bzw. unbekannt)."""
+        projects = self._data.get("projects") or {}
+        return projects.get(current_project.get() or self._data.get("active_project", ""))
+
+    def project_name(self) -> str:
+        """Name des aktuellen Projekts ("" = Einstellungen ohne Profil)."""
+        with self._lock:
+            name = current_project.get() or self._data.get("active_project", "")
+            return name if name in (self._data.get("projects") or {}) else ""
+
+    def get(self, key, default=None):
+        with self._lock:
+            self._check_external()
+            profile = self._profile() if key in PROJECT_KEYS else None
+            if profile is not None and key in profile:
+                return profile[key]
+            return self._data.get(key, default)
+
+    def set(self, key, value):
+        self.update({key: value})
+
+    def all(self):
+        with self._lock:
+            self._check_external()
+            data = dict(self._data)
+            profile = self._profile()
+            if profile is not None:
+                data.update((k, profile[k]) for k in PROJECT_KEYS if k in profile)
+            data["project"] = self.project_name()
+            return data
+
+    def update(self, data: dict):
+        with self._lock:
+            profile = self._profile()
+            for key, value in data.items():
+                if key in ("projects", "project"):
+                    continue
+                if profile is not None and key in PROJECT_KEYS:
+                    profile[key] = value
+                else:
+                    self._data[key] = value
+            self._changed()
+
+    # ------------------------------------------------------------------
+    # Projektprofile
+    # ------------------------------------------------------------------
+    def projects(self) -> dict:
+        with self._lock:
+            self._check_external()
+            return json.loads(json.dumps(self._data.get("projects") or {}))
+
+    def save_project(self, name: str, values: dict, copy_current: bool = True) -> dict:
+        """
+        Legt ein Projekt an oder ändert es. Neue Projekte übernehmen die Werte
+        des aktuellen Projekts (copy_current) oder die Standardwerte.
+        """
+        if not _PROJECT_NAME.match(name or ""):
+            raise ValueError("Ungültiger Projektname (Buchstaben, Ziffern, Leerzeichen, . _ -).")
+        with self._lock:
+            # Kopie: der Standardwert ist ein geteiltes dict
+            projects = self._data["projects"] = dict(self._data.get("projects") or {})
+            profile = projects.get(name)
+            if profile is None:
+                source = self.all() if copy_current else DEFAULT_SETTINGS
+                profile = json.loads(json.dumps({k: source[k] for k in PROJECT_KEYS}))
+                projects[name] = profile
+            profile.update((k, v) for k, v in values.items() if k in PROJECT_KEYS)
+            self._changed()
+            return dict(profile)
+
+    def remove_project(self, name: str) -> bool:
+        with self._lock:
+            projects = self._data.get("projects") or {}
+            if name not in projects:
+                return False
+            del projects[name]
+            if self._data.get("active_project") == name:
+                self._data["active_project"] = next(iter(projects), "")
+            self._changed()
+            return True
+
+    def activate_project(self, name: str):
+        with self._lock:
+            if name and name not in (self._data.get("projects") or {}):
+                raise KeyError(name)
+            self._data["active_project"] = name
+            self._changed()
+
+
+settings = SettingsManager()
+
+
+# ---------------------------------------------------------------------------
+# Hilfsfunktionen
+# ---------------------------------------------------------------------------
+def normalize_string(text: str) -> str:
+    """Normalisiert Text für Dateinamen & Zitierschlüssel."""
+    text = text.replace("ä", "ae").replace("ö", "oe").replace("ü", "ue") \
+               .replace("Ä", "Ae").replace("Ö", "Oe").replace("Ü", "Ue").replace("ß", "ss")
+    nfkd = unicodedata.normalize("NFD", text)
+    return "".join(c for c in nfkd if not unicodedata.combining(c))
+
+
+def generate_cite_key(title: str, author: str = "", year: str = "") -> str:
+    """Erzeugt einen BibTeX-Zitierschlüssel."""
+    if not title and not author:
+        return "quelle_" + datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+
+    base = normalize_string(title or author)
+    key = re.sub(r"[^a-zA-Z0-9_]", "", base.replace(" ", "_"))
+    key = re.sub(r"_+", "_", key).strip("_").lower()
+
+    if year:
+        yr = re.sub(r"[^0-9]", "", year)[:4]
+        if yr:
+            key = f"{key}_{yr}"
+
+    return key[:60] if len(key) > 60 else key
+
+
+def generate_filename(cite_key: str) -> str:
+    """Erzeugt einen sauberen Dateinamen aus dem Zitierschlüssel."""
+    return re.sub(r"[^a-zA-Z0-9_\-]", "", cite_key) + ".bib"
+
+
+def generate_bibtex(entry_type: str, fields: dict, cite_key: str) -> str:
+    """Baut den vollständigen BibTeX-Eintrag als String zusammen."""
+    lines = [f"@{entry_type}{{{cite_key},"]
+    for k, v in fields.items():
+        v = v.strip()
+        if v:
+            escaped = v.replace("{", "\\{").replace("}", "\\}")
+            lines.append(f"  {k:<14} = {{{escaped}}},")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def entry_comment(section_id: str = "", prefix: str = "Hinzugefügt am") -> str:
+    """Datumskommentar (falls aktiviert) samt Abschnittskommentar für neue .bib-Dateien."""
+    if not settings.get("add_date_comment", True):
+        return ""
+    now_str = datetime.datetime.now().strftime("%d.%m.%Y %H:%M")
+    comment = f"% {prefix}: {now_str}\n"
+
+    # Abschnittskommentar
+    if section_id:
+        sections = settings.get("bib_placement_sections", [])
+        sec = next((s for s in sections if s["id"] == section_id), None)
+        if sec:
+            comment += f"% Abschnitt: {sec['label']}\n"
+    return comment
+
+
+# ---------------------------------------------------------------------------
+# BibTeX-Parser (für Bibliotheks-Ansicht, siehe bib_parser.py)
+# ---------------------------------------------------------------------------
+def parse_bib_entry(content: str) -> dict:
+    """
+    Parsed den ersten @type{key,...} Block aus einem BibTeX-String.
+    "keys" enthält die Schlüssel aller Einträge der Datei.
+    """
+    entry = {"type": "", "key": "", "title": "", "author": "", "year": "",
+             "publisher": "", "isbn": "", "url": "", "doi": "", "journal": "", "fields": {},
+             "keys": []}
+    first = None
+    for e in iter_entries(content):
+        if first is None:
+            first = e
+        if e.key:
+            entry["keys"].append(e.key)
+    if first is not None:
+        entry["type"]   = first.entry_type
+        entry["key"]    = first.key
+        entry["fields"] = first.fields
+        for k, v in first.fields.items():
+            if k in ("title", "author", "date", "year", "publisher", "isbn", "url", "doi", "journal"):
+                entry[k] = v
+
+    # Jahr aus date extrahieren wenn nötig
+    if not entry["year"] and entry.get("date"):
+        yr = re.match(r"(\d{4})", entry["date"])
+        if yr:
+            entry["year"] = yr.group(1)
+
+    return entry
+
+
+# ---------------------------------------------------------------------------
+# Bibliotheks-Index
+# ---------------------------------------------------------------------------
+def index_file_for(target_dir: pathlib.Path) -> pathlib.Path:
+    """Cache-Datei des Index eines Zielverzeichnisses (geteilt von Server und CLI)."""
+    digest = hashlib.sha1(str(target_dir).encode("utf-8")).hexdigest()[:12]
+    return CACHE_DIR / f"library_{digest}.json"
+
+
+def lint_cache_file_for(target_dir: pathlib.Path) -> pathlib.Path:
+    """Cache-Datei der Prüfergebnisse eines Zielverzeichnisses (geteilt von Server und CLI)."""
+    digest = hashlib.sha1(str(target_dir).encode("utf-8")).hexdigest()[:12]
+    return CACHE_DIR / f"lint_{digest}.json"
+
+
+# ---------------------------------------------------------------------------
+# Export als eine .bib-Datei
+# ---------------------------------------------------------------------------
+EXPORT_DEDUP = ("", "keys", "sources")
+
+
+def iter_export(records, dedup: str = "", skip_paths=frozenset()):
+    """
+    Liefert die Einträge der Dateien in records nacheinander als Text.
+    dedup="keys": jeder Zitierschlüssel nur einmal; skip_paths: ganze Dateien
+    auslassen (Dubletten). Es wird immer nur eine Datei gleichzeitig gelesen.
+    """
+    from bib_import import entry_source
+    seen = set()
+    for rec in records:
+        if rec.path in skip_paths:
+            continue
+        if not dedup:
+            try:
+                with open(rec.path, "r", encoding="utf-8", errors="replace") as f:
+                    text = f.read()
+            except OSError:
+                continue
+            yield text.rstrip() + "\n\n"
+            continue
+        try:
+            entries = list(iter_entries(pathlib.Path(rec.path), keep_raw=True))
+        except OSError:
+            continue
+        for entry in entries:
+            cf = entry.key.casefold()
+            if cf in seen:
+                continue
+            seen.add(cf)
+            yield entry_source(entry) + "\n\n"
+
+
+# ---------------------------------------------------------------------------
+# Sammeldateien je Abschnitt
+# ---------------------------------------------------------------------------
+# Unterverzeichnis des Zielverzeichnisses (außerhalb von Index und Watcher)
+AGGREGATE_DIR = "_abschnitte"
+
+
+def section_labels() -> dict:
+    return {s["id"]: s.get("label", "") for s in settings.get("bib_placement_sections", [])}
+
+
+# ---------------------------------------------------------------------------
+# LaTeX-Datei-Integration
+# ---------------------------------------------------------------------------
+def remove_from_latex_main(bib_filename: str, latex_path: pathlib.Path) -> tuple:
+    """
+    Entfernt die \\addbibresource{...filename.bib}-Zeile sauber aus der .tex-Datei.
+    Gibt (True, None) bei Erfolg oder (False, Fehlermeldung) zurück.
+    """
+    def remove(model):
+        # Zeilen, die \addbibresource UND den Dateinamen enthalten
+        spans = model.resource_lines_containing(bib_filename)
+        if not spans:
+            return False, f"'{bib_filename}' nicht in LaTeX-Datei gefunden."
+
+        # Leerzeilen an der Schnittstelle → maximal 1 Leerzeile
+        edits, removed = model.removal_edits(spans)
+        model.apply(edits, removed=removed)
+        return True, None
+
+    try:
+        return latex_writer(latex_path).run(remove)
+    except Exception as e:
+        return False, str(e)
+
+
+def bib_rel_path(bib_filepath: pathlib.Path, latex_path: pathlib.Path) -> str:
+    """Pfad der .bib-Datei relativ zur LaTeX-Datei (falls möglich)."""
+    try:
+        rel = bib_filepath.relative_to(latex_path.parent)
+        return str(rel).replace("\\", "/")
+    except ValueError:
+        return str(bib_filepath).replace("\\", "/")
+
+
+def _section_search_text(section_id: str) -> str:
+    """Suchtext, hinter dem die \\addbibresource-Zeilen eines Abschnitts landen."""
+    if section_id:
+        sections = settings.get("bib_placement_sections", [])
+        sec = next((s for s in sections if s["id"] == section_id), None)
+        if sec and sec.get("search_text"):
+            return sec["search_text"]
+    placement_cfg = settings.get("addbibresource_placement", {})
+    if placement_cfg.get("enabled") and placement_cfg.get("search_text"):
+        return placement_cfg["search_text"]
+    return ""
+
+
+def _addbibresource_edits(model, groups: dict) -> list:
+    """
+    Edits, die je Abschnitt (section_id -> Zeilen) einen Block einfügen. Die
+    Einfügestellen kommen aus dem Modell der Hauptdatei (siehe latex_model.py).
+    """
+    placement_cfg = settings.get("addbibresource_placement", {})
+    content_len = len(model.content)
+
+    inserts = {}              # Position -> [Zeilen]
+    for section_id, lines in groups.items():
+        if not lines:
+            continue
+        search_text = _section_search_text(section_id)
+        # Nach dem Suchtext (und vorhandenen \addbibresource-Zeilen) einfügen
+        pos = model.position_after(search_text) if search_text else None
+        if pos is None and placement_cfg.get("after_last_existing", True):
+            if model.last_resource_end != -1:
+                # Nach dem letzten vorhandenen \addbibresource einfügen
+                pos = model.last_resource_end
+            elif model.begin_document != -1:
+                # Kein vorhandener Eintrag – ans Ende des Präambels
+                pos = model.begin_document
+        if pos is None or pos > content_len:
+            pos = -1
+        inserts.setdefault(pos, []).extend(lines)
+
+    edits = []
+    for pos, lines in inserts.items():
+        block = "\n".join(lines) + "\n"
+        if pos == -1:
+            # Ans Dateiende
+            edits.append((content_len, content_len, "\n" + block))
+        else:
+            edits.append((pos, pos, block))
+    return edits
+
+
+def update_latex_main(bib_filepath: pathlib.Path, latex_path: pathlib.Path, section_id: str = "") -> tuple:
+    """
+    Fügt \\addbibresource{...} in die LaTeX-Hauptdatei ein.
+    Gibt (True, None) bei Erfolg oder (False, Fehlermeldung) zurück.
+    """
+    added, error = update_latex_main_groups({section_id: [bib_filepath]}, latex_path)
+    if not added and not error:
+        rel_str = bib_rel_path(bib_filepath, latex_path)
+        return False, f"Eintrag '{rel_str}' ist bereits in der LaTeX-Datei vorhanden."
+    return bool(added), error
+
+
+def update_latex_main_groups(groups: dict, latex_path: pathlib.Path) -> tuple:
+    """
+    Fügt \\addbibresource-Zeilen für {section_id: [bib-Pfade]} mit einem einzigen
+    Schreibzugriff ein. Bereits vorhandene Zeilen werden übersprungen.
+    Gibt (Menge der eingefügten Pfade als str, Fehler|None) zurück.
+    """
+    def add(model):
+        added = set()
+        new_lines = set()
+        new_groups = {}
+        for section_id, paths in groups.items():
+            for path in paths:
+                line = f"\\addbibresource{{{bib_rel_path(pathlib.Path(path), latex_path)}}}"
+                # Duplikat-Check als Mengen-Lookup
+                if line not in new_lines and not model.has_resource(line):
+                    new_lines.add(line)
+                    added.add(str(path))
+                    new_groups.setdefault(section_id, []).append(line)
+        if new_groups:
+            model.apply(_addbibresource_edits(model, new_groups), added=new_lines)
+        return added, None
+
+    return latex_writer(latex_path).run(add)
+
+
+def update_latex_main_many(bib_filepaths: list, latex_path: pathlib.Path, section_id: str = "") -> tuple:
+    """
+    Fügt mehrere \\addbibresource-Zeilen mit einem einzigen Schreibzugriff ein.
+    Bereits vorhandene Zeilen werden übersprungen. Gibt (Anzahl eingefügt, Fehler|None) zurück.
+    """
+    added, error = update_latex_main_groups({section_id: list(bib_filepaths)}, latex_path)
+    return len(added), error
+
+
+def remove_resources(paths, latex_path: pathlib.Path) -> int:
+    """Entfernt die \\addbibresource-Zeilen der Dateien paths mit einem Schreibzugriff."""
+    lines = [f"\\addbibresource{{{bib_rel_path(pathlib.Path(path), latex_path)}}}" for path in paths]
+    return remove_resource_lines(lines, latex_path)
+
+
+def remove_resource_lines(lines, latex_path: pathlib.Path) -> int:
+    """Entfernt die angegebenen \\addbibresource{...}-Zeilen mit einem Schreibzugriff."""
+    def remove(model):
+        spans = []
+        for line in lines:
+            if model.has_resource(line):
+                spans.extend(model.resource_lines_containing(line))
+        if not spans:
+            return 0
+        edits, removed = model.removal_edits(spans)
+        model.apply(edits, removed=removed)
+        return len(spans)
+
+    return latex_writer(latex_path).run(remove)
@@ -0,0 +1,344 @@
+"""
+LaTeX Quellen Manager - Metriken & Request-Profiling
+
+WSGI-Middleware, die pro Route Latenz (Histogramm plus p50/p95/p99 über
+die letzten Anfragen), Anfragen je Statuscode, gelesene und geschriebene
+Bytes sowie geöffnete Dateien erfasst. Geöffnete Dateien werden über einen
+Audit-Hook ("open") dem Thread der laufenden Anfrage zugeordnet. Die
+Ausgabe erfolgt im Textformat von Prometheus.
+
+Optional schreibt SlowRequestProfiler für Anfragen über einem Schwellwert
+eine cProfile-Datei (auswertbar mit ``python -m pstats`` oder snakeviz).
+"""
+
+import os
+import re
+import sys
+import time
+import math
+import bisect
+import cProfile
+import threading
+from collections import deque
+
+# Obergrenzen der Histogramm-Buckets in Sekunden
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Anzahl der letzten Anfragen je Route für die Quantile
+QUANTILE_WINDOW = 1024
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Anzahl aufbewahrter Profil-Dateien
+PROFILE_KEEP = 50
+
+# Routen-Label für Anfragen ohne passende Route (begrenzt die Label-Anzahl)
+UNMATCHED = "<unmatched>"
+
+# environ-Schlüssel, unter dem die Anwendung die Route ablegt
+ROUTE_KEY = "lqm.route"
+
+_SSE_MIMETYPE = "text/event-stream"
+
+_request_local = threading.local()
+
+
+class RouteStats:
+    __slots__ = ("count", "sum", "buckets", "window", "statuses",
+                 "bytes_in", "bytes_out", "files_opened")
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.window = deque(maxlen=QUANTILE_WINDOW)
+        self.statuses = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.files_opened = 0
+
+
+class Metrics:
+    """Sammelt Messwerte je Route und einfache Zähler."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}             # Route -> RouteStats
+        self._counters = {}           # Name -> (Hilfetext, Wert)
+        self.started = time.time()
+
+    def observe(self, route: str, status: int, seconds, bytes_in: int, bytes_out: int, files: int):
+        """Erfasst eine Anfrage (seconds=None: Dauer nicht werten, z.B. SSE)."""
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = RouteStats()
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.bytes_in += bytes_in
+            stats.bytes_out += bytes_out
+            stats.files_opened += files
+            if seconds is not None:
+                stats.count += 1
+                stats.sum += seconds
+                stats.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+                stats.window.append(seconds)
+
+    def inc(self, name: str, value: float = 1, help_text: str = ""):
+        with self._lock:
+            old_help, old = self._counters.get(name, (help_text, 0))
+            self._counters[name] = (old_help or help_text, old + value)
+
+    def render(self) -> str:
+        """Alle Messwerte im Prometheus-Textformat (Version 0.0.4)."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            rows = [(route, list(st.buckets), st.count, st.sum, st.bytes_in, st.bytes_out,
+                     st.files_opened, sorted(st.window), dict(st.statuses))
+                    for route, st in sorted(self._routes.items())]
+
+        out = []
+        out += ["# HELP lqm_requests_total Anfragen je Route und Statuscode.",
+                "# TYPE lqm_requests_total counter"]
+        for route, _b, _c, _s, _bi, _bo, _f, _w, statuses in rows:
+            for status, n in sorted(statuses.items()):
+                out.append(f'lqm_requests_total{{route="{_label(route)}",status="{status}"}} {n}')
+
+        out += ["# HELP lqm_request_duration_seconds Bearbeitungsdauer je Route.",
+                "# TYPE lqm_request_duration_seconds histogram"]
+        for route, buckets, count, total, *_ in rows:
+            label = _label(route)
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS, buckets):
+                cumulative += n
+                out.append(f'lqm_request_duration_seconds_bucket{{route="{label}",le="{bound}"}} {cumulative}')
+            out.append(f'lqm_request_duration_seconds_bucket{{route="{label}",le="+Inf"}} {count}')
+            out.append(f'lqm_request_duration_seconds_sum{{route="{label}"}} {total:.6f}')
+            out.append(f'lqm_request_duration_seconds_count{{route="{label}"}} {count}')
+
+        out += [f"# HELP lqm_request_latency_seconds Quantile der letzten {QUANTILE_WINDOW} Anfragen je Route.",
+                "# TYPE lqm_request_latency_seconds summary"]
+        for route, _b, count, total, _bi, _bo, _f, window, _st in rows:
+            if not window:
+                continue
+            label = _label(route)
+            for q in QUANTILES:
+                out.append(f'lqm_request_latency_seconds{{route="{label}",quantile="{q}"}} {_quantile(window, q):.6f}')
+            out.append(f'lqm_request_latency_seconds_sum{{route="{label}"}} {total:.6f}')
+            out.append(f'lqm_request_latency_seconds_count{{route="{label}"}} {count}')
+
+        for name, index, help_text in (("lqm_request_bytes_total", 4, "Gelesene Bytes (Anfrage-Body) je Route."),
+                                       ("lqm_response_bytes_total", 5, "Geschriebene Bytes (Antwort-Body) je Route."),
+                                       ("lqm_files_opened_total", 6, "Während der Anfrage geöffnete Dateien je Route.")):
+            out += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for row in rows:
+                out.append(f'{name}{{route="{_label(row[0])}"}} {row[index]}')
+
+        for name, (help_text, value) in counters:
+            out += [f"# HELP {name} {help_text or name}", f"# TYPE {name} counter", f"{name} {value:g}"]
+
+        out += ["# HELP lqm_uptime_seconds Laufzeit des Servers.", "# TYPE lqm_uptime_seconds gauge",
+                f"lqm_uptime_seconds {time.time() - self.started:.1f}"]
+        return "\n".join(out) + "\n"
+
+
+def _quantile(sorted_values: list, q: float) -> float:
+    """Quantil per Nearest-Rank."""
+    rank = math.ceil(q * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# ---------------------------------------------------------------------------
+# Geöffnete Dateien (Audit-Hook, je Thread)
+# ---------------------------------------------------------------------------
+_hook_installed = False
+_hook_lock = threading.Lock()
+
+
+def _audit(event: str, _args):
+    if event == "open":
+        counter = getattr(_request_local, "files", None)
+        if counter is not None:
+            _request_local.files = counter + 1
+
+
+def install_open_counter():
+    """Installiert den Audit-Hook einmalig (lässt sich nicht wieder entfernen)."""
+    global _hook_installed
+    with _hook_lock:
+        if not _hook_installed:
+            sys.addaudithook(_audit)
+            _hook_installed = True
+
+
+# ---------------------------------------------------------------------------
+# Profiling langsamer Anfragen
+# ---------------------------------------------------------------------------
+class SlowRequestProfiler:
+    """
+    Profiliert Anfragen mit cProfile und speichert das Profil, wenn die
+    Anfrage länger als threshold_ms dauert. Es wird immer nur eine Anfrage
+    gleichzeitig profiliert (cProfile arbeitet nicht parallel).
+    """
+
+    def __init__(self, directory, threshold_ms: float, keep: int = PROFILE_KEEP):
+        self.directory = str(directory)
+        self.threshold = threshold_ms / 1000
+        self.keep = keep
+        self._busy = threading.Lock()
+
+    def start(self):
+        """Gestartetes Profil oder None, wenn bereits eine Anfrage profiliert wird."""
+        if not self._busy.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Ein anderes Profiling-Werkzeug ist aktiv
+            self._busy.release()
+            return None
+        return profile
+
+    def finish(self, profile, route: str, method: str, seconds: float):
+        try:
+            profile.disable()
+            if seconds >= self.threshold:
+                self._dump(profile, route, method, seconds)
+        finally:
+            self._busy.release()
+
+    def cancel(self, profile):
+        self.finish(profile, "", "", 0.0)
+
+    def _dump(self, profile, route: str, method: str, seconds: float):
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        name = f"{stamp}_{method}_{slug}_{round(seconds * 1000)}ms.prof"
+        profile.dump_stats(os.path.join(self.directory, name))
+        files = sorted(f for f in os.listdir(self.directory) if f.endswith(".prof"))
+        for old in files[:-self.keep] if self.keep else ():
+            try:
+                os.remove(os.path.join(self.directory, old))
+            except OSError:
+                pass
+
+
+# ---------------------------------------------------------------------------
+# WSGI-Middleware
+# ---------------------------------------------------------------------------
+class _CountingInput:
+    """Zählt die gelesenen Bytes des Anfrage-Bodys."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self.count = 0
+
+    def read(self, *args):
+        data = self._stream.read(*args)
+        self.count += len(data)
+        return data
+
+    def readline(self, *args):
+        data = self._stream.readline(*args)
+        self.count += len(data)
+        return data
+
+    def readlines(self, *args):
+        lines = self._stream.readlines(*args)
+        self.count += sum(len(line) for line in lines)
+        return lines
+
+    def __iter__(self):
+        for line in self._stream:
+            self.count += len(line)
+            yield line
+
+
+class InstrumentedApp:
+    """
+    Misst jede Anfrage bis zum Ende des Antwort-Bodys (auch bei gestreamten
+    Antworten). Die Route liest die Middleware aus environ[ROUTE_KEY], das
+    die Anwendung beim Routing setzt. profiler: SlowRequestProfiler oder None.
+    """
+
+    def __init__(self, app, metrics: Metrics, profiler=None):
+        self.app = app
+        self.metrics = metrics
+        self.profiler = profiler
+        install_open_counter()
+
+    def __call__(self, environ, start_response):
+        request = _Request(self, environ)
+
+        def _start_response(status, headers, exc_info=None):
+            request.status = int(status.split(" ", 1)[0])
+            request.streaming = any(name.lower() == "content-type" and value.startswith(_SSE_MIMETYPE)
+                                    for name, value in headers)
+            return start_response(status, headers, exc_info)
+
+        try:
+            body = self.app(environ, _start_response)
+        except BaseException:
+            request.finish()
+            raise
+        if request.streaming:
+            # Live-Ströme laufen beliebig lange und werden nicht profiliert
+            request.cancel_profile()
+        request.body = body
+        return request
+
+
+class _Request:
+    """Antwort-Body einer gemessenen Anfrage; close() schließt die Messung ab."""
+
+    def __init__(self, owner: InstrumentedApp, environ):
+        self._owner = owner
+        self._environ = environ
+        self._started = time.perf_counter()
+        self._input = _CountingInput(environ.get("wsgi.input"))
+        environ["wsgi.input"] = self._input
+        self._outer_files = getattr(_request_local, "files", None)
+        _request_local.files = 0
+        self._profile = owner.profiler.start() if owner.profiler is not None else None
+        self._done = False
+        self.status = 500
+        self.streaming = False
+        self.written = 0
+        self.body = ()
+
+    def __iter__(self):
+        for chunk in self.body:
+            self.written += len(chunk)
+            yield chunk
+        # Manche Server (und der Test-Client) rufen close() erst später auf
+        self.finish()
+
+    def close(self):
+        try:
+            close = getattr(self.body, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self.finish()
+
+    def cancel_profile(self):
+        if self._profile is not None:
+            self._owner.profiler.cancel(self._profile)
+            self._profile = None
+
+    def finish(self):
+        if self._done:
+            return
+        self._done = True
+        seconds = time.perf_counter() - self._started
+        route = self._environ.get(ROUTE_KEY) or UNMATCHED
+        if self._profile is not None:
+            self._owner.profiler.finish(self._profile, route, self._environ.get("REQUEST_METHOD", ""), seconds)
+        files = getattr(_request_local, "files", 0) or 0
+        _request_local.files = self._outer_files
+        self._owner.metrics.observe(route, self.status, None if self.streaming else seconds,
+                                    self._input.count, self.written, files)
@@ -8,6 +8,7 @@
 // STATE
 // ============================================================
 const state = {
+  project:        "",    // gewähltes Projekt ("" = aktives Projekt des Servers)
   entryTypes:     {},    // { key: { label, icon, fields } }
   settings:       {},    // aktuelle Einstellungen
   selectedType:   null,  // aktuell gewählter Typ
@@ -16,10 +17,19 @@ const state = {
   filename:       "",
   autoPreview:    true,
   previewDebounce: null,
+  citeKeyDebounce: null,
 
   // Library
-  libraryFiles:   [],    // alle geladenen .bib-Einträge
+  libraryFiles:   [],    // bisher geladene Einträge (seitenweise vom Server)
+  libCursor:      null,  // Cursor der nächsten Seite (null = keine weitere)
+  libTotal:       0,     // Treffer für die aktuellen Filter
+  libSize:        0,     // Einträge in der gesamten Bibliothek
+  libRequest:     0,     // laufende Anfrage-Nr. (verwirft veraltete Antworten)
+  libLoading:     false,
+  libSearchDebounce: null,
+  libReloadDebounce: null,  // Neuladen nach Live-Update bei aktiven Filtern
   libView:        "grid",// "grid" | "list"
+  libDuplicates:  false, // Dubletten-Ansicht statt gefilterter Liste
 
   // Editor
   editorFile:     null,  // { path, name }
@@ -67,6 +77,7 @@ function setupTheme() {
 // ============================================================
 document.addEventListener("DOMContentLoaded", async () => {
   setupTheme();
+  await loadProjects();
   await Promise.all([loadEntryTypes(), loadSettings()]);
   setupNavigation();
   setupFormActions();
@@ -75,18 +86,70 @@ document.addEventListener("DOMContentLoaded", async () => {
   updateSectionSelect();
   setupEditorPanel();
   setupModal();
+  connectLiveUpdates();
 });
 
 // ============================================================
 // API HELPERS
 // ============================================================
+function projectHeaders(headers = {}) {
+  if (state.project) headers["X-LQM-Project"] = state.project;
+  return headers;
+}
+
+// EventSource kann keine Header setzen: Projekt als Query-Parameter
+function projectUrl(path) {
+  if (!state.project) return path;
+  return path + (path.includes("?") ? "&" : "?") + "project=" + encodeURIComponent(state.project);
+}
+
 async function api(path, method = "GET", body = null) {
-  const opts = { method, headers: { "Content-Type": "application/json" } };
+  const opts = { method, headers: projectHeaders({ "Content-Type": "application/json" }) };
   if (body) opts.body = JSON.stringify(body);
   const res = await fetch(path, opts);
   return res.json();
 }
 
+// ============================================================
+// PROJEKTE
+// ============================================================
+async function loadProjects() {
+  state.project = localStorage.getItem("lqm-project") || "";
+  const r = await (await fetch("/api/projects")).json();
+  const names = r.projects.map(p => p.name);
+  if (state.project && !names.includes(state.project)) {
+    state.project = "";
+    localStorage.removeItem("lqm-project");
+  }
+  const select = document.getElementById("project-select");
+  document.getElementById("sidebar-project").style.display = names.length ? "" : "none";
+  select.innerHTML = "";
+  names.forEach(name => {
+    const opt = document.createElement("option");
+    opt.value = name;
+    opt.textContent = name;
+    select.appendChild(opt);
+  });
+  select.value = state.project || r.current;
+  select.onchange = () => switchProject(select.value);
+}
+
+function switchProject(name) {
+  localStorage.setItem("lqm-project", name);
+  location.reload();
+}
+
+async function saveAsProject() {
+  const name = (prompt("Name des neuen Projekts:") || "").trim();
+  if (!name) return;
+  const r = await api("/api/projects", "POST", { name });
+  if (!r.ok) {
+    toast(r.error, "error");
+    return;
+  }
+  switchProject(name);
+}
+
 async function loadEntryTypes() {
   state.entryTypes = await api("/api/entry-types");
 }
@@ -239,6 +302,25 @@ function renderFields(typeKey) {
   container.appendChild(grid);
 }
 
+async function resolveIdentifier() {
+  const input = document.getElementById("resolve-input");
+  const identifier = input.value.trim();
+  if (!identifier) return;
+  const r = await api("/api/resolve", "POST", { identifier });
+  if (r.ok === false) {
+    toast(r.error, "error");
+    return;
+  }
+  if (r.entry_type !== state.selectedType) selectType(r.entry_type);
+  Object.entries(r.fields).forEach(([key, value]) => {
+    const el = document.querySelector(`#fields-container [data-field-key="${key}"]`);
+    if (!el) return;
+    el.value = value;
+    onFieldChange(key, value);
+  });
+  toast(`${Object.keys(r.fields).length} Felder übernommen (${r.source})`, "success");
+}
+
 function onFieldChange(key, value) {
   state.fieldValues[key] = value;
   if (["title", "author", "date"].includes(key)) {
@@ -261,10 +343,34 @@ async function updateCiteKeyFromFields() {
 
   const keyInput = document.getElementById("cite-key-input");
   const fnInput  = document.getElementById("filename-input");
-  if (!keyInput.dataset.manualEdit) keyInput.value = state.citeKey;
+  if (!keyInput.dataset.manualEdit) {
+    keyInput.value = state.citeKey;
+    setCiteKeyHint(res.collision ? "Schlüssel war bereits vergeben – Suffix ergänzt." : "");
+  }
   if (!fnInput.dataset.manualEdit)  fnInput.value  = state.filename;
 }
 
+// Vorhandene Schlüssel mit gleichem Präfix als Vorschläge, Hinweis bei Kollision
+async function checkCiteKey(value) {
+  const list = document.getElementById("cite-key-suggestions");
+  if (!value) { list.innerHTML = ""; setCiteKeyHint(""); return; }
+  const res = await api(`/api/cite-key/complete?prefix=${encodeURIComponent(value)}`);
+  if (document.getElementById("cite-key-input").value !== value) return;
+  list.innerHTML = "";
+  res.keys.forEach(k => {
+    const opt = document.createElement("option");
+    opt.value = k;
+    list.appendChild(opt);
+  });
+  setCiteKeyHint(res.taken ? `Bereits vergeben – frei wäre: ${res.available}` : "");
+}
+
+function setCiteKeyHint(text) {
+  const hint = document.getElementById("cite-key-hint");
+  hint.textContent = text;
+  hint.classList.toggle("text-warning", !!text);
+}
+
 // ============================================================
 // AKTIONS-BUTTONS (Create View)
 // ============================================================
@@ -278,6 +384,8 @@ function setupFormActions() {
   document.getElementById("cite-key-input").addEventListener("input", function () {
     this.dataset.manualEdit = "1";
     state.citeKey = this.value;
+    clearTimeout(state.citeKeyDebounce);
+    state.citeKeyDebounce = setTimeout(() => checkCiteKey(this.value.trim()), 200);
   });
 
   document.getElementById("filename-input").addEventListener("input", function () {
@@ -292,6 +400,10 @@ function setupFormActions() {
   });
 
   document.getElementById("btn-preview-refresh").addEventListener("click", refreshPreview);
+  document.getElementById("btn-resolve").addEventListener("click", resolveIdentifier);
+  document.getElementById("resolve-input").addEventListener("keydown", e => {
+    if (e.key === "Enter") resolveIdentifier();
+  });
 
   document.getElementById("btn-copy-preview").addEventListener("click", () => {
     const text = document.getElementById("bibtex-preview").innerText;
@@ -308,6 +420,7 @@ function setupFormActions() {
     delete document.getElementById("filename-input").dataset.manualEdit;
     document.getElementById("cite-key-input").value = "";
     document.getElementById("filename-input").value = "";
+    setCiteKeyHint("");
     document.getElementById("bibtex-preview").innerHTML =
       '<span class="preview-placeholder">Vorschau erscheint hier&hellip;</span>';
   });
@@ -381,6 +494,7 @@ async function saveEntry() {
 
   if (!res.ok) { toast(`Fehler: ${res.error}`, "error"); return; }
 
+  if (res.cite_key !== citeKey) toast(`Schlüssel '${citeKey}' war vergeben, gespeichert als '${res.cite_key}'.`, "info");
   let msg = `Gespeichert: ${res.filename}`;
   if (res.latex_updated) msg += " · LaTeX-Datei aktualisiert";
   if (res.latex_error)   toast(`LaTeX-Warnung: ${res.latex_error}`, "warning");
@@ -409,34 +523,206 @@ function updateSectionSelect() {
 // ============================================================
 // LIBRARY VIEW
 // ============================================================
+const LIB_PAGE_SIZE = 60;
+
+function libraryQueryParams(cursor = null) {
+  const params = new URLSearchParams({
+    q:     (document.getElementById("lib-search")?.value || "").trim(),
+    type:  document.getElementById("lib-type-filter")?.value || "",
+    year:  document.getElementById("lib-year-filter")?.value || "",
+    sort:  document.getElementById("lib-sort")?.value || "modified",
+    limit: LIB_PAGE_SIZE,
+  });
+  if (cursor) params.set("cursor", cursor);
+  return params;
+}
+
 async function loadLibrary() {
+  if (state.libDuplicates) return loadDuplicates();
   const grid = document.getElementById("lib-grid");
   grid.innerHTML = `<div class="empty-state"><i class="bi bi-hourglass-split spin"></i><p>Bibliothek wird geladen…</p></div>`;
 
-  const res = await api("/api/library");
+  const requestId = ++state.libRequest;
+  const res = await api(`/api/library?${libraryQueryParams()}`);
+  if (requestId !== state.libRequest) return; // inzwischen neue Filter
+
   state.libraryFiles = res.files || [];
+  state.libCursor    = res.next_cursor || null;
+  state.libTotal     = res.total || 0;
+  state.libSize      = res.library_size || 0;
 
   // Filter-Dropdowns befüllen
-  populateLibraryFilters(state.libraryFiles);
+  populateLibraryFilters(res.facets || {}, state.libSize);
   renderLibrary();
 
   // Refresh-Button
   document.getElementById("btn-refresh-library").onclick = loadLibrary;
 }
 
-function populateLibraryFilters(files) {
+// Dubletten: Gruppen gleicher Quellen mit unterschiedlichen Schlüsseln
+const DUPLICATE_REASONS = { doi: "gleiche DOI", isbn: "gleiche ISBN", title: "ähnlicher Titel" };
+
+async function loadDuplicates() {
+  const grid = document.getElementById("lib-grid");
+  grid.innerHTML = `<div class="empty-state"><i class="bi bi-hourglass-split spin"></i><p>Suche Dubletten…</p></div>`;
+
+  const requestId = ++state.libRequest;
+  const res = await api("/api/duplicates");
+  if (requestId !== state.libRequest || !state.libDuplicates) return;
+
+  state.libraryFiles = [];
+  state.libCursor    = null;
+  document.getElementById("lib-count").textContent =
+    `${res.total} ${res.total === 1 ? "Dublettengruppe" : "Dublettengruppen"} (${res.entries} Einträge)`;
+  grid.classList.toggle("list-view", state.libView === "list");
+
+  if (!res.clusters || res.clusters.length === 0) {
+    grid.innerHTML = `<div class="empty-state"><i class="bi bi-check2-circle"></i><p>Keine Dubletten gefunden.</p></div>`;
+    return;
+  }
+  grid.innerHTML = "";
+  res.clusters.forEach(c => {
+    const header = document.createElement("div");
+    header.className = "dup-cluster-header";
+    const reasons = c.reasons.map(r => DUPLICATE_REASONS[r] || r).join(", ");
+    header.innerHTML = `<i class="bi bi-files"></i> ${c.files.length} Einträge · ${escapeHtml(reasons)}`;
+    grid.appendChild(header);
+    c.files.forEach(f => grid.appendChild(buildEntryCard(f)));
+  });
+}
+
+// Export mit den aktuellen Filtern als eine .bib-Datei (Download, serverseitig gestreamt)
+function exportLibrary() {
+  const params = libraryQueryParams();
+  params.delete("limit");
+  params.set("dedup", "keys");
+  window.location.href = projectUrl(`/api/export?${params}`);
+}
+
+async function checkCitations() {
+  const r = await api("/api/citations");
+  if (r.ok === false) {
+    toast(r.error, "error");
+    return;
+  }
+  const missing = r.unresolved.map(u => u.key);
+  let msg = `Zitiert: ${r.used.length} · Nicht zitiert: ${r.unused.length} · Fehlend: ${missing.length}`;
+  if (missing.length) msg += ` (${missing.slice(0, 5).join(", ")}${missing.length > 5 ? ", …" : ""})`;
+  if (r.missing_files.length) msg += ` · Nicht gefundene Dateien: ${r.missing_files.join(", ")}`;
+  toast(msg, missing.length || r.missing_files.length ? "warning" : "success");
+}
+
+function lintLibrary() {
+  const btn = document.getElementById("btn-lib-lint");
+  if (btn.disabled) return;
+  btn.disabled = true;
+  const files = [];
+  const source = new EventSource(projectUrl("/api/lint/stream"));
+  const finish = () => {
+    source.close();
+    btn.disabled = false;
+    btn.title = "Bibliothek prüfen (Pflichtfelder, ISBN, DOI, Datum)";
+  };
+  source.addEventListener("file", e => files.push(JSON.parse(e.data)));
+  source.addEventListener("progress", e => {
+    const p = JSON.parse(e.data);
+    btn.title = `Prüfe … ${p.done}/${p.total}`;
+  });
+  source.addEventListener("done", e => {
+    const r = JSON.parse(e.data);
+    finish();
+    let msg = `${r.checked} Dateien geprüft · ${r.errors} Fehler · ${r.warnings} Warnungen`;
+    if (files.length) msg += ` (${files.slice(0, 3).map(f => f.name).join(", ")}${files.length > 3 ? ", …" : ""})`;
+    toast(msg, r.errors ? "error" : r.warnings ? "warning" : "success");
+  });
+  source.onerror = () => {
+    finish();
+    toast("Prüfung abgebrochen.", "error");
+  };
+}
+
+async function enrichLibrary() {
+  const btn = document.getElementById("btn-lib-enrich");
+  btn.disabled = true;
+  toast("Frage DOI/ISBN-Metadaten ab …", "info");
+  try {
+    const r = await api("/api/resolve/enrich", "POST", {});
+    if (r.ok === false) {
+      toast(r.error, "error");
+      return;
+    }
+    let msg = `${r.updated.length} von ${r.checked} Einträgen ergänzt`;
+    if (r.failed.length) msg += ` · ${r.failed.length} nicht gefunden`;
+    toast(msg, r.failed.length ? "warning" : "success");
+    if (r.updated.length) loadLibrary();
+  } finally {
+    btn.disabled = false;
+  }
+}
+
+function toggleDuplicates() {
+  state.libDuplicates = !state.libDuplicates;
+  document.getElementById("btn-lib-duplicates").classList.toggle("active", state.libDuplicates);
+  loadLibrary();
+}
+
+async function importBibFile(file) {
+  const btn = document.getElementById("btn-import-bib");
+  const form = new FormData();
+  form.append("file", file);
+  form.append("mode", document.getElementById("lib-import-mode")?.value || "split");
+  form.append("section_id", state.settings.default_section_id || "");
+
+  btn.disabled = true;
+  toast(`Importiere ${file.name} …`, "info");
+  try {
+    const res = await (await fetch("/api/import", { method: "POST", body: form, headers: projectHeaders() })).json();
+    if (!res.ok) {
+      toast("Import fehlgeschlagen: " + (res.error || "unbekannter Fehler"), "error");
+      return;
+    }
+    let msg = `${res.imported} Einträge importiert`;
+    if (res.renamed) msg += `, ${res.renamed} Schlüssel umbenannt`;
+    toast(msg, "success");
+    if (res.latex_error) toast("LaTeX: " + res.latex_error, "warning");
+    loadLibrary();
+  } finally {
+    btn.disabled = false;
+  }
+}
+
+async function loadMoreLibrary() {
+  if (!state.libCursor || state.libLoading) return;
+  state.libLoading = true;
+  const requestId = state.libRequest;
+  const res = await api(`/api/library?${libraryQueryParams(state.libCursor)}`);
+  state.libLoading = false;
+  if (requestId !== state.libRequest) return;
+
+  const files = res.files || [];
+  state.libraryFiles = state.libraryFiles.concat(files);
+  state.libCursor    = res.next_cursor || null;
+  state.libTotal     = res.total || 0;
+
+  const grid = document.getElementById("lib-grid");
+  grid.querySelector(".lib-load-more")?.remove();
+  files.forEach(f => grid.appendChild(buildEntryCard(f)));
+  appendLoadMore(grid);
+}
+
+function populateLibraryFilters(facets, librarySize) {
   const typeFilter = document.getElementById("lib-type-filter");
   const yearFilter = document.getElementById("lib-year-filter");
 
   const savedType = typeFilter.value;
   const savedYear = yearFilter.value;
 
-  // Zählt Einträge pro Typ
-  const typeCounts = {};
-  files.forEach(f => { if (f.type) typeCounts[f.type] = (typeCounts[f.type] || 0) + 1; });
+  // Anzahl pro Typ / Jahr kommt vom Server
+  const typeCounts = facets.types || {};
+  const yearCounts = facets.years || {};
 
   // ALLE 21 Typen aus entryTypes anzeigen (mit Anzahl)
-  typeFilter.innerHTML = `<option value="">Alle Typen (${files.length})</option>`;
+  typeFilter.innerHTML = `<option value="">Alle Typen (${librarySize})</option>`;
   for (const [key, type] of Object.entries(state.entryTypes)) {
     const count = typeCounts[key] || 0;
     const opt = document.createElement("option");
@@ -448,64 +734,31 @@ function populateLibraryFilters(files) {
   typeFilter.value = savedType;
 
   // Jahre: nur vorhandene anzeigen (absteigend)
-  const years = [...new Set(files.map(f => f.year).filter(Boolean))].sort((a, b) => b - a);
+  const years = Object.keys(yearCounts).sort((a, b) => b.localeCompare(a));
   yearFilter.innerHTML = `<option value="">Alle Jahre</option>`;
   years.forEach(y => {
     const opt = document.createElement("option");
     opt.value = y;
-    opt.textContent = y;
+    opt.textContent = `${y} (${yearCounts[y]})`;
     yearFilter.appendChild(opt);
   });
   yearFilter.value = savedYear;
 }
 
-function getFilteredLibrary() {
-  const query   = (document.getElementById("lib-search")?.value || "").toLowerCase().trim();
-  const selType = document.getElementById("lib-type-filter")?.value || "";
-  const selYear = document.getElementById("lib-year-filter")?.value || "";
-  const sort    = document.getElementById("lib-sort")?.value || "modified";
-
-  let files = state.libraryFiles.slice();
-
-  if (query) {
-    files = files.filter(f =>
-      (f.title  || "").toLowerCase().includes(query) ||
-      (f.author || "").toLowerCase().includes(query) ||
-      (f.key    || "").toLowerCase().includes(query) ||
-      (f.publisher || "").toLowerCase().includes(query) ||
-      (f.name   || "").toLowerCase().includes(query)
-    );
-  }
-  if (selType) files = files.filter(f => f.type === selType);
-  if (selYear) files = files.filter(f => f.year === selYear);
-
-  files.sort((a, b) => {
-    switch (sort) {
-      case "title":     return (a.title || "").localeCompare(b.title || "");
-      case "author":    return (a.author || "").localeCompare(b.author || "");
-      case "year-desc": return (b.year || "0").localeCompare(a.year || "0");
-      case "year-asc":  return (a.year || "0").localeCompare(b.year || "0");
-      default:          return 0; // modified (already sorted by server)
-    }
-  });
-
-  return files;
-}
-
 function renderLibrary() {
+  if (state.libDuplicates) { loadDuplicates(); return; }
   const grid  = document.getElementById("lib-grid");
-  const files = getFilteredLibrary();
+  const files = state.libraryFiles;
 
   // Stats
-  document.getElementById("lib-count").textContent =
-    `${files.length} ${files.length === 1 ? "Eintrag" : "Einträge"}`;
+  updateLibraryCount();
 
   // View class
   grid.classList.toggle("list-view", state.libView === "list");
 
   if (files.length === 0) {
     grid.innerHTML = `<div class="empty-state"><i class="bi bi-inbox"></i><p>${
-      state.libraryFiles.length === 0
+      state.libSize === 0
         ? "Noch keine .bib-Dateien im Zielverzeichnis."
         : "Keine Einträge gefunden."
     }</p></div>`;
@@ -514,12 +767,36 @@ function renderLibrary() {
 
   grid.innerHTML = "";
   files.forEach(f => grid.appendChild(buildEntryCard(f)));
+  appendLoadMore(grid);
+}
+
+function updateLibraryCount() {
+  document.getElementById("lib-count").textContent =
+    `${state.libTotal} ${state.libTotal === 1 ? "Eintrag" : "Einträge"}`;
+}
+
+// Lädt die nächste Seite, sobald das Ende der Liste sichtbar wird
+const libLoadMoreObserver = ("IntersectionObserver" in window)
+  ? new IntersectionObserver(entries => {
+      if (entries.some(e => e.isIntersecting)) loadMoreLibrary();
+    }, { rootMargin: "400px" })
+  : null;
+
+function appendLoadMore(grid) {
+  if (!state.libCursor) return;
+  const btn = document.createElement("button");
+  btn.className = "btn btn-outline-secondary lib-load-more";
+  btn.innerHTML = `<i class="bi bi-chevron-down"></i> Weitere laden (${state.libraryFiles.length} von ${state.libTotal})`;
+  btn.addEventListener("click", loadMoreLibrary);
+  grid.appendChild(btn);
+  if (libLoadMoreObserver) libLoadMoreObserver.observe(btn);
 }
 
 function buildEntryCard(f) {
   const card = document.createElement("div");
   card.className = "entry-card";
   card.title = f.path;
+  card.dataset.path = f.path;
 
   const typeLabel = ENTRY_TYPE_LABEL(f.type);
   const typeIcon  = ENTRY_TYPE_ICON(f.type);
@@ -647,19 +924,37 @@ document.addEventListener("DOMContentLoaded", () => {
   if (libSearch) {
     libSearch.addEventListener("input", () => {
       if (libClear) libClear.style.display = libSearch.value ? "" : "none";
-      renderLibrary();
+      clearTimeout(state.libSearchDebounce);
+      state.libSearchDebounce = setTimeout(loadLibrary, 250);
     });
   }
   if (libClear) {
     libClear.addEventListener("click", () => {
       libSearch.value = "";
       libClear.style.display = "none";
-      renderLibrary();
+      loadLibrary();
+    });
+  }
+  if (typeFilter) typeFilter.addEventListener("change", loadLibrary);
+  if (yearFilter) yearFilter.addEventListener("change", loadLibrary);
+  if (sortSelect) sortSelect.addEventListener("change", loadLibrary);
+
+  document.getElementById("btn-lib-duplicates")?.addEventListener("click", toggleDuplicates);
+  document.getElementById("btn-export-bib")?.addEventListener("click", exportLibrary);
+  document.getElementById("btn-lib-citations")?.addEventListener("click", checkCitations);
+  document.getElementById("btn-lib-enrich")?.addEventListener("click", enrichLibrary);
+  document.getElementById("btn-lib-lint")?.addEventListener("click", lintLibrary);
+  document.getElementById("btn-lib-deleted")?.addEventListener("click", restoreDeletedFile);
+
+  const importBtn  = document.getElementById("btn-import-bib");
+  const importFile = document.getElementById("lib-import-file");
+  if (importBtn && importFile) {
+    importBtn.addEventListener("click", () => importFile.click());
+    importFile.addEventListener("change", () => {
+      if (importFile.files.length) importBibFile(importFile.files[0]);
+      importFile.value = "";
     });
   }
-  if (typeFilter) typeFilter.addEventListener("change", renderLibrary);
-  if (yearFilter) yearFilter.addEventListener("change", renderLibrary);
-  if (sortSelect) sortSelect.addEventListener("change", renderLibrary);
 
   if (gridBtn) {
     gridBtn.addEventListener("click", () => {
@@ -692,6 +987,9 @@ function setupEditorPanel() {
   document.getElementById("btn-editor-rename").addEventListener("click", () => {
     if (state.editorFile) promptRenameFile(state.editorFile);
   });
+  document.getElementById("btn-editor-versions").addEventListener("click", () => {
+    if (state.editorFile) showVersions(state.editorFile);
+  });
 
   // Keyboard shortcuts
   document.addEventListener("keydown", (e) => {
@@ -820,7 +1118,7 @@ async function confirmDeleteFile(f) {
     icon:    "bi-trash",
     iconColor: "var(--danger)",
     title:   "Datei löschen",
-    body:    `Soll die Datei <strong>${escapeHtml(f.name)}</strong> unwiderruflich gelöscht werden?`,
+    body:    `Soll die Datei <strong>${escapeHtml(f.name)}</strong> gelöscht werden? Sie bleibt über die Versionen wiederherstellbar.`,
     confirm: "Löschen",
     cancel:  "Abbrechen",
     danger:  true,
@@ -881,6 +1179,80 @@ async function promptRenameFile(f) {
   }
 }
 
+const VERSION_OP_LABEL = {
+  save: "Gespeichert", edit: "Bearbeitet", rename: "Umbenannt", delete: "Gelöscht",
+  import: "Importiert", enrich: "Ergänzt", restore: "Wiederhergestellt", baseline: "Früherer Stand",
+};
+
+async function restoreVersion(seq, name) {
+  const res = await api(`/api/versions/${seq}/restore`, "POST", { name });
+  if (!res.ok) {
+    toast(`Fehler beim Wiederherstellen: ${res.error}`, "error");
+    return null;
+  }
+  let msg = `${res.name} wiederhergestellt.`;
+  if (res.latex_updated) msg += " · LaTeX-Eintrag ergänzt.";
+  else if (res.latex_error) toast(`LaTeX: ${res.latex_error}`, "warning");
+  toast(msg, "success");
+  if (document.getElementById("view-library").classList.contains("active")) {
+    await loadLibrary();
+  }
+  return res;
+}
+
+async function showVersions(f) {
+  const res = await api(`/api/versions?name=${encodeURIComponent(f.name)}`);
+  const versions = (res.versions || []).filter(v => !v.deleted);
+  if (!versions.length) {
+    toast("Für diese Datei sind keine früheren Stände gespeichert.", "info");
+    return;
+  }
+  const seq = await showModal({
+    icon:    "bi-clock-history",
+    iconColor: "var(--accent)",
+    title:   "Version wiederherstellen",
+    body:    `Stand von <strong>${escapeHtml(f.name)}</strong> wählen. Der aktuelle Inhalt bleibt als Version erhalten.`,
+    confirm: "Wiederherstellen",
+    cancel:  "Abbrechen",
+    options: versions.map(v => ({
+      value: v.seq,
+      label: `${v.modified} · ${VERSION_OP_LABEL[v.op] || v.op}${v.name !== f.name ? ` (${v.name})` : ""}`,
+    })),
+  });
+  if (!seq) return;
+  if (state.editorDirty && !confirm("Ungespeicherte Änderungen verwerfen?")) return;
+  const restored = await restoreVersion(seq, f.name);
+  if (restored && state.editorFile?.path === f.path) {
+    state.editorDirty = false;
+    openEditor(state.editorFile);
+  }
+}
+
+async function restoreDeletedFile() {
+  const res = await api("/api/versions?deleted=1");
+  if (res.ok === false) {
+    toast(res.error, "error");
+    return;
+  }
+  if (!res.files.length) {
+    toast("Keine gelöschten Dateien vorhanden.", "info");
+    return;
+  }
+  const name = await showModal({
+    icon:    "bi-arrow-counterclockwise",
+    iconColor: "var(--accent)",
+    title:   "Gelöschte Datei wiederherstellen",
+    body:    "Die Datei wird mit ihrem letzten Stand wiederhergestellt.",
+    confirm: "Wiederherstellen",
+    cancel:  "Abbrechen",
+    options: res.files.map(f => ({ value: f.name, label: `${f.name} · gelöscht ${f.modified}` })),
+  });
+  if (!name) return;
+  const versions = (await api(`/api/versions?name=${encodeURIComponent(name)}`)).versions || [];
+  const last = versions.find(v => !v.deleted);
+  if (last) await restoreVersion(last.seq, name);
+}
+
 // ============================================================
 // MODAL
 // ============================================================
@@ -901,7 +1273,7 @@ function resolveModal(value) {
   }
 }
 
-function showModal({ icon, iconColor, title, body, confirm, cancel, danger, input, inputPlaceholder } = {}) {
+function showModal({ icon, iconColor, title, body, confirm, cancel, danger, input, inputPlaceholder, options } = {}) {
   return new Promise(resolve => {
     state.modalResolve = resolve;
 
@@ -925,6 +1297,13 @@ function showModal({ icon, iconColor, title, body, confirm, cancel, danger, inpu
       });
       extra.appendChild(inp);
       setTimeout(() => { inp.focus(); inp.select(); }, 50);
+    } else if (options) {
+      // Auswahlliste [{value, label}]; Ergebnis ist der gewählte value
+      const sel = document.createElement("select");
+      sel.id = "modal-input";
+      sel.className = "modal-input";
+      options.forEach(o => sel.add(new Option(o.label, o.value)));
+      extra.appendChild(sel);
     }
 
     const confirmBtn = document.getElementById("modal-confirm");
@@ -1009,6 +1388,7 @@ document.addEventListener("DOMContentLoaded", () => {
 // ============================================================
 function setupSettingsPanel() {
   document.getElementById("btn-save-settings").addEventListener("click", saveSettings);
+  document.getElementById("btn-save-project").addEventListener("click", saveAsProject);
 
   document.getElementById("btn-browse-dir").addEventListener("click", async () => {
     const res = await api("/api/browse-directory", "POST", {});
@@ -1054,6 +1434,7 @@ function populateSettingsForm() {
   document.getElementById("setting-target-dir").value     = s.target_directory || "";
   document.getElementById("setting-latex-main").value     = s.latex_main_path  || "";
   document.getElementById("setting-add-date").checked     = s.add_date_comment !== false;
+  document.getElementById("setting-aggregate").checked    = s.aggregate_sections === true;
   document.getElementById("setting-auto-browser").checked = s.auto_open_browser !== false;
   document.getElementById("setting-port").value           = s.port || 5000;
 
@@ -1083,6 +1464,7 @@ async function saveSettings() {
     target_directory:         document.getElementById("setting-target-dir").value.trim(),
     latex_main_path:          document.getElementById("setting-latex-main").value.trim(),
     add_date_comment:         document.getElementById("setting-add-date").checked,
+    aggregate_sections:       document.getElementById("setting-aggregate").checked,
     auto_open_browser:        document.getElementById("setting-auto-browser").checked,
     port:                     parseInt(document.getElementById("setting-port").value) || 5000,
     addbibresource_placement: pc,
@@ -1097,6 +1479,17 @@ async function saveSettings() {
   msg.style.display = "flex";
   setTimeout(() => msg.style.display = "none", 2500);
   toast("Einstellungen gespeichert!", "success");
+  if (res.aggregates) reportAggregates(res.aggregates);
+}
+
+function reportAggregates(r) {
+  if (!r.ok) {
+    toast(r.error || "Sammeldateien konnten nicht erstellt werden.", "error");
+  } else if (r.latex_error) {
+    toast(`LaTeX-Hauptdatei nicht umgestellt: ${r.latex_error}`, "warning");
+  } else {
+    toast(`LaTeX-Hauptdatei umgestellt: ${r.latex_removed} Zeilen entfernt, ${r.latex_added} eingefügt.`, "info");
+  }
 }
 
 // ============================================================
@@ -1158,6 +1551,78 @@ function getSectionsFromDOM() {
   })).filter(s => s.label);
 }
 
+// ============================================================
+// LIVE-UPDATES (Server-Sent Events, siehe /api/events)
+// ============================================================
+function connectLiveUpdates() {
+  if (!("EventSource" in window)) return;
+  const source = new EventSource(projectUrl("/api/events"));
+  source.addEventListener("library", e => applyLibraryEvent(JSON.parse(e.data)));
+  source.addEventListener("latex", () => toast("LaTeX-Hauptdatei wurde geändert.", "info"));
+}
+
+function libraryFiltersActive() {
+  return !!((document.getElementById("lib-search")?.value || "").trim()
+    || document.getElementById("lib-type-filter")?.value
+    || document.getElementById("lib-year-filter")?.value);
+}
+
+function scheduleLibraryReload() {
+  clearTimeout(state.libReloadDebounce);
+  state.libReloadDebounce = setTimeout(loadLibrary, 500);
+}
+
+// Patcht die geladene Bibliothek statt sie komplett neu zu laden
+function applyLibraryEvent(ev) {
+  state.libSize = ev.library_size ?? state.libSize;
+  if (state.libDuplicates) { scheduleLibraryReload(); return; }
+  const grid = document.getElementById("lib-grid");
+  const idx  = state.libraryFiles.findIndex(f => f.path === ev.path);
+  const card = grid.querySelector(`.entry-card[data-path="${CSS.escape(ev.path)}"]`);
+  const sort = document.getElementById("lib-sort")?.value || "modified";
+
+  if (ev.action === "delete") {
+    if (idx !== -1) {
+      state.libraryFiles.splice(idx, 1);
+      state.libTotal = Math.max(state.libTotal - 1, 0);
+      card?.remove();
+      if (state.libraryFiles.length === 0) renderLibrary();
+      else updateLibraryCount();
+    }
+  } else if (idx !== -1) {
+    state.libraryFiles[idx] = ev.file;
+    card?.replaceWith(buildEntryCard(ev.file));
+  } else if (libraryFiltersActive() || sort !== "modified") {
+    // Ob und wo der neue Eintrag erscheint, weiß nur der Server
+    scheduleLibraryReload();
+  } else {
+    state.libraryFiles.unshift(ev.file);
+    state.libTotal++;
+    if (state.libraryFiles.length === 1) renderLibrary();
+    else {
+      grid.prepend(buildEntryCard(ev.file));
+      updateLibraryCount();
+    }
+  }
+
+  if (state.editorFile && state.editorFile.path === ev.path) checkEditorFileChanged(ev);
+}
+
+async function checkEditorFileChanged(ev) {
+  if (ev.action === "delete") {
+    toast(`${state.editorFile.name} wurde gelöscht.`, "warning");
+    return;
+  }
+  const res = await api("/api/file-content", "POST", { path: ev.path });
+  if (!state.editorCM || res.content === undefined || res.content === state.editorCM.getValue()) return;
+  if (state.editorDirty) {
+    toast(`${state.editorFile.name} wurde extern geändert.`, "warning");
+  } else {
+    openEditor(ev.file);
+    toast(`${ev.file.name} wurde extern geändert und neu geladen.`, "info");
+  }
+}
+
 // ============================================================
 // TOAST NOTIFICATIONS
 // ============================================================